@@ -6,6 +6,7 @@ Version: 1.0.0
 """
 
 import os
+import sys
 import yaml
 import json
 from pathlib import Path
@@ -14,6 +15,11 @@ from typing import Dict, List, Any, Optional, Tuple, Set
 from collections import defaultdict
 import re
 
+# Shared corpus loader lives with the other knowledge-base tools
+sys.path.insert(0, str(Path(__file__).resolve().parents[4] / "tools"))
+from kb_corpus import get_corpus
+from kb_diff import StructuralDiff
+
 class ConflictDetector:
     """Detect conflicts between sources and versions"""
     
@@ -21,6 +27,8 @@ class ConflictDetector:
         self.repo_path = Path(repo_path)
         self.conflicts = []
         self.conflict_id_counter = 1
+        self.corpus = get_corpus()
+        self.differ = StructuralDiff()
         self.authority_hierarchy = {
             'ABSOLUTE': 4,
             'SILICON_DOC_VERIFIED': 3,
@@ -38,8 +46,7 @@ class ConflictDetector:
     def load_entry(self, entry_file: Path) -> Dict[str, Any]:
         """Load entry YAML file"""
         try:
-            with open(entry_file, 'r') as f:
-                return yaml.safe_load(f)
+            return self.corpus.load(entry_file)
         except Exception as e:
             print(f"Error loading {entry_file}: {e}")
             return {}
@@ -123,6 +130,9 @@ class ConflictDetector:
                     # Check for contradiction
                     if self._values_conflict(value1, value2):
                         severity = self._assess_conflict_severity(field, value1, value2)
+                        differences = None
+                        if isinstance(value1, (dict, list)) and isinstance(value2, (dict, list)):
+                            differences = self.differ.diff(value1, value2)
                         
                         conflict = {
                             'conflict_id': self.generate_conflict_id(),
@@ -147,6 +157,8 @@ class ConflictDetector:
                             'detected_date': datetime.now().isoformat(),
                             'detection_method': 'automated'
                         }
+                        if differences is not None:
+                            conflict['differences'] = differences
                         conflicts.append(conflict)
         
         return conflicts
@@ -157,6 +169,11 @@ class ConflictDetector:
         if value1 is None or value2 is None:
             return False
         
+        # Structured values that are equal apart from key order don't conflict
+        if isinstance(value1, (dict, list)) and isinstance(value2, (dict, list)):
+            if self.differ.same(value1, value2):
+                return False
+        
         # Convert to strings for comparison
         str1 = str(value1).strip().lower()
         str2 = str(value2).strip().lower()
@@ -375,6 +392,7 @@ class ConflictDetector:
         
         self.conflicts = all_conflicts
         print(f"Detected {len(all_conflicts)} conflicts total")
+        print(self.corpus.report())
         
         # Group by severity
         severity_counts = defaultdict(int)
@@ -443,6 +461,13 @@ class ConflictDetector:
                     report.append("**Conflicting Values**:")
                     for source in conflict['conflicting_sources']:
                         report.append(f"- {source['source']} (authority {source['authority']}): {source['value']}")
+                    if conflict.get('differences'):
+                        report.append("**Differences**:")
+                        for op in conflict['differences'][:10]:
+                            value = f": {op['value']}" if 'value' in op else ""
+                            report.append(f"- {op['op']} `{op['path']}`{value}")
+                        if len(conflict['differences']) > 10:
+                            report.append(f"- ... and {len(conflict['differences']) - 10} more")
                 
                 report.append("")
         
@@ -2,7 +2,22 @@
 """
 P2 Knowledge Base Change Detection System
 Identifies changes in source documents and affected repository entries
-Version: 1.0.0
+Version: 1.1.0
+
+Next to each hash file, a stat index records (size, mtime_ns, inode,
+digest) per file. A file whose stat matches its index entry keeps its
+stored digest without being read, so a scan with no changes only stats
+files; the rest are hashed in parallel with 1 MiB reads. Files modified
+within STAT_RACE_WINDOW_NS of a scan are rehashed on the next one, since
+a same-size edit in the same timestamp tick would not change their stat.
+
+A reverse-dependency index (update-tracking/dependency-index.json) keeps
+each entry's id and references, the entries referring to each id and the
+entries under each source-mapped directory. Each record keeps the digest
+of the file it was parsed from, and entries whose current digest differs
+are parsed again, so only changed entries are parsed (even ones whose
+change was recorded by an interrupted run) and dependency and source
+fan-out are dictionary lookups.
 """
 
 import os
@@ -10,18 +25,54 @@ import yaml
 import json
 import hashlib
 import subprocess
+import time
+from bisect import bisect_left, insort
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Set, Tuple, Optional
 from collections import defaultdict
 
+HASH_BUFFER_SIZE = 1024 * 1024
+STAT_INDEX_VERSION = 1
+# Coarse filesystem timestamps (FAT, some network mounts) tick every 2 seconds
+STAT_RACE_WINDOW_NS = 2_000_000_000
+
+ENTRY_PATTERNS = [
+    "instructions/**/*.yaml",
+    "components/**/*.yaml",
+    "architecture/*.yaml",
+    "hardware/*.yaml"
+]
+# Entries whose related_instructions/see_also count as dependencies
+DEPENDENCY_DIRS = ("instructions/", "components/")
+# Source document name fragment -> directory of the entries extracted from it
+SOURCE_ENTRY_DIRS = {
+    'P2-Instruction-Set.csv': 'instructions/pasm2/',
+    'P2-Datasheet': 'instructions/',
+    'Silicon-Doc': 'instructions/',
+    'Spin2': 'instructions/spin2/',
+    'Smart-Pins': 'components/smart-pins/',
+    'P2-EVAL': 'hardware/'
+}
+DEPENDENCY_INDEX_VERSION = 2
+
 class ChangeDetector:
     """Detects changes in source documents and repository entries"""
     
-    def __init__(self, repo_path: str):
+    def __init__(self, repo_path: str, workers: Optional[int] = None, use_stat_index: bool = True):
         self.repo_path = Path(repo_path)
         self.source_hashes_file = self.repo_path / "update-tracking" / "source-hashes.json"
         self.entry_hashes_file = self.repo_path / "update-tracking" / "entry-hashes.json"
+        self.source_index_file = self.repo_path / "update-tracking" / "source-stat-index.json"
+        self.entry_index_file = self.repo_path / "update-tracking" / "entry-stat-index.json"
+        self.dependency_index_file = self.repo_path / "update-tracking" / "dependency-index.json"
+        self.entry_hashes: Optional[Dict[str, str]] = None  # tracked entries, from the last entry scan
+        self._dependency_index: Optional[Dict] = None
+        self._dependency_index_synced = False
+        self.workers = workers
+        self.use_stat_index = use_stat_index
+        self.scan_stats = {'stat_hits': 0, 'hashed': 0}
         self.changes = {
             'sources': [],
             'entries': [],
@@ -33,7 +84,7 @@ class ChangeDetector:
         sha256_hash = hashlib.sha256()
         try:
             with open(file_path, "rb") as f:
-                for byte_block in iter(lambda: f.read(4096), b""):
+                for byte_block in iter(lambda: f.read(HASH_BUFFER_SIZE), b""):
                     sha256_hash.update(byte_block)
             return sha256_hash.hexdigest()
         except Exception as e:
@@ -53,6 +104,77 @@ class ChangeDetector:
         with open(hash_file, 'w') as f:
             json.dump(hashes, f, indent=2)
             
+    def load_stat_index(self, index_file: Path) -> Dict[str, List]:
+        """Load the stat index: {path: [size, mtime_ns, inode, digest]}"""
+        try:
+            with open(index_file, 'r') as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable stat index {index_file.name}: {e}")
+            return {}
+        if index.get('version') != STAT_INDEX_VERSION:
+            return {}
+        return index.get('files', {})
+        
+    def save_stat_index(self, index: Dict[str, List], index_file: Path) -> None:
+        """Save the stat index atomically"""
+        index_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = index_file.with_name(f"{index_file.name}.tmp{os.getpid()}")
+        with open(tmp_file, 'w') as f:
+            # json.dumps without indent uses the C encoder; json.dump streams through Python
+            f.write(json.dumps({'version': STAT_INDEX_VERSION, 'files': index}))
+        os.replace(tmp_file, index_file)
+        
+    def scan_hashes(self, patterns: List[str], index_file: Path) -> Dict[str, str]:
+        """Current {path: digest} for files matching the patterns.
+        
+        Files whose stat matches the stat index reuse the indexed digest;
+        the others are hashed in a thread pool (hashlib releases the GIL).
+        """
+        previous_index = self.load_stat_index(index_file) if self.use_stat_index else {}
+        scan_start_ns = time.time_ns()
+        
+        current_hashes = {}
+        stats = {}
+        to_hash = []
+        for pattern in patterns:
+            for file_path in self.repo_path.glob(pattern):
+                rel_path = str(file_path.relative_to(self.repo_path))
+                if rel_path in current_hashes:
+                    continue
+                try:
+                    st = file_path.stat()
+                except OSError:
+                    st = None
+                entry = previous_index.get(rel_path)
+                if st is not None and entry and entry[:3] == [st.st_size, st.st_mtime_ns, st.st_ino]:
+                    current_hashes[rel_path] = entry[3]
+                    self.scan_stats['stat_hits'] += 1
+                else:
+                    current_hashes[rel_path] = None  # keeps glob order
+                    to_hash.append((rel_path, file_path))
+                stats[rel_path] = st
+                
+        if to_hash:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                digests = pool.map(self.calculate_file_hash, [file_path for _, file_path in to_hash])
+                for (rel_path, _), digest in zip(to_hash, digests):
+                    current_hashes[rel_path] = digest
+            self.scan_stats['hashed'] += len(to_hash)
+            
+        # Failed hashes and files that may still change within the same timestamp tick stay out
+        index = {}
+        for rel_path, digest in current_hashes.items():
+            st = stats[rel_path]
+            if digest and st is not None and st.st_mtime_ns < scan_start_ns - STAT_RACE_WINDOW_NS:
+                index[rel_path] = [st.st_size, st.st_mtime_ns, st.st_ino, digest]
+        if index != previous_index or not self.use_stat_index:
+            self.save_stat_index(index, index_file)
+            
+        return current_hashes
+        
     def detect_source_changes(self) -> List[Dict]:
         """Detect changes in source documents"""
         source_patterns = [
@@ -62,14 +184,10 @@ class ChangeDetector:
             "external-inputs/**/*.xlsx"
         ]
         
-        current_hashes = {}
         changed_sources = []
         
-        # Calculate current hashes
-        for pattern in source_patterns:
-            for file_path in self.repo_path.glob(pattern):
-                rel_path = str(file_path.relative_to(self.repo_path))
-                current_hashes[rel_path] = self.calculate_file_hash(file_path)
+        # Calculate current hashes (unchanged files reuse their indexed digest)
+        current_hashes = self.scan_hashes(source_patterns, self.source_index_file)
                 
         # Load previous hashes
         previous_hashes = self.load_previous_hashes(self.source_hashes_file)
@@ -100,28 +218,19 @@ class ChangeDetector:
                 })
                 
         # Save current hashes for next run
-        self.save_hashes(current_hashes, self.source_hashes_file)
+        if changed_sources or not self.source_hashes_file.exists():
+            self.save_hashes(current_hashes, self.source_hashes_file)
         
         self.changes['sources'] = changed_sources
         return changed_sources
         
     def detect_entry_changes(self) -> List[Dict]:
         """Detect changes in repository entries"""
-        entry_patterns = [
-            "instructions/**/*.yaml",
-            "components/**/*.yaml",
-            "architecture/*.yaml",
-            "hardware/*.yaml"
-        ]
-        
-        current_hashes = {}
         changed_entries = []
         
-        # Calculate current hashes
-        for pattern in entry_patterns:
-            for file_path in self.repo_path.glob(pattern):
-                rel_path = str(file_path.relative_to(self.repo_path))
-                current_hashes[rel_path] = self.calculate_file_hash(file_path)
+        # Calculate current hashes (unchanged files reuse their indexed digest)
+        current_hashes = self.scan_hashes(ENTRY_PATTERNS, self.entry_index_file)
+        self.entry_hashes = current_hashes
                 
         # Load previous hashes
         previous_hashes = self.load_previous_hashes(self.entry_hashes_file)
@@ -160,89 +269,157 @@ class ChangeDetector:
                 })
                 
         # Save current hashes for next run
-        self.save_hashes(current_hashes, self.entry_hashes_file)
+        if changed_entries or not self.entry_hashes_file.exists():
+            self.save_hashes(current_hashes, self.entry_hashes_file)
         
         self.changes['entries'] = changed_entries
+        self._dependency_index_synced = False
         return changed_entries
         
+    @staticmethod
+    def _entry_record(file_path: str, digest: str, data) -> Dict:
+        """An entry's id, (field, referenced id) pairs and file digest, as the dependency index stores them"""
+        if not isinstance(data, dict):
+            return {'id': None, 'refs': [], 'digest': digest}
+        refs = []
+        if file_path.startswith(DEPENDENCY_DIRS):
+            for related in data.get('related_instructions') or []:
+                if isinstance(related, str):
+                    refs.append(['related_instructions', f"{related.lower()}-instruction"])
+            for ref in data.get('see_also') or []:
+                if isinstance(ref, str):
+                    refs.append(['see_also', ref])
+        return {'id': data.get('id'), 'refs': refs, 'digest': digest}
+        
+    @staticmethod
+    def _index_add(index: Dict, file_path: str, record: Dict) -> None:
+        index['entries'][file_path] = record
+        for target in {target for _, target in record['refs']}:
+            insort(index['referrers'].setdefault(target, []), file_path)
+        for entry_dir, files in index['source_entries'].items():
+            if file_path.startswith(entry_dir):
+                insort(files, file_path)
+                
+    @staticmethod
+    def _index_remove(index: Dict, file_path: str) -> None:
+        record = index['entries'].pop(file_path)
+        sorted_lists = [index['referrers'][target] for target in {target for _, target in record['refs']}]
+        sorted_lists += [files for entry_dir, files in index['source_entries'].items()
+                         if file_path.startswith(entry_dir)]
+        for files in sorted_lists:
+            pos = bisect_left(files, file_path)
+            if pos < len(files) and files[pos] == file_path:
+                del files[pos]
+        for _, target in record['refs']:
+            if not index['referrers'].get(target, True):
+                del index['referrers'][target]
+                
+    def load_dependency_index(self) -> Dict:
+        """Load the persisted dependency index (empty if missing or outdated)"""
+        index = None
+        try:
+            with open(self.dependency_index_file, 'r') as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable dependency index {self.dependency_index_file.name}: {e}")
+        if not index or index.get('version') != DEPENDENCY_INDEX_VERSION:
+            index = {'version': DEPENDENCY_INDEX_VERSION, 'entries': {}, 'referrers': {}, 'source_entries': {}}
+        # The source mapping is code, not data: rebuild its listings if it has changed
+        entry_dirs = sorted(set(SOURCE_ENTRY_DIRS.values()))
+        if sorted(index['source_entries']) != entry_dirs:
+            index['source_entries'] = {
+                entry_dir: sorted(f for f in index['entries'] if f.startswith(entry_dir))
+                for entry_dir in entry_dirs
+            }
+        return index
+        
+    def dependency_index(self) -> Dict:
+        """The dependency index, brought up to date with the latest entry scan.
+        
+        Tracked entries the index has not seen, or whose digest differs from
+        the one their record was parsed from, are parsed; untracked ones are
+        dropped.
+        """
+        if self._dependency_index is not None and self._dependency_index_synced:
+            return self._dependency_index
+        index = self._dependency_index or self.load_dependency_index()
+        
+        if self.entry_hashes is None:
+            self.entry_hashes = self.scan_hashes(ENTRY_PATTERNS, self.entry_index_file)
+        current_hashes = self.entry_hashes
+        records = index['entries']
+        stale = [f for f, record in records.items()
+                 if f not in current_hashes or not record.get('digest') or record['digest'] != current_hashes[f]]
+        to_parse = sorted(f for f in current_hashes
+                          if f not in records or not current_hashes[f] or records[f].get('digest') != current_hashes[f])
+        
+        for file_path in stale:
+            self._index_remove(index, file_path)
+        for file_path in to_parse:
+            try:
+                with open(self.repo_path / file_path, 'r') as f:
+                    data = yaml.safe_load(f)
+            except Exception:
+                data = None
+            self._index_add(index, file_path, self._entry_record(file_path, self.entry_hashes[file_path], data))
+            
+        if stale or to_parse or not self.dependency_index_file.exists():
+            self.dependency_index_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.dependency_index_file.with_name(f"{self.dependency_index_file.name}.tmp{os.getpid()}")
+            with open(tmp_file, 'w') as f:
+                f.write(json.dumps(index))
+            os.replace(tmp_file, self.dependency_index_file)
+            
+        self._dependency_index = index
+        self._dependency_index_synced = True
+        return index
+        
     def map_sources_to_entries(self) -> Dict[str, List[str]]:
         """Map source documents to affected repository entries"""
-        source_mapping = {
-            'P2-Instruction-Set.csv': 'instructions/pasm2/',
-            'P2-Datasheet': 'instructions/',
-            'Silicon-Doc': 'instructions/',
-            'Spin2': 'instructions/spin2/',
-            'Smart-Pins': 'components/smart-pins/',
-            'P2-EVAL': 'hardware/'
-        }
-        
+        source_entries = self.dependency_index()['source_entries']
         affected_entries = defaultdict(list)
         
         for source_change in self.changes['sources']:
             source_file = source_change['file']
             
             # Find matching patterns
-            for pattern, entry_dir in source_mapping.items():
+            for pattern, entry_dir in SOURCE_ENTRY_DIRS.items():
                 if pattern.lower() in source_file.lower():
-                    # Find all entries in that directory
-                    entry_path = self.repo_path / entry_dir
-                    if entry_path.exists():
-                        for entry_file in entry_path.glob("**/*.yaml"):
-                            rel_path = str(entry_file.relative_to(self.repo_path))
-                            affected_entries[source_file].append(rel_path)
+                    # All entries in that directory
+                    affected_entries[source_file].extend(source_entries.get(entry_dir, []))
                             
         return dict(affected_entries)
         
     def identify_dependencies(self) -> List[Dict]:
         """Identify entries that depend on changed entries"""
+        index = self.dependency_index()
         dependencies = []
         changed_entry_ids = set()
         
         # Get IDs of changed entries
         for entry_change in self.changes['entries']:
             if entry_change['change_type'] != 'deleted':
-                file_path = self.repo_path / entry_change['file']
-                try:
-                    with open(file_path, 'r') as f:
-                        data = yaml.safe_load(f)
-                        if data and 'id' in data:
-                            changed_entry_ids.add(data['id'])
-                except:
-                    pass
+                record = index['entries'].get(entry_change['file'])
+                if record and record['id'] is not None:
+                    changed_entry_ids.add(record['id'])
                     
-        # Check all entries for dependencies on changed entries
-        for pattern in ["instructions/**/*.yaml", "components/**/*.yaml"]:
-            for file_path in self.repo_path.glob(pattern):
-                try:
-                    with open(file_path, 'r') as f:
-                        data = yaml.safe_load(f)
-                        if data:
-                            entry_id = data.get('id', '')
-                            
-                            # Check related instructions
-                            if 'related_instructions' in data:
-                                for related in data['related_instructions']:
-                                    related_id = f"{related.lower()}-instruction"
-                                    if related_id in changed_entry_ids:
-                                        dependencies.append({
-                                            'entry': entry_id,
-                                            'depends_on': related_id,
-                                            'field': 'related_instructions',
-                                            'file': str(file_path.relative_to(self.repo_path))
-                                        })
-                                        
-                            # Check see_also references
-                            if 'see_also' in data:
-                                for ref in data['see_also']:
-                                    if ref in changed_entry_ids:
-                                        dependencies.append({
-                                            'entry': entry_id,
-                                            'depends_on': ref,
-                                            'field': 'see_also',
-                                            'file': str(file_path.relative_to(self.repo_path))
-                                        })
-                except:
-                    pass
+        # Entries referring to a changed entry, from the reverse index
+        referrers = set()
+        for entry_id in changed_entry_ids:
+            referrers.update(index['referrers'].get(entry_id, []))
+            
+        for file_path in sorted(referrers):
+            record = index['entries'][file_path]
+            for field, ref in record['refs']:
+                if ref in changed_entry_ids:
+                    dependencies.append({
+                        'entry': record['id'] if record['id'] is not None else '',
+                        'depends_on': ref,
+                        'field': field,
+                        'file': file_path
+                    })
                     
         self.changes['dependencies'] = dependencies
         return dependencies
@@ -356,6 +533,7 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
     def run_full_detection(self) -> Dict:
         """Run complete change detection process"""
         print("🔍 Running change detection...")
+        self.scan_stats = {'stat_hits': 0, 'hashed': 0}
         
         # Detect changes
         print("  Checking source documents...")
@@ -390,6 +568,8 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         print(f"  Source changes: {len(self.changes['sources'])}")
         print(f"  Entry changes: {len(self.changes['entries'])}")
         print(f"  Affected dependencies: {len(self.changes['dependencies'])}")
+        print(f"  Files hashed: {self.scan_stats['hashed']} "
+              f"({self.scan_stats['stat_hits']} unchanged by stat index)")
         
         return self.changes
         
@@ -400,12 +580,15 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="P2 Knowledge Base Change Detection")
     parser.add_argument('--repo-path', default='.', help='Repository root path')
     parser.add_argument('--watch', action='store_true', help='Watch for changes continuously')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='Threads for hashing changed files (default: Python\'s thread pool default)')
+    parser.add_argument('--rehash', action='store_true',
+                        help='Ignore the stat index and rehash every file (the index is rebuilt)')
     args = parser.parse_args()
     
-    detector = ChangeDetector(args.repo_path)
+    detector = ChangeDetector(args.repo_path, workers=args.workers, use_stat_index=not args.rehash)
     
     if args.watch:
-        import time
         print("👁️ Watching for changes (Ctrl+C to stop)...")
         while True:
             detector.run_full_detection()
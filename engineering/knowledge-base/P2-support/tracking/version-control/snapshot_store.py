@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+P2 Knowledge Base Snapshot Store
+Persistent, content-addressed cache of parsed repository versions
+Version: 1.0.0
+
+A snapshot is what VersionComparator builds for one version: the entries
+(id -> path and blob ID) and their statistics. Snapshots are keyed by the
+commit's tree ID, so every commit, tag or branch with the same content
+shares one. Parsed entry data is stored once per blob ID, so the entries a
+release did not touch are shared by all snapshots that contain them.
+
+Layout under $P2KB_CACHE_DIR/version-snapshots (default
+~/.cache/p2-knowledge-base; P2KB_NO_CACHE=1 disables the store):
+
+    trees/<tree id>.pickle      entries + statistics of one version
+    blobs/<2 hex>/<38 hex>.pickle   parsed YAML of one blob
+
+Loading a snapshot refreshes its mtime; prune() evicts snapshots older than
+a maximum age, then least recently used ones until the store fits a size
+limit, and deletes the blobs no remaining snapshot refers to. prune() reads
+every snapshot, so prune_if_due() only stats the snapshot files, at most
+once per store, and prunes when one is past the maximum age or they alone
+exceed the size limit.
+"""
+
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "p2-knowledge-base"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MAX_AGE_DAYS = 90
+SNAPSHOT_MAX_BYTES = 256 * 1024 * 1024
+# Unreferenced blobs younger than this may belong to a snapshot still being written
+ORPHAN_GRACE_SECONDS = 3600
+
+class SnapshotStore:
+    """Parsed repository versions by tree ID, with entry data shared by blob ID"""
+
+    def __init__(self, enabled: bool = True, root: Optional[Path] = None):
+        self.enabled = enabled and not os.environ.get("P2KB_NO_CACHE")
+        self.root = root or Path(os.environ.get("P2KB_CACHE_DIR", DEFAULT_CACHE_DIR)) / "version-snapshots"
+        self.trees_dir = self.root / "trees"
+        self.blobs_dir = self.root / "blobs"
+        self._prune_checked = False
+
+    def _tree_path(self, tree_id: str) -> Path:
+        return self.trees_dir / f"{tree_id}.pickle"
+
+    def _blob_path(self, blob_id: str) -> Path:
+        return self.blobs_dir / blob_id[:2] / f"{blob_id[2:]}.pickle"
+
+    @staticmethod
+    def _write(path: Path, value: Any) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.tmp{os.getpid()}")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def load(self, tree_id: str) -> Optional[Dict]:
+        """The snapshot stored for a tree: {'entries': {id: {'path', 'blob'}}, 'statistics'}, or None"""
+        if not self.enabled:
+            return None
+        path = self._tree_path(tree_id)
+        try:
+            with open(path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable snapshot {path.name}: {e}")
+            return None
+        if snapshot.get('version') != SNAPSHOT_VERSION:
+            return None
+        try:
+            os.utime(path)  # recently used: evicted last
+        except OSError:
+            pass
+        return snapshot
+
+    def load_blob(self, blob_id: str) -> Any:
+        """Parsed data of a blob (None if it is not stored)"""
+        try:
+            with open(self._blob_path(blob_id), 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable snapshot blob {blob_id}: {e}")
+            return None
+
+    def save(self, tree_id: str, entries: Dict[str, Dict], statistics: Dict) -> None:
+        """Store a version: entries as {id: {'path', 'blob', 'data'}} and its statistics"""
+        if not self.enabled:
+            return
+        try:
+            for entry in entries.values():
+                blob_path = self._blob_path(entry['blob'])
+                if not blob_path.exists():
+                    self._write(blob_path, entry['data'])
+            self._write(self._tree_path(tree_id), {
+                'version': SNAPSHOT_VERSION,
+                'tree': tree_id,
+                'entries': {entry_id: {'path': entry['path'], 'blob': entry['blob']}
+                            for entry_id, entry in entries.items()},
+                'statistics': statistics
+            })
+        except Exception as e:
+            print(f"⚠️ Could not write snapshot {tree_id[:8]}: {e}")
+
+    def prune_if_due(self, max_age_days: float = SNAPSHOT_MAX_AGE_DAYS,
+                     max_bytes: int = SNAPSHOT_MAX_BYTES) -> Optional[Dict[str, int]]:
+        """prune() if a snapshot is too old or the snapshots alone are too big (checked once)"""
+        if self._prune_checked or not self.enabled or not self.trees_dir.exists():
+            return None
+        self._prune_checked = True
+        cutoff = time.time() - max_age_days * 86400
+        total = 0
+        oldest = None
+        for path in self.trees_dir.glob("*.pickle"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            total += st.st_size
+            oldest = st.st_mtime if oldest is None else min(oldest, st.st_mtime)
+        if total <= max_bytes and (oldest is None or oldest >= cutoff):
+            return None
+        return self.prune(max_age_days, max_bytes)
+
+    def prune(self, max_age_days: float = SNAPSHOT_MAX_AGE_DAYS,
+              max_bytes: int = SNAPSHOT_MAX_BYTES) -> Dict[str, int]:
+        """Evict old and least recently used snapshots, then unreferenced blobs"""
+        results = {'snapshots_removed': 0, 'blobs_removed': 0, 'bytes_freed': 0}
+        if not self.enabled or not self.trees_dir.exists():
+            return results
+
+        snapshots = []
+        for path in self.trees_dir.glob("*.pickle"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            snapshots.append((st.st_mtime, st.st_size, path))
+        snapshots.sort()  # least recently used first
+        blob_stats = {}
+        for path in self.blobs_dir.glob("*/*.pickle"):
+            try:
+                blob_stats[path.parent.name + path.stem] = path.stat()
+            except OSError:
+                continue
+        total = sum(size for _, size, _ in snapshots) + sum(st.st_size for st in blob_stats.values())
+
+        # Blob reference counts, from the snapshots that can be read
+        references = {}
+        snapshot_blobs = {}
+        for _, _, path in snapshots:
+            try:
+                with open(path, 'rb') as f:
+                    blobs = {entry['blob'] for entry in pickle.load(f)['entries'].values()}
+            except Exception:
+                blobs = set()
+            snapshot_blobs[path] = blobs
+            for blob_id in blobs:
+                references[blob_id] = references.get(blob_id, 0) + 1
+
+        def remove(path: Path) -> int:
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except OSError:
+                return 0
+            results['bytes_freed'] += size
+            return size
+
+        cutoff = time.time() - max_age_days * 86400
+        for mtime, _, path in snapshots:
+            if mtime >= cutoff and total <= max_bytes:
+                break
+            total -= remove(path)
+            results['snapshots_removed'] += 1
+            for blob_id in snapshot_blobs[path]:
+                references[blob_id] -= 1
+                if references[blob_id] == 0 and blob_id in blob_stats:
+                    total -= remove(self._blob_path(blob_id))
+                    results['blobs_removed'] += 1
+                    del blob_stats[blob_id]
+
+        # Blobs left behind by snapshots that were removed or failed to write
+        orphan_cutoff = time.time() - ORPHAN_GRACE_SECONDS
+        for blob_id, st in blob_stats.items():
+            if not references.get(blob_id) and st.st_mtime < orphan_cutoff:
+                remove(self._blob_path(blob_id))
+                results['blobs_removed'] += 1
+
+        return results
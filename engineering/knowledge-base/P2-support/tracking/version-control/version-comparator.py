@@ -2,24 +2,60 @@
 """
 P2 Knowledge Base Version Comparison Tool
 Compares repository versions and generates migration guides
-Version: 1.0.0
+Version: 1.2.0
+
+Entry YAML is read straight from git objects: one `git ls-tree` per
+version lists the blob IDs, and a single `git cat-file --batch` process
+streams every distinct blob. Each blob is parsed once, however many
+versions contain it, and entries whose blob is the same in both versions
+are not diffed.
+
+Parsed versions are kept in a SnapshotStore (snapshot_store.py) keyed by
+tree ID, so comparing against a release again only reads the snapshot
+and the entry data of the blobs it has not loaded yet.
+
+Entries are diffed by the shared structural diff engine (kb_diff.py):
+identical subtrees are skipped by digest, each modified entry carries its
+JSON Patch, and batches can be spread over a process pool (--workers).
 """
 
+import sys
 import yaml
 import json
 import subprocess
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Set, Tuple, Optional, Any
+from typing import Dict, Iterable, Iterator, List, Set, Tuple, Optional, Any
 from collections import defaultdict
 import difflib
 
+from snapshot_store import SnapshotStore
+
+# Shared structural diff lives with the other knowledge-base tools
+sys.path.insert(0, str(Path(__file__).resolve().parents[4] / "tools"))
+from kb_diff import StructuralDiff, diff_many, pointer_token
+
+# Bookkeeping fields that are not reported as changes
+METADATA_FIELDS = ('last_updated', 'update_history')
+
+def is_entry_file(file_path: str) -> bool:
+    """Whether a repository path holds a knowledge base entry"""
+    return file_path.endswith('.yaml') and ('instructions/' in file_path or
+        'components/' in file_path or 'architecture/' in file_path)
+
 class VersionComparator:
     """Compare different versions of the repository"""
     
-    def __init__(self, repo_path: str):
+    def __init__(self, repo_path: str, use_snapshots: bool = True, workers: int = 1):
         self.repo_path = Path(repo_path)
+        self.workers = workers
+        self.differ = StructuralDiff()
         self.current_version = self.get_current_version()
+        # Parsed YAML by blob ID (None when the blob is not valid YAML)
+        self.parsed_blobs: Dict[str, Any] = {}
+        self.snapshots = SnapshotStore(enabled=use_snapshots)
+        self._tree_ids: Dict[str, Optional[str]] = {}
         
     def get_current_version(self) -> str:
         """Get current repository version from git"""
@@ -34,8 +70,119 @@ class VersionComparator:
         except:
             return "unknown"
             
-    def get_version_at_commit(self, commit: str) -> Dict[str, Any]:
-        """Get repository state at a specific commit"""
+    def tree_id(self, commit: str) -> Optional[str]:
+        """ID of a commit's tree (None if it cannot be resolved)"""
+        if commit not in self._tree_ids:
+            result = subprocess.run(
+                ['git', 'rev-parse', '--verify', '--quiet', f'{commit}^{{tree}}'],
+                cwd=self.repo_path,
+                capture_output=True,
+                text=True
+            )
+            self._tree_ids[commit] = result.stdout.strip() if result.returncode == 0 else None
+        return self._tree_ids[commit]
+        
+    def load_snapshot(self, commit: str) -> Optional[Dict[str, Any]]:
+        """The version at a commit from the snapshot store, or None if it must be built"""
+        if not self.snapshots.enabled:
+            return None
+        tree = self.tree_id(commit)
+        snapshot = self.snapshots.load(tree) if tree else None
+        if snapshot is None:
+            return None
+            
+        entries = {}
+        for entry_id, entry in snapshot['entries'].items():
+            data = self.parsed_blobs.get(entry['blob'])
+            if data is None:
+                data = self.snapshots.load_blob(entry['blob'])
+                if data is None:
+                    return None  # incomplete snapshot: rebuild it
+                self.parsed_blobs[entry['blob']] = data
+            entries[entry_id] = {'path': entry['path'], 'data': data, 'blob': entry['blob']}
+        return {
+            'commit': commit,
+            'entries': entries,
+            'statistics': snapshot['statistics']
+        }
+        
+    def entry_blobs_at_commit(self, commit: str) -> Dict[str, str]:
+        """{path: blob ID} of the entry YAML files at a commit, in tree order"""
+        result = subprocess.run(
+            ['git', 'ls-tree', '-r', '-z', commit],
+            cwd=self.repo_path,
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"git ls-tree failed for {commit}")
+            
+        blobs = {}
+        for record in result.stdout.split('\0'):
+            if not record:
+                continue
+            info, file_path = record.split('\t', 1)
+            _, object_type, object_id = info.split()
+            if object_type == 'blob' and is_entry_file(file_path):
+                blobs[file_path] = object_id
+        return blobs
+        
+    def iter_blobs(self, object_ids: Iterable[str]) -> Iterator[Tuple[str, bytes]]:
+        """(blob ID, content) for each blob, all read through one git cat-file --batch process"""
+        object_ids = list(object_ids)
+        if not object_ids:
+            return
+        proc = subprocess.Popen(
+            ['git', 'cat-file', '--batch'],
+            cwd=self.repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE
+        )
+        
+        # Feed requests from a thread so neither pipe can fill up and stall git
+        def feed():
+            try:
+                proc.stdin.write(''.join(f"{object_id}\n" for object_id in object_ids).encode())
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+        
+        try:
+            for object_id in object_ids:
+                header = proc.stdout.readline().split()
+                if len(header) != 3:
+                    if not header:
+                        break  # git exited early
+                    continue  # "<id> missing"
+                content = proc.stdout.read(int(header[2]))
+                proc.stdout.read(1)  # newline after each object
+                if header[1] == b'blob':
+                    yield object_id, content
+        finally:
+            proc.stdout.close()
+            proc.wait()
+            feeder.join()
+            
+    def load_blobs(self, object_ids: Iterable[str]) -> None:
+        """Parse the blobs not parsed yet into parsed_blobs"""
+        missing = [object_id for object_id in dict.fromkeys(object_ids) if object_id not in self.parsed_blobs]
+        for object_id, content in self.iter_blobs(missing):
+            try:
+                self.parsed_blobs[object_id] = yaml.safe_load(content.decode('utf-8'))
+            except Exception:
+                self.parsed_blobs[object_id] = None
+        for object_id in missing:
+            self.parsed_blobs.setdefault(object_id, None)
+            
+    def get_version_at_commit(self, commit: str, blobs: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Get repository state at a specific commit (blobs: its entry_blobs_at_commit, if already listed)"""
+        if blobs is None:
+            snapshot = self.load_snapshot(commit)
+            if snapshot is not None:
+                return snapshot
+                
         version_data = {
             'commit': commit,
             'entries': {},
@@ -43,41 +190,27 @@ class VersionComparator:
         }
         
         try:
-            # Get list of YAML files at that commit
-            result = subprocess.run(
-                ['git', 'ls-tree', '-r', '--name-only', commit],
-                cwd=self.repo_path,
-                capture_output=True,
-                text=True
-            )
+            if blobs is None:
+                blobs = self.entry_blobs_at_commit(commit)
+            self.load_blobs(blobs.values())
             
-            yaml_files = [f for f in result.stdout.splitlines() 
-                         if f.endswith('.yaml') and ('instructions/' in f or 
-                            'components/' in f or 'architecture/' in f)]
-            
-            # Get content of each file at that commit
-            for file_path in yaml_files:
-                try:
-                    result = subprocess.run(
-                        ['git', 'show', f'{commit}:{file_path}'],
-                        cwd=self.repo_path,
-                        capture_output=True,
-                        text=True
-                    )
-                    
-                    if result.returncode == 0:
-                        data = yaml.safe_load(result.stdout)
-                        if data and 'id' in data:
-                            version_data['entries'][data['id']] = {
-                                'path': file_path,
-                                'data': data
-                            }
-                except:
-                    pass
+            for file_path, object_id in blobs.items():
+                data = self.parsed_blobs[object_id]
+                if isinstance(data, dict) and 'id' in data:
+                    version_data['entries'][data['id']] = {
+                        'path': file_path,
+                        'data': data,
+                        'blob': object_id
+                    }
                     
             # Calculate statistics
             version_data['statistics'] = self.calculate_statistics(version_data['entries'])
             
+            tree = self.tree_id(commit) if self.snapshots.enabled else None
+            if tree:
+                self.snapshots.save(tree, version_data['entries'], version_data['statistics'])
+                self.snapshots.prune_if_due()
+                
         except Exception as e:
             print(f"Error getting version at {commit}: {e}")
             
@@ -127,9 +260,21 @@ class VersionComparator:
         """Compare two versions of the repository"""
         print(f"Comparing versions {version1} and {version2}...")
         
-        # Get data for both versions
-        v1_data = self.get_version_at_commit(version1)
-        v2_data = self.get_version_at_commit(version2)
+        # Get data for both versions: from snapshots, or reading the blobs of both in one pass
+        v1_data = self.load_snapshot(version1)
+        v2_data = self.load_snapshot(version2)
+        to_build = [version for version, data in ((version1, v1_data), (version2, v2_data)) if data is None]
+        blobs = {}
+        try:
+            for version in to_build:
+                blobs[version] = self.entry_blobs_at_commit(version)
+            self.load_blobs(object_id for version_blobs in blobs.values() for object_id in version_blobs.values())
+        except Exception:
+            blobs = {}  # get_version_at_commit reports the error
+        if v1_data is None:
+            v1_data = self.get_version_at_commit(version1, blobs.get(version1))
+        if v2_data is None:
+            v2_data = self.get_version_at_commit(version2, blobs.get(version2))
         
         comparison = {
             'version1': version1,
@@ -167,18 +312,24 @@ class VersionComparator:
                 'category': v1_data['entries'][entry_id]['data'].get('category', 'unknown')
             })
             
-        # Find modified entries
-        for entry_id in v1_ids & v2_ids:
-            v1_entry = v1_data['entries'][entry_id]['data']
-            v2_entry = v2_data['entries'][entry_id]['data']
-            
-            changes = self.compare_entries(v1_entry, v2_entry)
+        # Find modified entries (same blob, same content: nothing to diff)
+        candidates = [entry_id for entry_id in v1_ids & v2_ids
+                      if v1_data['entries'][entry_id]['blob'] != v2_data['entries'][entry_id]['blob']]
+        pairs = [(v1_data['entries'][entry_id]['data'], v2_data['entries'][entry_id]['data'])
+                 for entry_id in candidates]
+        patches = diff_many(pairs, self.workers, self.differ)
+        
+        metadata_tokens = {pointer_token(field) for field in METADATA_FIELDS}
+        for entry_id, (v1_entry, v2_entry), patch in zip(candidates, pairs, patches):
+            patch = [op for op in patch if op['path'].split('/')[1] not in metadata_tokens]
+            changes = self.compare_entries(v1_entry, v2_entry, patch)
             
             if changes:
                 comparison['entries']['modified'].append({
                     'id': entry_id,
                     'path': v2_data['entries'][entry_id]['path'],
-                    'changes': changes
+                    'changes': changes,
+                    'patch': patch
                 })
                 
                 # Track field-level changes
@@ -187,13 +338,16 @@ class VersionComparator:
                     
         return comparison
         
-    def compare_entries(self, entry1: Dict, entry2: Dict) -> List[Dict]:
-        """Compare two versions of an entry"""
+    def compare_entries(self, entry1: Dict, entry2: Dict, patch: Optional[List[Dict]] = None) -> List[Dict]:
+        """Compare two versions of an entry, field by field (patch: their JSON Patch, if already diffed)"""
         changes = []
+        if patch is None:
+            patch = self.differ.diff(entry1, entry2)
+        changed_fields = {op['path'].split('/')[1] for op in patch}
         
         # Check all fields in entry2
         for field, value2 in entry2.items():
-            if field in ['last_updated', 'update_history']:
+            if field in METADATA_FIELDS:
                 continue  # Skip metadata fields
                 
             if field not in entry1:
@@ -202,7 +356,7 @@ class VersionComparator:
                     'type': 'added',
                     'new_value': str(value2)[:100] if not isinstance(value2, (dict, list)) else f"[{type(value2).__name__}]"
                 })
-            elif entry1[field] != value2:
+            elif pointer_token(field) in changed_fields:
                 changes.append({
                     'field': field,
                     'type': 'modified',
@@ -212,7 +366,7 @@ class VersionComparator:
                 
         # Check for removed fields
         for field in entry1:
-            if field not in entry2 and field not in ['last_updated', 'update_history']:
+            if field not in entry2 and field not in METADATA_FIELDS:
                 changes.append({
                     'field': field,
                     'type': 'removed',
@@ -262,7 +416,13 @@ This guide helps downstream consumers migrate from version {comparison['version1
             for entry in comparison['entries']['removed'][:10]:
                 breaking_changes.append(f"- `{entry['id']}` ({entry['category']})")
                 
-        if any(c['type'] == 'removed' for m in comparison['entries']['modified'] for c in m['changes']):
+        # Removed top-level fields, and keys removed inside fields that remain (not list items)
+        nested_removals = [
+            (modified['id'], op['path'].lstrip('/'))
+            for modified in comparison['entries']['modified'] for op in modified.get('patch', [])
+            if op['op'] == 'remove' and op['path'].count('/') > 1 and not op['path'].rsplit('/', 1)[1].isdigit()
+        ]
+        if nested_removals or any(c['type'] == 'removed' for m in comparison['entries']['modified'] for c in m['changes']):
             breaking_changes.append("\n### Removed Fields")
             breaking_changes.append("The following fields have been removed from entries:")
             field_removals = defaultdict(list)
@@ -270,8 +430,10 @@ This guide helps downstream consumers migrate from version {comparison['version1
                 for change in modified['changes']:
                     if change['type'] == 'removed':
                         field_removals[change['field']].append(modified['id'])
+            for entry_id, field_path in nested_removals:
+                field_removals[field_path].append(entry_id)
             for field, entries in list(field_removals.items())[:5]:
-                guide += f"- `{field}` removed from {len(entries)} entries\n"
+                breaking_changes.append(f"- `{field}` removed from {len(entries)} entries")
                 
         if breaking_changes:
             guide += "\n".join(breaking_changes)
@@ -367,6 +529,13 @@ Generated: {comparison['timestamp']}
                     report += f"- ➖ **{change['field']}**: ~~{change['old_value']}~~\n"
                 elif change['type'] == 'modified':
                     report += f"- 📝 **{change['field']}**: {change['old_value']} → {change['new_value']}\n"
+                    # Where inside a dict or list field the change is
+                    prefix = f"/{pointer_token(change['field'])}/"
+                    nested = [op for op in entry.get('patch', []) if op['path'].startswith(prefix)]
+                    for op in nested[:5]:
+                        report += f"  - {op['op']} `{op['path']}`\n"
+                    if len(nested) > 5:
+                        report += f"  - ... and {len(nested) - 5} more\n"
                     
         if len(comparison['entries']['modified']) > 20:
             report += f"\n... and {len(comparison['entries']['modified']) - 20} more modified entries\n"
@@ -412,12 +581,22 @@ if __name__ == "__main__":
     parser.add_argument('--to-version', help='To version (commit hash or tag)')
     parser.add_argument('--from-tag', help='Compare from tag to current')
     parser.add_argument('--output', help='Output file for migration guide')
+    parser.add_argument('--no-cache', action='store_true', help='Neither use nor store version snapshots')
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help='Processes for diffing modified entries (default: 1; 0 for one per CPU)')
+    parser.add_argument('--prune-snapshots', action='store_true',
+                        help='Evict old and least recently used version snapshots, then exit')
     
     args = parser.parse_args()
     
-    comparator = VersionComparator(args.repo_path)
+    comparator = VersionComparator(args.repo_path, use_snapshots=not args.no_cache, workers=args.workers)
     
-    if args.from_tag:
+    if args.prune_snapshots:
+        results = comparator.snapshots.prune()
+        print(f"Removed {results['snapshots_removed']} snapshots and {results['blobs_removed']} blobs "
+              f"({results['bytes_freed'] / 1024:.1f} KB)")
+        exit(0)
+    elif args.from_tag:
         # Compare tag with current
         comparison = comparator.compare_with_tag(args.from_tag)
     elif args.from_version and args.to_version:
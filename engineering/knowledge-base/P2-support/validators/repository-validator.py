@@ -5,16 +5,20 @@ Comprehensive validation for YAML entries, cross-references, and data consistenc
 Version: 1.0.0
 """
 
-import yaml
 import json
 import re
 import os
+import sys
 from pathlib import Path
 from typing import Dict, List, Set, Tuple, Any, Optional
 from datetime import datetime
 from collections import defaultdict
 import networkx as nx
 
+# Shared corpus loader lives with the other knowledge-base tools
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "tools"))
+from kb_corpus import get_corpus, safe_load
+
 class RepositoryValidator:
     """Main validation framework for P2 Knowledge Base"""
     
@@ -26,6 +30,7 @@ class RepositoryValidator:
         self.entries = {}
         self.cross_refs = defaultdict(set)
         self.dependency_graph = nx.DiGraph()
+        self.corpus = get_corpus()
         
         # Load schemas
         self.instruction_schema = self._load_schema('instruction-schema.yaml')
@@ -36,7 +41,7 @@ class RepositoryValidator:
         schema_path = self.repo_path / schema_file
         if schema_path.exists():
             with open(schema_path, 'r') as f:
-                return yaml.safe_load(f)
+                return safe_load(f)
         return {}
         
     def validate_all(self) -> Dict[str, Any]:
@@ -85,20 +90,20 @@ class RepositoryValidator:
         for pattern in patterns:
             for file_path in self.repo_path.glob(pattern):
                 try:
-                    with open(file_path, 'r') as f:
-                        data = yaml.safe_load(f)
-                        if data:
-                            entry_id = data.get('id', file_path.stem)
-                            self.entries[entry_id] = {
-                                'path': file_path,
-                                'data': data
-                            }
+                    data = self.corpus.load(file_path)
+                    if data:
+                        entry_id = data.get('id', file_path.stem)
+                        self.entries[entry_id] = {
+                            'path': file_path,
+                            'data': data
+                        }
                 except Exception as e:
                     self.errors.append({
                         'type': 'load_error',
                         'file': str(file_path),
                         'error': str(e)
                     })
+        print(self.corpus.report())
                     
     def _validate_schemas(self) -> Dict[str, Any]:
         """Validate all entries against their schemas"""
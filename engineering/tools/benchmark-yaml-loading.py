@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark YAML parse and emit time over the P2 knowledge base.
+
+Compares the pure-Python SafeLoader/SafeDumper against the libyaml
+CSafeLoader/CSafeDumper that kb_corpus selects when available. File contents
+are read into memory first so only parse/emit cost is measured.
+
+Usage:
+    python engineering/tools/benchmark-yaml-loading.py [kb-path] [rounds]
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import yaml
+
+import kb_corpus
+
+
+def read_corpus(kb_path: Path) -> List[Tuple[Path, str]]:
+    """Read every YAML file under kb_path into memory."""
+    texts = []
+    for yaml_file in sorted(kb_path.rglob("*.yaml")):
+        with open(yaml_file, 'r') as f:
+            texts.append((yaml_file, f.read()))
+    return texts
+
+
+def time_backend(texts: List[Tuple[Path, str]], loader, dumper, rounds: int) -> Dict[str, float]:
+    """Return the best-of-N parse and emit time (seconds) for one loader/dumper pair."""
+    parse_times = []
+    emit_times = []
+    parsed = []
+
+    for _ in range(rounds):
+        parsed = []
+        start = time.perf_counter()
+        for _, text in texts:
+            try:
+                parsed.append(yaml.load(text, Loader=loader))
+            except yaml.YAMLError:
+                pass
+        parse_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for data in parsed:
+            yaml.dump(data, Dumper=dumper, default_flow_style=False, sort_keys=False,
+                      allow_unicode=True)
+        emit_times.append(time.perf_counter() - start)
+
+    return {
+        "parse": min(parse_times),
+        "emit": min(emit_times),
+        "documents": len(parsed),
+    }
+
+
+def main():
+    kb_path = Path(sys.argv[1] if len(sys.argv) > 1 else "engineering/knowledge-base/P2")
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    if not kb_path.exists():
+        print(f"Knowledge base not found: {kb_path}")
+        sys.exit(1)
+
+    texts = read_corpus(kb_path)
+    total_kb = sum(len(text) for _, text in texts) // 1024
+    print(f"YAML benchmark: {len(texts)} files ({total_kb} KB) from {kb_path}, best of {rounds}")
+    print(f"kb_corpus backend: {kb_corpus.YAML_BACKEND}")
+    print("=" * 60)
+
+    backends = [("python", yaml.SafeLoader, yaml.SafeDumper)]
+    if getattr(yaml, "CSafeLoader", None):
+        backends.append(("libyaml", yaml.CSafeLoader, yaml.CSafeDumper))
+    else:
+        print("libyaml bindings not available - only the pure-Python backend is measured")
+
+    results = {}
+    for name, loader, dumper in backends:
+        results[name] = time_backend(texts, loader, dumper, rounds)
+        r = results[name]
+        print(f"{name:>8}: parse {r['parse'] * 1000:8.0f} ms   "
+              f"emit {r['emit'] * 1000:8.0f} ms   ({r['documents']} documents)")
+
+    if "libyaml" in results:
+        py, c = results["python"], results["libyaml"]
+        print("-" * 60)
+        print(f" speedup: parse {py['parse'] / c['parse']:.1f}x   emit {py['emit'] / c['emit']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
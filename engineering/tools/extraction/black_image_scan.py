@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Black Image Scan
+Fast mean-brightness checks for detect_black_images.py and simple_black_detector.py.
+
+A failed extraction is (nearly) black, so a checker only needs to know
+whether an image's mean brightness is below a small threshold. Valid
+diagrams are mostly white, which is visible long before the whole PNG is
+decoded:
+
+- PNGs are decoded from a growing prefix of the file, starting at 64 KB.
+  Rows past the prefix stay 0, so the mean of the partial image is a
+  lower bound on the real mean. As soon as that bound reaches the
+  threshold the image cannot be black and decoding stops; otherwise the
+  next prefix is sized from how fast the bound has been growing.
+  Only files ending in an IEND chunk are cut short, so truncated PNGs
+  still fail the full decode.
+- The bound is read from a reduce()d (8x8 box averaged) copy, discounted
+  for rounding, so it costs a fraction of a full-size grayscale
+  conversion. reduce() weights LA/RGBA pixels by alpha while the mean
+  ignores it, so alpha images are converted to grayscale first. Fully decoded images are checked the same way first; only
+  images that may be black get an exact mean.
+- Other formats use Image.draft, so JPEGs are decoded at reduced scale.
+- scan_directory runs the checks in a thread pool; Pillow releases the GIL
+  while decoding, so the threads decode in parallel.
+- update_catalog writes the results back into an extraction catalog JSON.
+- compare_scans checks early-exit results against exact ones (--check).
+"""
+
+import io
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PIL import Image, ImageStat
+
+# mean: exact mean brightness (0-255), or a lower bound when exact is False
+BrightnessScan = namedtuple('BrightnessScan', 'mean exact width height file_size')
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_TRAILER = b'IEND\xaeB`\x82'
+FIRST_CHUNK = 64 * 1024
+PREFIX_MARGIN = 1.25
+REDUCE_FACTOR = 8
+# Modes where an undecoded (zero) pixel converts to black, so a partial mean is a lower bound
+LOWER_BOUND_MODES = {"1", "L", "LA", "RGB", "RGBA"}
+# Modes reduce() would average weighted by alpha
+ALPHA_MODES = {"LA", "RGBA"}
+
+
+def _mean_brightness(img: Image.Image) -> float:
+    return ImageStat.Stat(img.convert('L')).mean[0]
+
+
+def _partial_lower_bound(img: Image.Image) -> Tuple[float, float]:
+    """(lower bound, estimate) of the final mean brightness of a partially decoded image."""
+    width, height = img.size
+    box_w, box_h = width - width % REDUCE_FACTOR, height - height % REDUCE_FACTOR
+    if box_w == 0 or box_h == 0:
+        return 0.0, 0.0
+    if img.mode in ALPHA_MODES:
+        # Drop alpha as _mean_brightness does: transparent black pixels still count as black
+        img = img.convert('L')
+    reduced = img.reduce(REDUCE_FACTOR, box=(0, 0, box_w, box_h))
+    # Box averages and the grayscale conversion each round by up to half a level;
+    # pixels outside the box only add brightness, so dividing by the full area keeps it a bound
+    mean = _mean_brightness(reduced)
+    coverage = (box_w * box_h) / (width * height)
+    return max(0.0, mean - 1.0) * coverage, mean * coverage
+
+
+def _open_prefix(data: bytes) -> Optional[Image.Image]:
+    """Decode as much of a PNG as a prefix of its bytes allows (None if the header is incomplete)."""
+    try:
+        img = Image.open(io.BytesIO(data))
+    except OSError:
+        return None
+    try:
+        img.load()
+    except OSError:
+        if img.mode not in LOWER_BOUND_MODES:
+            return None
+        # Truncated on purpose: keep the rows decoded so far instead of reloading
+        img.tile = []
+    return img
+
+
+def scan_brightness(image_path: str, rule_out_below: Optional[float] = None) -> BrightnessScan:
+    """Mean brightness of an image; with rule_out_below, stop once the mean is known to reach it."""
+    file_size = os.path.getsize(image_path)
+    with open(image_path, 'rb') as f:
+        data = f.read()
+
+    # A PNG cut short during extraction must still fail the full decode below
+    if data.startswith(PNG_SIGNATURE) and data.endswith(PNG_TRAILER) and rule_out_below is not None:
+        size = FIRST_CHUNK
+        # Past half the file a partial decode saves too little to be worth a restart
+        while size <= len(data) // 2:
+            img = _open_prefix(data[:size])
+            if img is not None:
+                if img.mode not in LOWER_BOUND_MODES:
+                    break
+                bound, estimate = _partial_lower_bound(img)
+                if bound >= rule_out_below:
+                    return BrightnessScan(bound, False, img.width, img.height, file_size)
+                if estimate > 0:
+                    # The partial mean grows about in step with the prefix: aim straight past the threshold
+                    size = max(size * 2, int(size * rule_out_below / estimate * PREFIX_MARGIN))
+                    continue
+            size *= 4
+
+    with Image.open(io.BytesIO(data)) as img:
+        width, height = img.size
+        # Reduced-scale decode where the codec supports it (JPEG); a no-op for PNG
+        img.draft('L', (max(1, width // REDUCE_FACTOR), max(1, height // REDUCE_FACTOR)))
+        img.load()
+        if rule_out_below is not None and img.mode in LOWER_BOUND_MODES:
+            bound, _ = _partial_lower_bound(img)
+            if bound >= rule_out_below:
+                return BrightnessScan(bound, False, width, height, file_size)
+        return BrightnessScan(_mean_brightness(img), True, width, height, file_size)
+
+
+def image_size(image_path: str) -> Tuple[int, int]:
+    """Width and height from the image header, without decoding"""
+    with Image.open(image_path) as img:
+        return img.size
+
+
+def scan_directory(directory: str, check: Callable[[str], object],
+                   workers: Optional[int] = None) -> List[Tuple[str, object]]:
+    """(filename, check(path)) for every PNG in a directory, in filename order."""
+    filenames = sorted(f for f in os.listdir(directory) if f.lower().endswith('.png'))
+    paths = [os.path.join(directory, f) for f in filenames]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(zip(filenames, pool.map(check, paths)))
+
+
+def compare_scans(fast: Dict[str, Tuple[bool, float]],
+                  exact: Dict[str, Tuple[bool, float]]) -> List[str]:
+    """Where early-exit results disagree with exact ones.
+
+    Both map filename -> (is_black, brightness). An early-exit scan must
+    classify every image the same way and never report more than the
+    exact brightness.
+    """
+    problems = []
+    for filename in sorted(set(fast) | set(exact)):
+        if filename not in fast or filename not in exact:
+            problems.append(f"{filename}: only scanned {'exactly' if filename in exact else 'with early exit'}")
+            continue
+        (fast_black, bound), (exact_black, mean) = fast[filename], exact[filename]
+        if fast_black != exact_black:
+            problems.append(f"{filename}: {'black' if fast_black else 'valid'} with early exit, "
+                            f"{'black' if exact_black else 'valid'} exactly")
+        elif bound > mean + 1e-6:
+            problems.append(f"{filename}: bound {bound:.2f} above the exact mean {mean:.2f}")
+    return problems
+
+
+def update_catalog(catalog_path: str, results: Dict[str, Dict]) -> int:
+    """Record brightness checks in an extraction catalog; returns the entries updated.
+
+    results maps filename -> {"mean_brightness", "brightness_exact", "likely_failed"}.
+    Entries flagged as failed get extraction_status "failed" (an existing
+    failure is never cleared). Catalogs from enhanced_pdf_extractor.py also
+    get the image added to failed_extractions, so it can be rescued.
+    """
+    with open(catalog_path, 'r') as f:
+        catalog = json.load(f)
+
+    updated = 0
+    failed_files = {entry.get("filename") for entry in catalog.get("failed_extractions", [])}
+    for entry in catalog.get("images", []):
+        result = results.get(entry.get("filename"))
+        if result is None:
+            continue
+        updated += 1
+        entry["quality_check"] = result
+        if not result["likely_failed"]:
+            continue
+
+        status_holder = entry["technical_data"] if "technical_data" in entry else entry
+        status_holder["extraction_status"] = "failed"
+        error = f"Black image detected (brightness: {result['mean_brightness']:.1f})"
+        if "extraction_error" in entry and not entry["extraction_error"]:
+            entry["extraction_error"] = error
+        if "failed_extractions" in catalog and entry["filename"] not in failed_files:
+            failed_files.add(entry["filename"])
+            catalog["failed_extractions"].append({
+                "filename": entry["filename"],
+                "page_number": entry.get("page_number"),
+                "image_index": entry.get("image_index"),
+                "xref": entry.get("xref"),
+                "bbox": entry.get("bbox"),
+                "error": error
+            })
+
+    summary = catalog.get("extraction_summary")
+    if summary and "failed_extractions" in summary and "failed_extractions" in catalog:
+        total = summary.get("total_images", 0)
+        summary["failed_extractions"] = len(catalog["failed_extractions"])
+        summary["successful_extractions"] = total - summary["failed_extractions"]
+        summary["success_rate"] = (summary["successful_extractions"] / total * 100) if total > 0 else 0
+
+    tmp_path = f"{catalog_path}.tmp{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(catalog, f, indent=2)
+    os.replace(tmp_path, catalog_path)
+    return updated
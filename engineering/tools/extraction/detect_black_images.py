@@ -1,64 +1,71 @@
 #!/usr/bin/env python3
 """
 Detect black/failed image extractions by analyzing image content.
-Usage: python detect_black_images.py <directory>
+Usage: python detect_black_images.py <directory> [--catalog catalog.json] [--workers N] [--exact] [--check]
+
+Images are checked in parallel and decoding stops as soon as an image is
+known to be brighter than the threshold (see black_image_scan.py); those
+brightness values are lower bounds, shown as "≥". Use --exact for full means,
+--check to rescan exactly and fail if any early-exit result disagrees.
 """
 
+import argparse
 import os
 import sys
-from PIL import Image
-import numpy as np
 
-def is_black_image(image_path, threshold=5):
+from black_image_scan import compare_scans, scan_brightness, scan_directory, update_catalog
+
+def is_black_image(image_path, threshold=5, exact=False):
     """
     Check if an image is essentially black (extraction failure).
     threshold: Mean pixel value below which image is considered black
+    Returns (is_black, brightness); brightness is a lower bound unless exact
+    (black images always get their exact brightness).
     """
     try:
-        with Image.open(image_path) as img:
-            # Convert to grayscale for analysis
-            gray = img.convert('L')
-            pixels = np.array(gray)
-            mean_brightness = np.mean(pixels)
-            
-            # Check if image is essentially black
-            if mean_brightness < threshold:
-                return True, mean_brightness
-            return False, mean_brightness
+        scan = scan_brightness(image_path, rule_out_below=None if exact else threshold)
+        return scan.mean < threshold, scan.mean
     except Exception as e:
         return None, f"Error: {e}"
 
-def analyze_directory(directory):
+def analyze_directory(directory, threshold=5, exact=False, workers=None):
     """Analyze all PNG files in directory for black images."""
     black_images = []
     valid_images = []
     errors = []
     
-    for filename in sorted(os.listdir(directory)):
-        if filename.lower().endswith('.png'):
-            filepath = os.path.join(directory, filename)
-            result, brightness = is_black_image(filepath)
-            
-            if result is None:
-                errors.append((filename, brightness))
-            elif result:
-                black_images.append((filename, brightness))
-            else:
-                valid_images.append((filename, brightness))
+    check = lambda path: is_black_image(path, threshold, exact)
+    for filename, (result, brightness) in scan_directory(directory, check, workers):
+        if result is None:
+            errors.append((filename, brightness))
+        elif result:
+            black_images.append((filename, brightness))
+        else:
+            valid_images.append((filename, brightness))
     
     return black_images, valid_images, errors
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python detect_black_images.py <directory>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description='Detect black/failed image extractions')
+    parser.add_argument('directory', help='Directory of extracted PNG images')
+    parser.add_argument('--threshold', type=float, default=5,
+                        help='Mean brightness below which an image is black (default: 5)')
+    parser.add_argument('--exact', action='store_true',
+                        help='Compute the full mean of every image (no early exit)')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='Decoder threads (default: Python\'s ThreadPoolExecutor default)')
+    parser.add_argument('--catalog', help='Extraction catalog JSON to update with the results')
+    parser.add_argument('--check', action='store_true',
+                        help='Rescan every image exactly and fail if an early-exit result disagrees')
+    args = parser.parse_args()
     
-    directory = sys.argv[1]
+    directory = args.directory
     if not os.path.exists(directory):
         print(f"Directory not found: {directory}")
         sys.exit(1)
     
-    black_images, valid_images, errors = analyze_directory(directory)
+    black_images, valid_images, errors = analyze_directory(directory, args.threshold, args.exact, args.workers)
+    bound = "" if args.exact else "≥"
     
     print(f"🔍 IMAGE ANALYSIS RESULTS for {directory}")
     print("=" * 60)
@@ -72,14 +79,39 @@ if __name__ == "__main__":
     print(f"✅ VALID IMAGES ({len(valid_images)}):")
     for filename, brightness in valid_images:
         file_size = os.path.getsize(os.path.join(directory, filename)) / 1024
-        print(f"   {filename} (brightness: {brightness:.2f}, {file_size:.1f}KB)")
+        print(f"   {filename} (brightness: {bound}{brightness:.2f}, {file_size:.1f}KB)")
     
     if errors:
         print(f"\n⚠️  ERRORS ({len(errors)}):")
         for filename, error in errors:
             print(f"   {filename}: {error}")
     
+    total_images = len(black_images) + len(valid_images)
+    success_rate = len(valid_images) / total_images * 100 if total_images > 0 else 0
+    
     print(f"\n📊 SUMMARY:")
-    print(f"   Total images: {len(black_images) + len(valid_images)}")
+    print(f"   Total images: {total_images}")
     print(f"   Failed extractions: {len(black_images)}")
-    print(f"   Success rate: {len(valid_images)/(len(black_images)+len(valid_images))*100:.1f}%")
\ No newline at end of file
+    print(f"   Success rate: {success_rate:.1f}%")
+    
+    if args.catalog:
+        results = {filename: {"mean_brightness": round(brightness, 2),
+                              "brightness_exact": is_black or args.exact,
+                              "likely_failed": is_black}
+                   for is_black, images in ((True, black_images), (False, valid_images))
+                   for filename, brightness in images}
+        updated = update_catalog(args.catalog, results)
+        print(f"\n📝 Updated {updated} catalog entries in {args.catalog}")
+    
+    if args.check and not args.exact:
+        scanned = lambda *groups: {filename: (is_black, brightness)
+                                   for is_black, images in zip((True, False), groups)
+                                   for filename, brightness in images}
+        exact_black, exact_valid, _ = analyze_directory(directory, args.threshold, True, args.workers)
+        problems = compare_scans(scanned(black_images, valid_images), scanned(exact_black, exact_valid))
+        if problems:
+            print(f"\n❌ Early exit disagrees with exact means for {len(problems)} images:")
+            for problem in problems:
+                print(f"   {problem}")
+            sys.exit(1)
+        print("\n✅ Early exit agrees with exact means")
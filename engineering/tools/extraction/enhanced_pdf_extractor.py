@@ -2,6 +2,10 @@
 """
 Enhanced PDF Image Extractor with coordinate tracking and intelligent rescue.
 This version saves bounding box coordinates and can properly crop rescued images.
+
+Rescue renders just each failed image's bounding box with PyMuPDF
+(page.get_pixmap(clip=..., dpi=...)), all from one open document, instead
+of rasterizing whole pages through poppler and cropping them.
 """
 
 import fitz  # PyMuPDF
@@ -10,7 +14,6 @@ import sys
 import json
 from pathlib import Path
 import argparse
-from pdf2image import convert_from_path
 from PIL import Image, ImageStat
 
 def extract_images_with_coordinates(pdf_path, output_dir="extracted_images"):
@@ -28,122 +31,135 @@ def extract_images_with_coordinates(pdf_path, output_dir="extracted_images"):
         return []
     
     image_catalog = []
-    total_images = 0
     failed_extractions = []
     
     pdf_name = Path(pdf_path).stem
     
     for page_num in range(len(doc)):
         page = doc.load_page(page_num)
-        image_list = page.get_images(full=True)
-        
-        print(f"\n📄 Page {page_num + 1}: Found {len(image_list)} images")
-        
-        for img_index, img in enumerate(image_list):
+        extract_page_images_with_coordinates(doc, page, page_num, page.get_images(full=True), pdf_name,
+                                             output_dir, image_catalog, failed_extractions)
+    
+    doc.close()
+    
+    return save_enhanced_catalog(pdf_path, output_dir, image_catalog, failed_extractions)
+
+def extract_page_images_with_coordinates(doc, page, page_num, image_list, pdf_name, output_dir,
+                                         image_catalog, failed_extractions):
+    """
+    Extract one (0-based) page's images (page.get_images(full=True)) with coordinates,
+    appending to image_catalog and failed_extractions.
+    """
+    print(f"\n📄 Page {page_num + 1}: Found {len(image_list)} images")
+    
+    for img_index, img in enumerate(image_list):
+        try:
+            # Get image data
+            xref = img[0]
+            pix = fitz.Pixmap(doc, xref)
+            
+            # Skip images that are too small (likely decorative)
+            if pix.width < 50 or pix.height < 50:
+                pix = None
+                continue
+            
+            # Generate filename
+            img_filename = f"{pdf_name}_page{page_num+1:02d}_img{img_index+1:02d}.png"
+            img_path = os.path.join(output_dir, img_filename)
+            
+            # Get image rectangle coordinates
+            image_rects = page.get_image_rects(xref)
+            bbox_coords = None
+            if image_rects:
+                # Use the first rectangle (most common case)
+                rect = image_rects[0]
+                bbox_coords = {
+                    "x0": rect.x0,
+                    "y0": rect.y0, 
+                    "x1": rect.x1,
+                    "y1": rect.y1,
+                    "width": rect.width,
+                    "height": rect.height
+                }
+            
+            # Try to save the image
+            extraction_success = True
+            extraction_error = None
+            
             try:
-                # Get image data
-                xref = img[0]
-                pix = fitz.Pixmap(doc, xref)
-                
-                # Skip images that are too small (likely decorative)
-                if pix.width < 50 or pix.height < 50:
-                    pix = None
-                    continue
-                
-                # Generate filename
-                img_filename = f"{pdf_name}_page{page_num+1:02d}_img{img_index+1:02d}.png"
-                img_path = os.path.join(output_dir, img_filename)
-                
-                # Get image rectangle coordinates
-                image_rects = page.get_image_rects(xref)
-                bbox_coords = None
-                if image_rects:
-                    # Use the first rectangle (most common case)
-                    rect = image_rects[0]
-                    bbox_coords = {
-                        "x0": rect.x0,
-                        "y0": rect.y0, 
-                        "x1": rect.x1,
-                        "y1": rect.y1,
-                        "width": rect.width,
-                        "height": rect.height
-                    }
+                if pix.n - pix.alpha < 4:  # GRAY or RGB
+                    pix.save(img_path)
+                else:  # CMYK: convert to RGB
+                    pix1 = fitz.Pixmap(fitz.csRGB, pix)
+                    pix1.save(img_path)
+                    pix1 = None
                 
-                # Try to save the image
-                extraction_success = True
-                extraction_error = None
+                # Check if extraction actually worked
+                file_size = os.path.getsize(img_path) / 1024  # KB
                 
-                try:
-                    if pix.n - pix.alpha < 4:  # GRAY or RGB
-                        pix.save(img_path)
-                    else:  # CMYK: convert to RGB
-                        pix1 = fitz.Pixmap(fitz.csRGB, pix)
-                        pix1.save(img_path)
-                        pix1 = None
+                # Test the saved image
+                with Image.open(img_path) as test_img:
+                    gray = test_img.convert('L')
+                    stat = ImageStat.Stat(gray)
+                    mean_brightness = stat.mean[0]
                     
-                    # Check if extraction actually worked
-                    file_size = os.path.getsize(img_path) / 1024  # KB
-                    
-                    # Test the saved image
-                    with Image.open(img_path) as test_img:
-                        gray = test_img.convert('L')
-                        stat = ImageStat.Stat(gray)
-                        mean_brightness = stat.mean[0]
-                        
-                        # Consider failed if very dark or suspiciously small
-                        if mean_brightness < 10 or file_size < 5:
-                            extraction_success = False
-                            extraction_error = f"Black image detected (brightness: {mean_brightness:.1f}, size: {file_size:.1f}KB)"
-                
-                except Exception as e:
-                    extraction_success = False
-                    extraction_error = str(e)
-                
-                if not extraction_success:
-                    failed_extractions.append({
-                        "filename": img_filename,
-                        "page_number": page_num + 1,
-                        "image_index": img_index + 1,
-                        "xref": xref,
-                        "bbox": bbox_coords,
-                        "error": extraction_error
-                    })
-                    print(f"  ❌ Failed extraction: {img_filename} - {extraction_error}")
-                else:
-                    print(f"  ✅ Extracted: {img_filename} ({pix.width}×{pix.height})")
-                
-                # Build catalog entry with coordinates
-                catalog_entry = {
+                    # Consider failed if very dark or suspiciously small
+                    if mean_brightness < 10 or file_size < 5:
+                        extraction_success = False
+                        extraction_error = f"Black image detected (brightness: {mean_brightness:.1f}, size: {file_size:.1f}KB)"
+            
+            except Exception as e:
+                extraction_success = False
+                extraction_error = str(e)
+            
+            if not extraction_success:
+                failed_extractions.append({
                     "filename": img_filename,
                     "page_number": page_num + 1,
                     "image_index": img_index + 1,
-                    "dimensions": f"{pix.width}×{pix.height}",
-                    "width": pix.width,
-                    "height": pix.height,
                     "xref": xref,
                     "bbox": bbox_coords,
-                    "extraction_status": "success" if extraction_success else "failed",
-                    "extraction_error": extraction_error if not extraction_success else None,
-                    "file_path": img_path if extraction_success else None
-                }
-                
-                image_catalog.append(catalog_entry)
-                total_images += 1
-                
-                pix = None
-                
-            except Exception as e:
-                print(f"  ❌ Error processing image {img_index + 1}: {e}")
-                failed_extractions.append({
-                    "filename": f"{pdf_name}_page{page_num+1:02d}_img{img_index+1:02d}.png",
-                    "page_number": page_num + 1,
-                    "image_index": img_index + 1,
-                    "error": str(e)
+                    "error": extraction_error
                 })
+                print(f"  ❌ Failed extraction: {img_filename} - {extraction_error}")
+            else:
+                print(f"  ✅ Extracted: {img_filename} ({pix.width}×{pix.height})")
+            
+            # Build catalog entry with coordinates
+            catalog_entry = {
+                "filename": img_filename,
+                "page_number": page_num + 1,
+                "image_index": img_index + 1,
+                "dimensions": f"{pix.width}×{pix.height}",
+                "width": pix.width,
+                "height": pix.height,
+                "xref": xref,
+                "bbox": bbox_coords,
+                "extraction_status": "success" if extraction_success else "failed",
+                "extraction_error": extraction_error if not extraction_success else None,
+                "file_path": img_path if extraction_success else None
+            }
+            
+            image_catalog.append(catalog_entry)
+            
+            pix = None
+            
+        except Exception as e:
+            print(f"  ❌ Error processing image {img_index + 1}: {e}")
+            failed_extractions.append({
+                "filename": f"{pdf_name}_page{page_num+1:02d}_img{img_index+1:02d}.png",
+                "page_number": page_num + 1,
+                "image_index": img_index + 1,
+                "error": str(e)
+            })
+
+def save_enhanced_catalog(pdf_path, output_dir, image_catalog, failed_extractions):
+    """
+    Save the catalog with coordinates (<pdf>_enhanced_catalog.json) and print the summary.
+    """
+    pdf_name = Path(pdf_path).stem
+    total_images = len(image_catalog)
     
-    doc.close()
-    
-    # Save enhanced catalog with coordinates
     catalog_path = os.path.join(output_dir, f"{pdf_name}_enhanced_catalog.json")
     catalog_data = {
         "source_pdf": pdf_path,
@@ -171,9 +187,20 @@ def extract_images_with_coordinates(pdf_path, output_dir="extracted_images"):
     
     return catalog_data
 
+def render_clip(page, bbox, dpi=200):
+    """
+    Render only the bbox region (PDF points) of a page at the given DPI.
+    Returns None when the box lies outside the page.
+    """
+    clip = fitz.Rect(bbox["x0"], bbox["y0"], bbox["x1"], bbox["y1"]) & page.rect
+    if clip.is_empty:
+        return None
+    # Opaque RGB on white, like a poppler page render
+    return page.get_pixmap(clip=clip, dpi=dpi, alpha=False)
+
 def rescue_with_coordinates(pdf_path, catalog_data, output_dir, dpi=200):
     """
-    Use pdf2image + coordinate cropping to rescue failed extractions.
+    Rescue failed extractions by rendering each image's bounding box in-process.
     """
     print(f"\n🔧 COORDINATE-AWARE RESCUE OPERATION")
     print("=" * 50)
@@ -185,10 +212,11 @@ def rescue_with_coordinates(pdf_path, catalog_data, output_dir, dpi=200):
     failed_extractions = catalog_data["failed_extractions"]
     print(f"Attempting to rescue {len(failed_extractions)} failed extractions...")
     
+    # One open document serves every rescue
     doc = fitz.open(pdf_path)
     rescue_count = 0
     
-    # Group failures by page for efficient processing
+    # Group failures by page so each page is loaded once
     failures_by_page = {}
     for failure in failed_extractions:
         page_num = failure["page_number"]
@@ -196,68 +224,37 @@ def rescue_with_coordinates(pdf_path, catalog_data, output_dir, dpi=200):
             failures_by_page[page_num] = []
         failures_by_page[page_num].append(failure)
     
-    for page_num, page_failures in failures_by_page.items():
+    for page_num, page_failures in sorted(failures_by_page.items()):
         print(f"\n📄 Rescuing {len(page_failures)} images from page {page_num}")
         
         try:
-            # Convert page to high-res image
-            pages = convert_from_path(pdf_path, first_page=page_num, last_page=page_num, dpi=dpi)
-            if not pages:
-                print(f"   ❌ Failed to convert page {page_num}")
-                continue
-                
-            page_img = pages[0]
-            page_width, page_height = page_img.size
-            
-            # Get PDF page dimensions
             pdf_page = doc.load_page(page_num - 1)  # 0-indexed
-            pdf_rect = pdf_page.rect
-            pdf_width = pdf_rect.width
-            pdf_height = pdf_rect.height
-            
-            # Calculate scale factors
-            scale_x = page_width / pdf_width
-            scale_y = page_height / pdf_height
-            
-            print(f"   📐 Page: {page_width}×{page_height} pixels, PDF: {pdf_width:.0f}×{pdf_height:.0f} pts")
-            print(f"   📏 Scale factors: {scale_x:.2f}x, {scale_y:.2f}y")
+        except Exception as e:
+            print(f"   ❌ Page {page_num} rescue failed: {e}")
+            continue
+        
+        for failure in page_failures:
+            if not failure.get("bbox"):
+                print(f"   ⚠️ {failure['filename']}: No coordinates available")
+                continue
             
-            for failure in page_failures:
-                if not failure.get("bbox"):
-                    print(f"   ⚠️ {failure['filename']}: No coordinates available")
+            try:
+                pix = render_clip(pdf_page, failure["bbox"], dpi)
+                if pix is None:
+                    print(f"   ⚠️ {failure['filename']}: Bounding box lies outside the page")
                     continue
                 
-                bbox = failure["bbox"]
-                
-                # Convert PDF coordinates to image pixel coordinates
-                left = int(bbox["x0"] * scale_x)
-                top = int(bbox["y0"] * scale_y)
-                right = int(bbox["x1"] * scale_x)
-                bottom = int(bbox["y1"] * scale_y)
+                # Save rescued image
+                rescue_filename = failure["filename"].replace(".png", "_RESCUED_CROPPED.png")
+                rescue_path = os.path.join(output_dir, rescue_filename)
+                pix.save(rescue_path)
                 
-                # Ensure coordinates are within image bounds
-                left = max(0, min(left, page_width))
-                right = max(0, min(right, page_width))
-                top = max(0, min(top, page_height))
-                bottom = max(0, min(bottom, page_height))
+                print(f"   🚀 RESCUED: {rescue_filename} ({pix.width}×{pix.height})")
+                rescue_count += 1
+                pix = None  # Free memory
                 
-                # Crop the specific image region
-                try:
-                    cropped_img = page_img.crop((left, top, right, bottom))
-                    
-                    # Save rescued image
-                    rescue_filename = failure["filename"].replace(".png", "_RESCUED_CROPPED.png")
-                    rescue_path = os.path.join(output_dir, rescue_filename)
-                    cropped_img.save(rescue_path, "PNG")
-                    
-                    print(f"   🚀 RESCUED: {rescue_filename} ({right-left}×{bottom-top})")
-                    rescue_count += 1
-                    
-                except Exception as e:
-                    print(f"   ❌ Crop failed for {failure['filename']}: {e}")
-        
-        except Exception as e:
-            print(f"   ❌ Page {page_num} rescue failed: {e}")
+            except Exception as e:
+                print(f"   ❌ Render failed for {failure['filename']}: {e}")
     
     doc.close()
     
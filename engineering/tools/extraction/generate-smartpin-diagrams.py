@@ -5,12 +5,25 @@ Author: Claude with guidance from Stephen (former Graphviz Debian packager!)
 Purpose: Create both detailed and simplified views of P2 Smart Pin architecture
 
 This version generates DOT files directly and uses the command-line dot tool
+
+Each diagram is rendered by one dot process that writes every requested
+format (one parse, several -T/-o pairs), diagrams render concurrently, and
+outputs whose DOT source is unchanged since the last render are skipped.
+Render hashes live in $P2KB_CACHE_DIR/smartpin-diagrams.json (default
+~/.cache/p2-knowledge-base); use --force or P2KB_NO_CACHE=1 to re-render.
 """
 
+import argparse
+import hashlib
+import json
 import os
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+DOT_COMMAND = '/opt/local/bin/dot'
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "p2-knowledge-base"
+
 def create_simple_dot():
     """
     Create simplified block diagram showing basic signal flow
@@ -373,37 +386,116 @@ def create_quadrature_path_dot():
     neighbor -> router [style=dotted, arrowhead=none];
 }"""
 
-def generate_diagram(dot_content, output_path, formats=['png', 'svg']):
+def source_hash(dot_content, fmt, dot_command=DOT_COMMAND):
+    """
+    Hash of everything that determines one rendered file
+    """
+    return hashlib.sha1(f"{dot_command}\0{fmt}\0{dot_content}".encode()).hexdigest()
+
+class RenderCache:
+    """
+    Source hash and size of each rendered file, by absolute output path
+    """
+    def __init__(self, reuse=True):
+        self.enabled = not os.environ.get("P2KB_NO_CACHE")
+        self.reuse = reuse  # False: re-render everything, but still record the new renders
+        self.path = Path(os.environ.get("P2KB_CACHE_DIR", DEFAULT_CACHE_DIR)) / "smartpin-diagrams.json"
+        self.outputs = {}
+        if self.enabled and self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    self.outputs = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Ignoring unreadable render cache {self.path}: {e}")
+
+    def is_current(self, output_file, digest):
+        entry = self.outputs.get(os.path.abspath(output_file))
+        return (self.enabled and self.reuse and entry is not None and entry['source'] == digest
+                and os.path.exists(output_file) and os.path.getsize(output_file) == entry['size'])
+
+    def record(self, output_file, digest):
+        self.outputs[os.path.abspath(output_file)] = {'source': digest, 'size': os.path.getsize(output_file)}
+
+    def save(self):
+        if not self.enabled:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(f".tmp{os.getpid()}")
+            with open(tmp_path, 'w') as f:
+                json.dump(self.outputs, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not write render cache {self.path}: {e}")
+
+def generate_diagram(dot_content, output_path, formats=['png', 'svg'], cache=None, dot_command=DOT_COMMAND):
     """
     Generate diagram from DOT content using command-line tool
+    All formats come from a single dot run; formats already rendered from
+    this exact source are skipped. Returns True if nothing failed.
     """
-    # Write DOT file
-    dot_path = output_path + '.dot'
-    with open(dot_path, 'w') as f:
-        f.write(dot_content)
-    
-    # Generate each format
+    digests = {fmt: source_hash(dot_content, fmt, dot_command) for fmt in formats}
+    pending = []
     for fmt in formats:
         output_file = f"{output_path}.{fmt}"
-        cmd = ['/opt/local/bin/dot', '-T', fmt, dot_path, '-o', output_file]
-        
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                print(f"✓ Generated: {os.path.basename(output_file)}")
-            else:
-                print(f"✗ Error generating {output_file}: {result.stderr}")
-        except Exception as e:
-            print(f"✗ Failed to run dot command: {e}")
-    
-    # Clean up DOT file
-    os.remove(dot_path)
+        if cache is not None and cache.is_current(output_file, digests[fmt]):
+            print(f"• Up to date: {os.path.basename(output_file)}")
+        else:
+            pending.append(fmt)
+    if not pending:
+        return True
+    
+    # One parse and layout, one -T/-o pair per format; the DOT source goes in on stdin
+    cmd = [dot_command]
+    for fmt in pending:
+        cmd += [f'-T{fmt}', '-o', f"{output_path}.{fmt}"]
+    
+    try:
+        result = subprocess.run(cmd, input=dot_content, capture_output=True, text=True)
+    except Exception as e:
+        print(f"✗ Failed to run dot command: {e}")
+        return False
+    if result.returncode != 0:
+        print(f"✗ Error generating {os.path.basename(output_path)}: {result.stderr}")
+        return False
+    
+    for fmt in pending:
+        output_file = f"{output_path}.{fmt}"
+        if cache is not None:
+            cache.record(output_file, digests[fmt])
+        print(f"✓ Generated: {os.path.basename(output_file)}")
+    return True
+
+def render_diagrams(diagrams, output_dir, workers=None, cache=None, dot_command=DOT_COMMAND):
+    """
+    Render (name, dot_content, formats) diagrams concurrently; returns the names that failed
+    """
+    def render(diagram):
+        name, dot_content, formats = diagram
+        output_path = os.path.join(output_dir, name)
+        return generate_diagram(dot_content, output_path, formats, cache, dot_command)
+    
+    # dot runs as a subprocess, so threads are enough to keep several going
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        results = list(pool.map(render, diagrams))
+    if cache is not None:
+        cache.save()
+    return [name for (name, _, _), ok in zip(diagrams, results) if not ok]
 
 def main():
     """
     Generate all diagram variants
     """
-    output_dir = '/Users/stephen/Projects/Projects-ExtGit/IronSheepProductionsLLC/Propeller2/P2-Language-Study/P2-Knowledge-Base/exports/pdf-generation/outbound/P2-Smart-Pins-Reference/assets'
+    parser = argparse.ArgumentParser(description='Generate Smart Pin architecture diagrams')
+    parser.add_argument('-o', '--output-dir',
+                        default='/Users/stephen/Projects/Projects-ExtGit/IronSheepProductionsLLC/Propeller2/P2-Language-Study/P2-Knowledge-Base/exports/pdf-generation/outbound/P2-Smart-Pins-Reference/assets',
+                        help='Directory for the rendered diagrams')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='Concurrent dot processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Re-render diagrams even if unchanged')
+    parser.add_argument('--dot', default=DOT_COMMAND, help=f'Graphviz dot binary (default: {DOT_COMMAND})')
+    args = parser.parse_args()
+    output_dir = args.output_dir
     
     # Create output directory if it doesn't exist
     Path(output_dir).mkdir(parents=True, exist_ok=True)
@@ -420,10 +512,11 @@ def main():
     print("Generating Smart Pin architecture diagrams...")
     print(f"Output directory: {output_dir}\n")
     
-    for name, dot_content, formats in diagrams:
-        output_path = os.path.join(output_dir, name)
-        generate_diagram(dot_content, output_path, formats)
+    failed = render_diagrams(diagrams, output_dir, args.workers, RenderCache(reuse=not args.force), args.dot)
     
+    if failed:
+        print(f"\n✗ {len(failed)} diagram(s) failed: {', '.join(failed)}")
+        raise SystemExit(1)
     print(f"\n✅ All diagrams generated successfully!")
     print(f"Location: {output_dir}")
 
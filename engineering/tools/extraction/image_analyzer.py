@@ -2,22 +2,69 @@
 """
 Image content analyzer for Smart Pins images.
 Uses PIL to analyze image characteristics and improve classification.
+
+The pixel statistics are whole-array numpy operations (block variances by
+reshaping, colour counts on packed pixels), images are analyzed in a
+process pool, and results are cached by the SHA-1 of the image file in
+$P2KB_CACHE_DIR/image-analysis.json (default ~/.cache/p2-knowledge-base),
+so re-running over an unchanged catalog only reads the files.
+Set P2KB_NO_CACHE=1 to bypass the cache.
 """
 
 import os
 import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image
 import numpy as np
 from pathlib import Path
 import re
 
+# Bump when the analysis changes, so cached results are recomputed
+ANALYZER_VERSION = 2
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "p2-knowledge-base"
+# Count colours with np.bincount only when there are at least 1/N as many pixels as bins
+BINCOUNT_PIXELS_PER_BIN = 4
+
+def _to_gray(img_array):
+    """Grayscale as the analyzer has always computed it (plain channel mean)."""
+    if len(img_array.shape) == 2:
+        return img_array
+    return np.mean(img_array, axis=2).astype(np.uint8)
+
+def _count_colors(img_array):
+    """Number of distinct pixel values in an HxWxC uint8 array."""
+    channels = img_array.shape[2]
+    if img_array.dtype != np.uint8 or channels > 4:
+        return len(np.unique(img_array.reshape(-1, channels), axis=0))
+    
+    # Pack each pixel into one uint32 (R<<16 | G<<8 | B, plus A<<24)
+    flat = img_array.reshape(-1, channels).astype(np.uint32)
+    packed = flat[:, 0].copy()
+    for c in range(1, channels):
+        packed = (packed << 8) | flat[:, c]
+    
+    # A bin per possible value beats sorting only when the image is large next to the bins
+    # (a 2^24-bin count is 128 MB, so RGB images get it only from 4M pixels up)
+    bins = 1 << (8 * channels)
+    if channels <= 3 and bins <= packed.size * BINCOUNT_PIXELS_PER_BIN:
+        return int(np.count_nonzero(np.bincount(packed, minlength=bins)))
+    return len(np.unique(packed))
+
+def _analyze_file(image_path: str) -> dict:
+    """Process-pool entry point."""
+    return ImageContentAnalyzer(os.path.dirname(image_path)).analyze_image(image_path)
+
 class ImageContentAnalyzer:
     """Analyze image content to improve semantic classification."""
     
-    def __init__(self, image_dir: str):
+    def __init__(self, image_dir: str, workers: int = None, use_cache: bool = True):
         """Initialize analyzer with image directory."""
         self.image_dir = image_dir
         self.images = {}
+        self.workers = workers  # None: one process per CPU
+        self.use_cache = use_cache and not os.environ.get("P2KB_NO_CACHE")
+        self.cache_path = Path(os.environ.get("P2KB_CACHE_DIR", DEFAULT_CACHE_DIR)) / "image-analysis.json"
         
     def analyze_image(self, image_path: str) -> dict:
         """Analyze image characteristics without OCR."""
@@ -32,16 +79,19 @@ class ImageContentAnalyzer:
             "characteristics": {}
         }
         
+        # Grayscale once for all the pattern checks below
+        gray = _to_gray(img_array)
+        
         # Analyze color distribution
         if len(img_array.shape) == 3:  # Color image
             # Check for specific colors that indicate diagram types
-            unique_colors = len(np.unique(img_array.reshape(-1, img_array.shape[2]), axis=0))
+            unique_colors = _count_colors(img_array)
             analysis["characteristics"]["unique_colors"] = unique_colors
             analysis["characteristics"]["is_monochrome"] = unique_colors < 10
             
             # Check for waveform patterns (repeating horizontal patterns)
-            analysis["characteristics"]["has_grid"] = self._detect_grid_pattern(img_array)
-            analysis["characteristics"]["has_waveform"] = self._detect_waveform_pattern(img_array)
+            analysis["characteristics"]["has_grid"] = self._detect_grid_pattern(gray)
+            analysis["characteristics"]["has_waveform"] = self._detect_waveform_pattern(gray)
         
         # Analyze aspect ratio
         width, height = img.size
@@ -51,21 +101,16 @@ class ImageContentAnalyzer:
         analysis["characteristics"]["is_tall"] = aspect_ratio < 0.7  # State machines might be tall
         
         # Detect text regions (areas with high frequency changes)
-        analysis["characteristics"]["text_density"] = self._estimate_text_density(img_array)
+        analysis["characteristics"]["text_density"] = self._estimate_text_density(gray)
         
         # Classify based on characteristics
         analysis["improved_classification"] = self._classify_from_characteristics(analysis["characteristics"])
         
         return analysis
     
-    def _detect_grid_pattern(self, img_array):
+    def _detect_grid_pattern(self, gray):
         """Detect if image has a grid pattern (common in timing diagrams)."""
         # Simple check: look for regular vertical/horizontal lines
-        if len(img_array.shape) == 2:  # Grayscale
-            gray = img_array
-        else:
-            # Convert to grayscale
-            gray = np.mean(img_array, axis=2).astype(np.uint8)
         
         # Check for horizontal lines (common in timing diagrams)
         horizontal_variance = np.var(gray, axis=1)
@@ -75,14 +120,10 @@ class ImageContentAnalyzer:
         vertical_variance = np.var(gray, axis=0)
         regular_verticals = np.sum(vertical_variance < 100) > gray.shape[1] * 0.1
         
-        return regular_horizontals and regular_verticals
+        return bool(regular_horizontals and regular_verticals)
     
-    def _detect_waveform_pattern(self, img_array):
+    def _detect_waveform_pattern(self, gray):
         """Detect waveform-like patterns."""
-        if len(img_array.shape) == 2:
-            gray = img_array
-        else:
-            gray = np.mean(img_array, axis=2).astype(np.uint8)
         
         # Look for sharp transitions (edges) that indicate signal changes
         # Simple edge detection using differences
@@ -94,29 +135,29 @@ class ImageContentAnalyzer:
         # Check if we have periodic vertical edges
         has_regular_edges = np.sum(edge_columns > gray.shape[0] * 0.2) > 10
         
-        return has_regular_edges
+        return bool(has_regular_edges)
     
-    def _estimate_text_density(self, img_array):
+    def _estimate_text_density(self, gray):
         """Estimate how much of the image is likely text."""
-        if len(img_array.shape) == 2:
-            gray = img_array
-        else:
-            gray = np.mean(img_array, axis=2).astype(np.uint8)
-        
         # Text areas have high local variance
-        # Calculate local variance using a sliding window
+        # Local variance over non-overlapping 10x10 windows (the same windows as
+        # stepping i, j in range(0, size - 10, 10)), computed on a reshaped view
         window_size = 10
-        local_vars = []
+        rows = len(range(0, gray.shape[0] - window_size, window_size))
+        cols = len(range(0, gray.shape[1] - window_size, window_size))
+        if rows == 0 or cols == 0:
+            return 0
         
-        for i in range(0, gray.shape[0] - window_size, window_size):
-            for j in range(0, gray.shape[1] - window_size, window_size):
-                window = gray[i:i+window_size, j:j+window_size]
-                local_vars.append(np.var(window))
+        windows = gray[:rows * window_size, :cols * window_size].astype(np.int64)
+        windows = windows.reshape(rows, window_size, cols, window_size)
+        n = window_size * window_size
+        sums = windows.sum(axis=(1, 3))
+        square_sums = (windows * windows).sum(axis=(1, 3))
         
         # High variance regions likely contain text or detailed patterns
-        high_var_ratio = np.sum(np.array(local_vars) > 500) / len(local_vars) if local_vars else 0
-        
-        return high_var_ratio
+        # var > 500  <=>  n * sum(x^2) - sum(x)^2 > 500 * n^2 (exact in integers)
+        high_var = (n * square_sums - sums * sums) > 500 * n * n
+        return float(np.count_nonzero(high_var) / high_var.size)
     
     def _classify_from_characteristics(self, chars):
         """Improved classification based on image characteristics."""
@@ -160,15 +201,67 @@ class ImageContentAnalyzer:
         
         return max(scores.items(), key=lambda x: x[1])[0]
     
+    def _load_cache(self) -> dict:
+        if not self.use_cache or not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable analysis cache {self.cache_path}: {e}")
+            return {}
+        return cache.get("results", {}) if cache.get("version") == ANALYZER_VERSION else {}
+    
+    def _save_cache(self, cached: dict):
+        if not self.use_cache:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(f".tmp{os.getpid()}")
+            with open(tmp_path, 'w') as f:
+                json.dump({"version": ANALYZER_VERSION, "results": cached}, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Warning: Could not write analysis cache {self.cache_path}: {e}")
+    
     def analyze_all_images(self):
-        """Analyze all images in directory."""
+        """Analyze all images in directory (cached by content, new ones in parallel)."""
+        image_files = sorted(Path(self.image_dir).glob("*.png"))
+        cached = self._load_cache()
+        
+        digests = {}
         results = {}
+        pending = []
+        for img_file in image_files:
+            digest = hashlib.sha1(img_file.read_bytes()).hexdigest()
+            digests[img_file.name] = digest
+            if digest in cached:
+                results[img_file.name] = self._from_cache(cached[digest], img_file)
+            else:
+                pending.append(img_file)
         
-        for img_file in Path(self.image_dir).glob("*.png"):
-            print(f"Analyzing {img_file.name}...")
-            results[img_file.name] = self.analyze_image(str(img_file))
+        if pending:
+            print(f"Analyzing {len(pending)} images ({len(results)} cached)...")
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                for img_file, analysis in zip(pending, pool.map(_analyze_file, [str(f) for f in pending],
+                                                                 chunksize=4)):
+                    print(f"Analyzed {img_file.name}")
+                    results[img_file.name] = analysis
+                    cached[digests[img_file.name]] = {k: v for k, v in analysis.items()
+                                                      if k not in ("path", "filename")}
+            self._save_cache(cached)
+        else:
+            print(f"All {len(results)} images cached")
         
-        return results
+        # Sorted by filename, whichever images came from the cache
+        return {f.name: results[f.name] for f in image_files}
+    
+    @staticmethod
+    def _from_cache(entry: dict, img_file: Path) -> dict:
+        analysis = {"path": str(img_file), "filename": img_file.name}
+        analysis.update(entry)
+        analysis["dimensions"] = tuple(analysis["dimensions"])
+        return analysis
     
     def create_correction_map(self, catalog_path: str):
         """Create a correction map for the existing catalog."""
@@ -211,6 +304,10 @@ def main():
                       help='Catalog JSON path')
     parser.add_argument('--show-chars', action='store_true',
                       help='Show detailed characteristics for each image')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                      help='Worker processes for uncached images (default: one per CPU)')
+    parser.add_argument('--no-cache', action='store_true',
+                      help='Re-analyze every image, ignoring cached results')
     
     args = parser.parse_args()
     
@@ -220,7 +317,7 @@ def main():
         args.dir = os.path.join(base, args.dir)
         args.catalog = os.path.join(base, args.catalog)
     
-    analyzer = ImageContentAnalyzer(args.dir)
+    analyzer = ImageContentAnalyzer(args.dir, workers=args.workers, use_cache=not args.no_cache)
     
     if args.show_chars:
         # Show detailed analysis
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+PDF Extraction Engine
+Single pass over a PDF that feeds every page to pluggable visitors.
+
+Each extractor script opens the PDF and walks every page on its own, so
+extracting images, coordinates, code and Smart Pin context from one manual
+loads and text-extracts every page once per script. The engine opens the
+document once and hands each page, in order, to a list of visitors as a
+PageContext. The context loads the page once and reads its plain text,
+text layout and image list on first use, so the visitors share them.
+
+Visitors see a page in the order they are listed, so a visitor can rely on
+what an earlier one recorded for the same page: the enhanced image visitor
+uses the headings the structure visitor has collected so far, the Smart Pin
+image visitor the mode the mode visitor found.
+
+Extractions (each writes the same files as its standalone script):
+    images         structure + images with rich context   pdf_image_extractor_enhanced.py
+    coordinates    images with bounding boxes for rescue   enhanced_pdf_extractor.py
+    code           Spin2/PASM2 code blocks                 source-code-extractor.py
+    smartpins      mode scan + images with mode context    pdf_image_extractor_smartpins.py
+
+Usage:
+    python3 pdf_extraction_engine.py manual.pdf -o extracted/ [--extract images,code] [--check]
+
+Each extraction writes to its own subdirectory of the output directory.
+--check then runs each standalone script into a temporary directory and
+compares its files with the engine's (PNGs byte for byte, catalogs with
+paths and dates masked), exiting with an error if any differ.
+"""
+
+import argparse
+import importlib
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import fitz  # PyMuPDF
+
+import enhanced_pdf_extractor
+from pdf_image_extractor_enhanced import EnhancedPDFImageExtractor, PageLayout
+from pdf_image_extractor_smartpins import SmartPinsImageExtractor
+
+# The code extractor's file name is not a valid identifier
+source_code_extractor = importlib.import_module("source-code-extractor")
+
+
+class PageContext:
+    """One loaded page and what has been read from it so far."""
+
+    def __init__(self, doc, page_num: int):
+        self.doc = doc
+        self.page_num = page_num  # 0-based
+        self.page = doc.load_page(page_num)
+        self._text: Optional[str] = None
+        self._text_dict: Optional[Dict] = None
+        self._layout: Optional[PageLayout] = None
+        self._images: Optional[List] = None
+
+    def text(self) -> str:
+        """Plain page text (page.get_text())"""
+        if self._text is None:
+            self._text = self._layout.text(self.page) if self._layout else self.page.get_text()
+        return self._text
+
+    def text_dict(self) -> Dict:
+        """page.get_text("dict") with the default flags, as every standalone extractor reads it"""
+        if self._text_dict is None:
+            self._text_dict = self.page.get_text("dict")
+        return self._text_dict
+
+    def layout(self) -> PageLayout:
+        """Text blocks and block index of the page, from text_dict()"""
+        if self._layout is None:
+            self._layout = PageLayout(self.page, self._text, self.text_dict())
+        return self._layout
+
+    def images(self) -> List:
+        """page.get_images(full=True)"""
+        if self._images is None:
+            self._images = self.page.get_images(full=True)
+        return self._images
+
+
+class PageVisitor:
+    """Receives every page of a document, in order; override what you need."""
+
+    def start(self, doc):
+        """Called once with the open document, before the first page"""
+
+    def visit(self, ctx: PageContext):
+        """Called once per page"""
+
+    def finish(self):
+        """Called after the last page (the document is still open)"""
+
+
+class ExtractionEngine:
+    """Walk a PDF once, dispatching each page to every visitor."""
+
+    def __init__(self, pdf_path: str, visitors: List[PageVisitor]):
+        self.pdf_path = pdf_path
+        self.visitors = visitors
+
+    def run(self) -> bool:
+        try:
+            doc = fitz.open(self.pdf_path)
+            print(f"✅ Opened PDF: {self.pdf_path}")
+            print(f"📄 Pages: {len(doc)}")
+        except Exception as e:
+            print(f"❌ Error opening PDF: {e}")
+            return False
+
+        try:
+            for visitor in self.visitors:
+                visitor.start(doc)
+            for page_num in range(len(doc)):
+                ctx = PageContext(doc, page_num)
+                for visitor in self.visitors:
+                    visitor.visit(ctx)
+            for visitor in self.visitors:
+                visitor.finish()
+        finally:
+            doc.close()
+        return True
+
+
+class DocumentStructureVisitor(PageVisitor):
+    """Outline and headings into an EnhancedPDFImageExtractor's document_structure."""
+
+    def __init__(self, extractor: EnhancedPDFImageExtractor):
+        self.extractor = extractor
+
+    def start(self, doc):
+        self.extractor.document_structure = {"outline": [], "total_pages": 0, "sections": {}}
+        self.extractor._add_outline(doc)
+
+    def visit(self, ctx: PageContext):
+        layout = ctx.layout()
+        if self.extractor.use_layout_cache:
+            self.extractor._page_layouts[ctx.page_num + 1] = layout
+        self.extractor._add_page_headings(ctx.page_num + 1, layout)
+
+
+class EnhancedImageVisitor(PageVisitor):
+    """Images with rich context (pdf_image_extractor_enhanced.py catalogs).
+
+    Section hierarchy comes from the document structure, so list a
+    DocumentStructureVisitor for the same extractor before this one.
+    """
+
+    def __init__(self, extractor: EnhancedPDFImageExtractor):
+        self.extractor = extractor
+        self.catalog: List[Dict] = []
+
+    def start(self, doc):
+        print(f"🚀 Enhanced Extraction Starting: {self.extractor.pdf_name}")
+        print(f"📋 Document ID: {self.extractor.doc_id}")
+
+    def visit(self, ctx: PageContext):
+        image_list = ctx.images()
+        if not image_list:
+            return
+        if self.extractor.use_layout_cache:
+            self.extractor._page_layouts.setdefault(ctx.page_num + 1, ctx.layout())
+        self.catalog.extend(self.extractor._extract_page(ctx.doc, ctx.page, ctx.page_num, image_list))
+
+    def finish(self):
+        self.extractor.image_catalog = self.extractor._assign_global_ids(self.catalog)
+        print(f"\n🎯 Extraction Complete: {len(self.extractor.image_catalog)} images")
+        self.extractor.save_catalogs()
+
+
+class CoordinateImageVisitor(PageVisitor):
+    """Images with bounding boxes for rescue (enhanced_pdf_extractor.py catalog)."""
+
+    def __init__(self, pdf_path: str, output_dir: str):
+        self.pdf_path = pdf_path
+        self.output_dir = output_dir
+        self.pdf_name = Path(pdf_path).stem
+        self.image_catalog: List[Dict] = []
+        self.failed_extractions: List[Dict] = []
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    def visit(self, ctx: PageContext):
+        enhanced_pdf_extractor.extract_page_images_with_coordinates(
+            ctx.doc, ctx.page, ctx.page_num, ctx.images(), self.pdf_name, self.output_dir,
+            self.image_catalog, self.failed_extractions)
+
+    def finish(self):
+        enhanced_pdf_extractor.save_enhanced_catalog(self.pdf_path, self.output_dir,
+                                                     self.image_catalog, self.failed_extractions)
+
+
+class CodeBlockVisitor(PageVisitor):
+    """Spin2/PASM2 code blocks (source-code-extractor.py files and catalog), using its page memo."""
+
+    def __init__(self, pdf_path: str, output_dir: str, use_cache: bool = True):
+        self.pdf_name = Path(pdf_path).stem
+        self.output_dir = output_dir
+        self.memo = source_code_extractor.PageMemo(pdf_path, use_cache)
+        self.code_blocks: List[Dict] = []
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    def visit(self, ctx: PageContext):
+        key = source_code_extractor.PageMemo.key(source_code_extractor.page_digest(ctx.page, self.memo.objects), ctx.page_num)
+        blocks = self.memo.get(key)
+        if blocks is None:
+            page_text = source_code_extractor.clean_code_text(ctx.text())
+            blocks = source_code_extractor.extract_page_blocks(page_text, ctx.page_num, self.pdf_name)
+            self.memo.put(key, blocks)
+
+        if blocks:
+            print(f"📋 Page {ctx.page_num + 1}: Found {len(blocks)} code blocks")
+            for block in blocks:
+                block['source_pdf'] = self.pdf_name
+                self.code_blocks.append(block)
+
+    def finish(self):
+        self.memo.save()
+        source_code_extractor.write_code_outputs(self.code_blocks, self.pdf_name, self.output_dir)
+
+
+class SmartPinModeVisitor(PageVisitor):
+    """Smart Pin mode in effect on each page, into a SmartPinsImageExtractor's mode_page_map."""
+
+    def __init__(self, extractor: SmartPinsImageExtractor):
+        self.extractor = extractor
+
+    def start(self, doc):
+        print("🔍 Scanning for Smart Pin modes...")
+        self.extractor.current_mode = None
+        self.extractor.current_mode_name = None
+        self.extractor.mode_page_map = {}
+
+    def visit(self, ctx: PageContext):
+        self.extractor._scan_mode_page(ctx.page_num, ctx.text())
+
+
+class SmartPinImageVisitor(PageVisitor):
+    """Images with Smart Pin mode context (pdf_image_extractor_smartpins.py catalogs).
+
+    List a SmartPinModeVisitor for the same extractor before this one.
+    """
+
+    def __init__(self, extractor: SmartPinsImageExtractor):
+        self.extractor = extractor
+        self.catalog: List[Dict] = []
+
+    def start(self, doc):
+        print(f"🚀 Smart Pins Extraction Starting: {self.extractor.pdf_name}")
+        print(f"📋 Document ID: {self.extractor.doc_id}")
+
+    def visit(self, ctx: PageContext):
+        image_list = ctx.images()
+        if not image_list:
+            return
+        page_number = ctx.page_num + 1
+        # The layout's index is built from the same get_text("dict") as _block_index would read
+        self.extractor._block_indexes.setdefault(page_number, ctx.layout().index)
+        self.extractor._page_texts.setdefault(page_number, ctx.text())
+        self.catalog.extend(self.extractor._extract_page(ctx.doc, ctx.page, ctx.page_num, image_list))
+
+    def finish(self):
+        mode_image_counts = self.extractor._assign_global_ids(self.catalog)
+        self.extractor.image_catalog = self.catalog
+
+        print("\n📊 Mode Distribution:")
+        for mode, count in sorted(mode_image_counts.items()):
+            mode_name = self.extractor.mode_descriptions.get(mode, self.extractor.SMART_PIN_MODES.get(mode, "unknown"))
+            print(f"  {mode}: {count} images - {mode_name}")
+        print(f"\n🎯 Extraction Complete: {len(self.extractor.image_catalog)} images")
+        self.extractor.save_catalogs()
+
+
+EXTRACTIONS = ("images", "coordinates", "code", "smartpins")
+
+
+def build_visitors(pdf_path: str, output_dir: str, extractions: List[str],
+                   use_cache: bool = True) -> List[PageVisitor]:
+    """Visitors for the named extractions, each writing to output_dir/<extraction>"""
+    visitors: List[PageVisitor] = []
+    for name in extractions:
+        target = os.path.join(output_dir, name)
+        if name == "images":
+            extractor = EnhancedPDFImageExtractor(pdf_path, target)
+            visitors += [DocumentStructureVisitor(extractor), EnhancedImageVisitor(extractor)]
+        elif name == "coordinates":
+            visitors.append(CoordinateImageVisitor(pdf_path, target))
+        elif name == "code":
+            visitors.append(CodeBlockVisitor(pdf_path, target, use_cache))
+        elif name == "smartpins":
+            extractor = SmartPinsImageExtractor(pdf_path, target)
+            visitors += [SmartPinModeVisitor(extractor), SmartPinImageVisitor(extractor)]
+        else:
+            raise ValueError(f"Unknown extraction: {name} (choose from {', '.join(EXTRACTIONS)})")
+    return visitors
+
+
+def run_standalone(pdf_path: str, output_dir: str, name: str) -> None:
+    """Run one extraction the way its standalone script does"""
+    if name == "images":
+        extractor = EnhancedPDFImageExtractor(pdf_path, output_dir)
+        extractor.extract_images()
+        extractor.save_catalogs()
+    elif name == "coordinates":
+        enhanced_pdf_extractor.extract_images_with_coordinates(pdf_path, output_dir)
+    elif name == "code":
+        source_code_extractor.extract_code_from_pdf(pdf_path, output_dir, use_cache=False)
+    elif name == "smartpins":
+        extractor = SmartPinsImageExtractor(pdf_path, output_dir)
+        extractor.extract_images()
+        extractor.save_catalogs()
+
+
+# Extraction dates and times written into catalogs and their markdown
+DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}(T[\d:.]+)?')
+
+
+def _comparable(path: Path, output_dir: str) -> bytes:
+    """File contents with the output directory and dates masked (images as they are)"""
+    data = path.read_bytes()
+    if path.suffix not in ('.json', '.md'):
+        return data
+    text = data.decode('utf-8').replace(output_dir, '<output>')
+    return DATE_PATTERN.sub('<date>', text).encode('utf-8')
+
+
+def check_parity(pdf_path: str, output_dir: str, extractions: List[str]) -> List[str]:
+    """Files where the engine's output differs from the standalone scripts'"""
+    differences = []
+    for name in extractions:
+        engine_dir = os.path.join(output_dir, name)
+        with tempfile.TemporaryDirectory(prefix=f"parity-{name}-") as standalone_dir:
+            print(f"\n🔁 Parity check: standalone {name} extraction")
+            run_standalone(pdf_path, standalone_dir, name)
+            engine_files = {p.relative_to(engine_dir) for p in Path(engine_dir).rglob('*') if p.is_file()}
+            standalone_files = {p.relative_to(standalone_dir) for p in Path(standalone_dir).rglob('*') if p.is_file()}
+            for rel in sorted(engine_files ^ standalone_files):
+                where = "engine" if rel in engine_files else "standalone"
+                differences.append(f"{name}/{rel}: only in {where} output")
+            for rel in sorted(engine_files & standalone_files):
+                if (_comparable(Path(engine_dir, rel), engine_dir)
+                        != _comparable(Path(standalone_dir, rel), standalone_dir)):
+                    differences.append(f"{name}/{rel}: contents differ")
+    return differences
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run several PDF extractions in one pass over the document')
+    parser.add_argument('pdf_path', help='Path to PDF file')
+    parser.add_argument('-o', '--output', default=None,
+                        help='Output directory, one subdirectory per extraction (default: extracted_<pdf name>)')
+    parser.add_argument('--extract', default='images,coordinates,code',
+                        help=f'Comma-separated extractions: {", ".join(EXTRACTIONS)} (default: images,coordinates,code)')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore the code extractor\'s page memo')
+    parser.add_argument('--check', action='store_true',
+                        help='Re-run each extraction standalone and fail if its output differs')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.pdf_path):
+        print(f"❌ PDF file not found: {args.pdf_path}")
+        sys.exit(1)
+
+    output_dir = args.output or f"extracted_{Path(args.pdf_path).stem}"
+    extractions = [name.strip() for name in args.extract.split(',') if name.strip()]
+    try:
+        visitors = build_visitors(args.pdf_path, output_dir, extractions, use_cache=not args.no_cache)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    if not ExtractionEngine(args.pdf_path, visitors).run():
+        sys.exit(1)
+    print(f"\n⏱️  {', '.join(extractions)} extracted in one pass: {time.perf_counter() - start:.1f}s")
+    print(f"📁 Output directory: {output_dir}")
+
+    if args.check:
+        differences = check_parity(args.pdf_path, output_dir, extractions)
+        if differences:
+            print(f"\n❌ Engine output differs from the standalone scripts in {len(differences)} files:")
+            for difference in differences:
+                print(f"  {difference}")
+            sys.exit(1)
+        print("\n✅ Engine output matches the standalone scripts")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,8 @@ import argparse
 from pdf2image import convert_from_path
 from PIL import Image
 
+from pdf_image_store import ImageStore
+
 def extract_images_from_pdf(pdf_path, output_dir="extracted_images"):
     """
     Extract all images from a PDF document at original quality with context.
@@ -39,6 +41,9 @@ def extract_images_from_pdf(pdf_path, output_dir="extracted_images"):
     image_catalog = []
     total_images = 0
     
+    # Each distinct image is decoded and written (and rescued) once
+    image_store = ImageStore()
+    
     # Extract images from each page
     for page_num in range(len(doc)):
         page = doc.load_page(page_num)
@@ -47,46 +52,20 @@ def extract_images_from_pdf(pdf_path, output_dir="extracted_images"):
         print(f"\n📄 Page {page_num + 1}: Found {len(image_list)} images")
         
         for img_index, img in enumerate(image_list):
-            # Get image data
+            # Get image data (an image already written is referenced, not decoded again)
             xref = img[0]  # Image reference number
-            pix = fitz.Pixmap(doc, xref)
-            
-            # Skip if image is too small (likely decorative)
-            if pix.width < 50 or pix.height < 50:
-                print(f"  ⏭️  Skipping small image: {pix.width}×{pix.height}")
-                pix = None
+            digest = image_store.digest(doc, xref)
+            stored = image_store.get(digest)
+            duplicate = stored is not None
+            if not duplicate:
+                stored = store_image(doc, xref, digest, image_store, pdf_path, page_num, img_index, img, output_dir)
+            if stored["skipped"]:
+                print(f"  {stored['skipped']}")
                 continue
             
-            # Generate filename
+            img_filename = stored["filename"]
+            is_placeholder = stored["placeholder"]
             pdf_name = Path(pdf_path).stem
-            img_filename = f"{pdf_name}_page{page_num+1:02d}_img{img_index+1:02d}"
-            
-            # Determine format and save
-            if pix.n - pix.alpha < 4:  # GRAY or RGB
-                img_filename += ".png"
-                img_path = os.path.join(output_dir, img_filename)
-                pix.save(img_path)
-            else:  # CMYK: convert to RGB
-                pix1 = fitz.Pixmap(fitz.csRGB, pix)
-                img_filename += ".png"
-                img_path = os.path.join(output_dir, img_filename)
-                pix1.save(img_path)
-                pix1 = None
-            
-            # Check if this is a warning triangle placeholder
-            file_size = os.path.getsize(img_path)
-            is_placeholder = detect_placeholder_image(img_path, file_size)
-            
-            if is_placeholder:
-                print(f"  ⚠️  WARNING: Placeholder detected - {img_filename} (extraction failed)")
-                
-                # Attempt rescue with pdf2image
-                rescue_success = attempt_image_rescue(pdf_path, page_num, img_index, img_filename, output_dir, img)
-                if rescue_success:
-                    # Update file size and status after rescue
-                    file_size = os.path.getsize(img_path)
-                    is_placeholder = False
-                    print(f"  🚀 RESCUE SUCCESS: {img_filename} recovered with pdf2image!")
             
             # Extract surrounding text for context/captions (skip for placeholders)
             text_context = {} if is_placeholder else extract_image_context(page, img)
@@ -94,26 +73,29 @@ def extract_images_from_pdf(pdf_path, output_dir="extracted_images"):
             # Collect metadata with context
             image_metadata = {
                 "filename": img_filename,
+                "duplicate_of": img_filename if duplicate else None,
                 "source_pdf": os.path.basename(pdf_path),
                 "page_number": page_num + 1,
                 "image_index": img_index + 1,
-                "dimensions": f"{pix.width}×{pix.height}",
-                "width": pix.width,
-                "height": pix.height,
-                "colorspace": pix.colorspace.name if pix.colorspace else "Unknown",
-                "alpha": bool(pix.alpha),
-                "file_path": img_path,
+                "dimensions": f"{stored['width']}×{stored['height']}",
+                "width": stored["width"],
+                "height": stored["height"],
+                "colorspace": stored["colorspace"],
+                "alpha": stored["alpha"],
+                "file_path": stored["file_path"],
                 "xref": xref,
+                "content_digest": digest,
                 "extraction_status": "failed" if is_placeholder else "success",
-                "file_size_bytes": file_size,
+                "file_size_bytes": stored["file_size_bytes"],
                 "context": text_context,
                 "suggested_tags": []
             }
             
             # Add suggested tags based on content analysis
-            if pix.width > 800 or pix.height > 800:
+            width, height = stored["width"], stored["height"]
+            if width > 800 or height > 800:
                 image_metadata["suggested_tags"].append("high-resolution")
-            if pix.width / pix.height > 3 or pix.height / pix.width > 3:
+            if width / height > 3 or height / width > 3:
                 image_metadata["suggested_tags"].append("diagram")
             if "64019" in pdf_name or "64029" in pdf_name or "64020" in pdf_name:
                 image_metadata["suggested_tags"].append("breakout-board")
@@ -123,14 +105,14 @@ def extract_images_from_pdf(pdf_path, output_dir="extracted_images"):
             image_catalog.append(image_metadata)
             total_images += 1
             
-            if not is_placeholder:
-                print(f"  ✅ Extracted: {img_filename} ({pix.width}×{pix.height})")
+            if duplicate:
+                print(f"  ♻️  Duplicate of {img_filename}")
+            elif not is_placeholder:
+                print(f"  ✅ Extracted: {img_filename} ({width}×{height})")
             
             # Track extraction statistics
             if is_placeholder:
                 print(f"  ❌ Failed extraction (placeholder): {img_filename}")
-            
-            pix = None  # Free memory
     
     # Save catalog as JSON before closing document
     catalog_path = os.path.join(output_dir, f"{Path(pdf_path).stem}_image_catalog.json")
@@ -155,6 +137,66 @@ def extract_images_from_pdf(pdf_path, output_dir="extracted_images"):
     
     return image_catalog
 
+def store_image(doc, xref, digest, image_store, pdf_path, page_num, img_index, img, output_dir):
+    """
+    Decode and save the first occurrence of an image, rescuing placeholders.
+    
+    Returns:
+        dict: Store entry with the file written (or why the image was skipped)
+    """
+    pix = fitz.Pixmap(doc, xref)
+    
+    # Skip if image is too small (likely decorative)
+    if pix.width < 50 or pix.height < 50:
+        entry = {"filename": None, "skipped": f"⏭️  Skipping small image: {pix.width}×{pix.height}"}
+        pix = None
+        return image_store.add(digest, entry)
+    
+    # Generate filename
+    pdf_name = Path(pdf_path).stem
+    img_filename = f"{pdf_name}_page{page_num+1:02d}_img{img_index+1:02d}"
+    
+    # Determine format and save
+    if pix.n - pix.alpha < 4:  # GRAY or RGB
+        img_filename += ".png"
+        img_path = os.path.join(output_dir, img_filename)
+        pix.save(img_path)
+    else:  # CMYK: convert to RGB
+        pix1 = fitz.Pixmap(fitz.csRGB, pix)
+        img_filename += ".png"
+        img_path = os.path.join(output_dir, img_filename)
+        pix1.save(img_path)
+        pix1 = None
+    
+    # Check if this is a warning triangle placeholder (by file digest once one is known)
+    file_size = os.path.getsize(img_path)
+    is_placeholder = image_store.check_placeholder(digest, img_path, detect_placeholder_image)
+    
+    if is_placeholder:
+        print(f"  ⚠️  WARNING: Placeholder detected - {img_filename} (extraction failed)")
+        
+        # Attempt rescue with pdf2image
+        rescue_success = attempt_image_rescue(pdf_path, page_num, img_index, img_filename, output_dir, img)
+        if rescue_success:
+            # Update file size and status after rescue
+            file_size = os.path.getsize(img_path)
+            is_placeholder = False
+            print(f"  🚀 RESCUE SUCCESS: {img_filename} recovered with pdf2image!")
+    
+    entry = {
+        "filename": img_filename,
+        "skipped": None,
+        "width": pix.width,
+        "height": pix.height,
+        "colorspace": pix.colorspace.name if pix.colorspace else "Unknown",
+        "alpha": bool(pix.alpha),
+        "file_path": img_path,
+        "file_size_bytes": file_size,
+        "placeholder": is_placeholder
+    }
+    pix = None  # Free memory
+    return image_store.add(digest, entry)
+
 def detect_placeholder_image(img_path, file_size):
     """
     Detect if an extracted image is a PyMuPDF warning triangle placeholder.
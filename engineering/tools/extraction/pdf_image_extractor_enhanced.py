@@ -11,13 +11,46 @@ import sys
 import json
 import re
 import hashlib
+import time
 from pathlib import Path
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pdf2image import convert_from_path
 from PIL import Image
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 
+from pdf_image_store import ImageStore
+from pdf_text_index import TextBlockIndex
+
+# Pages per shard in --workers mode; several shards per worker keeps them evenly loaded
+SHARD_PAGES = 8
+
+
+class PageLayout:
+    """Text layout of one page, read once and shared by every image on it.
+
+    Holds the text blocks of get_text("dict") (for headings), a
+    TextBlockIndex over them (for the text near each image) and the plain
+    page text (read on first use, unless the caller already has it). A
+    caller that already has the page's get_text("dict") can pass it in.
+    """
+
+    def __init__(self, page, text: Optional[str] = None, text_dict: Optional[Dict] = None):
+        # Default flags: dropping TEXT_PRESERVE_IMAGES would change how text is split into blocks
+        if text_dict is None:
+            text_dict = page.get_text("dict")
+        self.blocks = [block for block in text_dict["blocks"] if "lines" in block]
+        self.index = TextBlockIndex(self.blocks)
+        self._text = text
+
+    def text(self, page) -> str:
+        """Plain page text (page.get_text()), read on first use"""
+        if self._text is None:
+            self._text = page.get_text()
+        return self._text
+
+
 class EnhancedPDFImageExtractor:
     """Enhanced extractor with rich metadata capture for document consumption."""
     
@@ -32,6 +65,9 @@ class EnhancedPDFImageExtractor:
         "Silicon": "SIL"
     }
     
+    # SHA-1s of placeholder PNG files; any others are learned from _detect_placeholder as they are written
+    KNOWN_PLACEHOLDER_DIGESTS: List[str] = []
+    
     # Semantic type patterns
     DIAGRAM_PATTERNS = {
         "timing_diagram": ["timing", "clock", "cycle", "delay", "waveform", "signal"],
@@ -56,6 +92,15 @@ class EnhancedPDFImageExtractor:
         self.image_catalog = []
         self.document_structure = {}
         
+        # Each distinct image stream is decoded and written once
+        self.image_store = ImageStore(self.KNOWN_PLACEHOLDER_DIGESTS)
+        
+        # Page layouts shared by structure and context extraction (keyed by 1-based page)
+        self.use_layout_cache = True
+        self._page_layouts: Dict[int, PageLayout] = {}
+        # Seconds spent per page: {page: {"layout": s, "images": s, "context": s}}
+        self.page_timings: Dict[int, Dict[str, float]] = {}
+        
         # Ensure output directory exists
         Path(output_dir).mkdir(parents=True, exist_ok=True)
         
@@ -71,6 +116,22 @@ class EnhancedPDFImageExtractor:
         global_id = f"{self.doc_id}-IMG-{self.global_id_counter:03d}"
         self.global_id_counter += 1
         return global_id
+    
+    def _add_timing(self, page_num: int, phase: str, seconds: float):
+        """Accumulate time spent on one extraction phase of a page."""
+        phases = self.page_timings.setdefault(page_num, {"layout": 0.0, "images": 0.0, "context": 0.0})
+        phases[phase] += seconds
+    
+    def _page_layout(self, page, page_num: int) -> PageLayout:
+        """Text layout for a page, laid out once per document."""
+        layout = self._page_layouts.get(page_num)
+        if layout is None:
+            start = time.perf_counter()
+            layout = PageLayout(page)
+            self._add_timing(page_num, "layout", time.perf_counter() - start)
+            if self.use_layout_cache:
+                self._page_layouts[page_num] = layout
+        return layout
         
     def extract_document_structure(self) -> Dict:
         """Extract PDF structure including bookmarks and headings."""
@@ -80,47 +141,54 @@ class EnhancedPDFImageExtractor:
             "sections": {}
         }
         
+        self.document_structure = structure
         try:
             doc = fitz.open(self.pdf_path)
-            structure["total_pages"] = len(doc)
-            
-            # Extract PDF outline (bookmarks)
-            toc = doc.get_toc()
-            if toc:
-                for level, title, page in toc:
-                    structure["outline"].append({
-                        "level": level,
-                        "title": title,
-                        "page": page
-                    })
-                    
-                    # Map pages to sections
-                    if page not in structure["sections"]:
-                        structure["sections"][page] = []
-                    structure["sections"][page].append({
-                        "level": level,
-                        "title": title
-                    })
+            self._add_outline(doc)
             
             # Extract heading-like text from each page
             for page_num in range(len(doc)):
                 page = doc.load_page(page_num)
-                blocks = page.get_text("dict")
-                
-                page_headings = self._extract_headings_from_page(blocks)
-                if page_headings:
-                    if page_num + 1 not in structure["sections"]:
-                        structure["sections"][page_num + 1] = []
-                    structure["sections"][page_num + 1].extend(page_headings)
+                self._add_page_headings(page_num + 1, self._page_layout(page, page_num + 1))
             
             doc.close()
             
         except Exception as e:
             print(f"⚠️ Error extracting document structure: {e}")
             
-        self.document_structure = structure
         return structure
     
+    def _add_outline(self, doc):
+        """Record the page count and PDF outline (bookmarks) in the document structure."""
+        structure = self.document_structure
+        structure["total_pages"] = len(doc)
+        
+        toc = doc.get_toc()
+        if toc:
+            for level, title, page in toc:
+                structure["outline"].append({
+                    "level": level,
+                    "title": title,
+                    "page": page
+                })
+                
+                # Map pages to sections
+                if page not in structure["sections"]:
+                    structure["sections"][page] = []
+                structure["sections"][page].append({
+                    "level": level,
+                    "title": title
+                })
+    
+    def _add_page_headings(self, page_num: int, layout: PageLayout):
+        """Add the heading-like text of a (1-based) page to the document structure."""
+        sections = self.document_structure["sections"]
+        page_headings = self._extract_headings_from_page({"blocks": layout.blocks})
+        if page_headings:
+            if page_num not in sections:
+                sections[page_num] = []
+            sections[page_num].extend(page_headings)
+    
     def _extract_headings_from_page(self, blocks: Dict) -> List[Dict]:
         """Extract heading-like text from page blocks."""
         headings = []
@@ -274,9 +342,9 @@ class EnhancedPDFImageExtractor:
             
             img_rect = image_rects[0]
             
-            # Get all text from page
-            page_text = page.get_text()
-            text_blocks = page.get_text("dict")
+            # Page text and blocks come from the shared layout, not a fresh get_text() per image
+            layout = self._page_layout(page, page_num)
+            page_text = layout.text(page)
             
             # Find text near the image with expanded radius
             nearby_text = []
@@ -284,56 +352,32 @@ class EnhancedPDFImageExtractor:
             figure_references = []
             code_blocks = []
             
-            for block in text_blocks["blocks"]:
-                if "lines" not in block:
-                    continue
-                
-                block_rect = fitz.Rect(block["bbox"])
-                
-                # Calculate distance from image
-                distance = min(
-                    abs(block_rect.y1 - img_rect.y0),  # Above
-                    abs(block_rect.y0 - img_rect.y1),  # Below
-                    abs(block_rect.x1 - img_rect.x0),  # Left
-                    abs(block_rect.x0 - img_rect.x1)   # Right
+            # Collect text within 150 points (expanded from 100)
+            for distance, (x0, y0, x1, y1), block_text in layout.index.within(img_rect, 150):
+                position = (
+                    "above" if y1 < img_rect.y0 else
+                    "below" if y0 > img_rect.y1 else
+                    "left" if x1 < img_rect.x0 else "right"
                 )
                 
-                # Extract text from block
-                block_text = ""
-                for line in block["lines"]:
-                    for span in line["spans"]:
-                        block_text += span["text"] + " "
+                nearby_text.append({
+                    "text": block_text,
+                    "distance": distance,
+                    "position": position
+                })
                 
-                block_text = block_text.strip()
-                if not block_text:
-                    continue
+                # Check for figure references
+                fig_match = re.search(r'(Figure|Fig\.?)\s*(\d+[\.\-]?\d*)', block_text)
+                if fig_match:
+                    figure_references.append(fig_match.group(0))
                 
-                # Collect text within 150 points (expanded from 100)
-                if distance < 150:
-                    position = (
-                        "above" if block_rect.y1 < img_rect.y0 else
-                        "below" if block_rect.y0 > img_rect.y1 else
-                        "left" if block_rect.x1 < img_rect.x0 else "right"
-                    )
-                    
-                    nearby_text.append({
-                        "text": block_text,
-                        "distance": distance,
-                        "position": position
-                    })
-                    
-                    # Check for figure references
-                    fig_match = re.search(r'(Figure|Fig\.?)\s*(\d+[\.\-]?\d*)', block_text)
-                    if fig_match:
-                        figure_references.append(fig_match.group(0))
-                    
-                    # Check for code blocks (monospace font or code patterns)
-                    if re.search(r'^\s*(\/\/|#|PUB|PRI|DAT|CON|VAR|WRPIN|WXPIN|RDPIN|DRVH|DRVL)', block_text):
-                        code_blocks.append(block_text[:200])  # First 200 chars
-                    
-                    # Potential captions (close and short)
-                    if distance < 50 and len(block_text) < 200:
-                        potential_captions.append(block_text)
+                # Check for code blocks (monospace font or code patterns)
+                if re.search(r'^\s*(\/\/|#|PUB|PRI|DAT|CON|VAR|WRPIN|WXPIN|RDPIN|DRVH|DRVL)', block_text):
+                    code_blocks.append(block_text[:200])  # First 200 chars
+                
+                # Potential captions (close and short)
+                if distance < 50 and len(block_text) < 200:
+                    potential_captions.append(block_text)
             
             # Sort by distance
             nearby_text.sort(key=lambda x: x["distance"])
@@ -370,8 +414,8 @@ class EnhancedPDFImageExtractor:
         except Exception as e:
             return {"error": str(e)}
     
-    def extract_images(self) -> List[Dict]:
-        """Extract all images with enhanced metadata."""
+    def extract_images(self, workers: int = 1) -> List[Dict]:
+        """Extract all images with enhanced metadata (workers > 1: page shards in parallel)."""
         print(f"🚀 Enhanced Extraction Starting: {self.pdf_name}")
         print(f"📋 Document ID: {self.doc_id}")
         
@@ -387,102 +431,226 @@ class EnhancedPDFImageExtractor:
             print(f"❌ Error opening PDF: {e}")
             return []
         
-        total_images = 0
+        page_count = len(doc)
+        if workers > 1 and page_count > SHARD_PAGES:
+            doc.close()
+            catalog = self._extract_sharded(page_count, workers)
+        else:
+            catalog = self._extract_pages(doc, range(page_count))
+            doc.close()
+        
+        # IDs follow page order whichever way the pages were extracted
+        self.image_catalog = self._assign_global_ids(catalog)
+        
+        print(f"\n🎯 Extraction Complete: {len(self.image_catalog)} images")
+        return self.image_catalog
+    
+    def _extract_pages(self, doc, page_nums) -> List[Dict]:
+        """Extract the images on the given (0-based) pages of an open document."""
+        catalog = []
         
         # Extract images from each page
-        for page_num in range(len(doc)):
+        for page_num in page_nums:
             page = doc.load_page(page_num)
-            image_list = page.get_images(full=True)
+            catalog.extend(self._extract_page(doc, page, page_num, page.get_images(full=True)))
+        
+        return catalog
+    
+    def _extract_page(self, doc, page, page_num: int, image_list: List) -> List[Dict]:
+        """Catalog entries for the images (page.get_images(full=True)) of one (0-based) page."""
+        catalog = []
+        if not image_list:
+            return catalog
+            
+        print(f"\n📄 Page {page_num + 1}: Found {len(image_list)} images")
+        
+        for img_index, img in enumerate(image_list):
+            # Get image data (a stream already written is referenced, not decoded again)
+            xref = img[0]
+            local_ref = f"page{page_num+1:02d}_img{img_index+1:02d}"
+            start = time.perf_counter()
+            digest = self.image_store.digest(doc, xref)
+            stored = self.image_store.get(digest)
+            duplicate = stored is not None
+            if not duplicate:
+                stored = self._store_image(doc, xref, digest, local_ref)
+            self._add_timing(page_num + 1, "images", time.perf_counter() - start)
             
-            if not image_list:
+            if stored["skipped"]:
+                print(f"  {stored['skipped']}")
                 continue
-                
-            print(f"\n📄 Page {page_num + 1}: Found {len(image_list)} images")
             
-            for img_index, img in enumerate(image_list):
-                # Get image data
-                xref = img[0]
-                try:
-                    pix = fitz.Pixmap(doc, xref)
-                except:
-                    print(f"  ⚠️ Failed to load image xref {xref}")
-                    continue
-                
-                # Skip small images
-                if pix.width < 50 or pix.height < 50:
-                    print(f"  ⏭️ Skipping small image: {pix.width}×{pix.height}")
-                    pix = None
-                    continue
-                
-                # Generate filenames
-                global_id = self._generate_global_id()
-                local_ref = f"page{page_num+1:02d}_img{img_index+1:02d}"
-                img_filename = f"{self.pdf_name}_{local_ref}.png"
-                img_path = os.path.join(self.output_dir, img_filename)
-                
-                # Save image
-                if pix.n - pix.alpha < 4:  # GRAY or RGB
-                    pix.save(img_path)
-                else:  # CMYK: convert to RGB
-                    pix1 = fitz.Pixmap(fitz.csRGB, pix)
-                    pix1.save(img_path)
-                    pix1 = None
-                
-                # Check for placeholder
-                file_size = os.path.getsize(img_path)
-                is_placeholder = self._detect_placeholder(img_path, file_size)
-                
-                if is_placeholder:
-                    print(f"  ⚠️ Placeholder detected: {global_id}")
-                    # Could attempt rescue here
-                
-                # Extract enhanced context
-                context = self._extract_enhanced_context(page, img, page_num + 1)
-                
-                # Build enhanced metadata
-                metadata = {
-                    "global_id": global_id,
-                    "document_id": self.doc_id,
-                    "local_ref": local_ref,
-                    "filename": img_filename,
-                    "source_pdf": os.path.basename(self.pdf_path),
-                    "page_number": page_num + 1,
-                    "image_index": img_index + 1,
-                    "dimensions": {
-                        "width": pix.width,
-                        "height": pix.height,
-                        "display": f"{pix.width}×{pix.height}"
-                    },
-                    "technical_data": {
-                        "xref": xref,
-                        "colorspace": pix.colorspace.name if pix.colorspace else "Unknown",
-                        "alpha": bool(pix.alpha),
-                        "file_size_bytes": file_size,
-                        "extraction_status": "failed" if is_placeholder else "success"
-                    },
-                    "section_hierarchy": context.get("section_hierarchy", {}),
-                    "semantic_type": context.get("semantic_type", "diagram"),
-                    "technical_subjects": context.get("technical_subjects", []),
-                    "figure_reference": context.get("figure_references", [])[0] if context.get("figure_references") else None,
-                    "caption": context.get("caption", ""),
-                    "nearby_text": context.get("nearby_text", [])[:5],
-                    "code_context": context.get("code_context", []),
-                    "pedagogical_purpose": self._determine_pedagogical_purpose(context),
-                    "search_keywords": self._generate_search_keywords(context),
-                    "consumption_hints": self._generate_consumption_hints(pix, context)
-                }
-                
-                self.image_catalog.append(metadata)
-                total_images += 1
-                
-                print(f"  ✅ {global_id}: {context.get('semantic_type', 'diagram')} ({pix.width}×{pix.height})")
-                
-                pix = None  # Free memory
-        
-        doc.close()
+            is_placeholder = self.image_store.is_placeholder(digest)
+            if is_placeholder:
+                print(f"  ⚠️ Placeholder detected: {local_ref}")
+                # Could attempt rescue here
+            
+            # Extract enhanced context
+            # (a layout built on the way is timed as layout, not context)
+            layout_before = self.page_timings.get(page_num + 1, {}).get("layout", 0.0)
+            start = time.perf_counter()
+            context = self._extract_enhanced_context(page, img, page_num + 1)
+            layout_spent = self.page_timings[page_num + 1]["layout"] - layout_before
+            self._add_timing(page_num + 1, "context", time.perf_counter() - start - layout_spent)
+            
+            # Build enhanced metadata
+            metadata = {
+                "global_id": None,
+                "document_id": self.doc_id,
+                "local_ref": local_ref,
+                "filename": stored["filename"],
+                "duplicate_of": stored["local_ref"] if duplicate else None,
+                "source_pdf": os.path.basename(self.pdf_path),
+                "page_number": page_num + 1,
+                "image_index": img_index + 1,
+                "dimensions": {
+                    "width": stored["width"],
+                    "height": stored["height"],
+                    "display": f"{stored['width']}×{stored['height']}"
+                },
+                "technical_data": {
+                    "xref": xref,
+                    "content_digest": digest,
+                    "colorspace": stored["colorspace"],
+                    "alpha": stored["alpha"],
+                    "file_size_bytes": stored["file_size_bytes"],
+                    "extraction_status": "failed" if is_placeholder else "success"
+                },
+                "section_hierarchy": context.get("section_hierarchy", {}),
+                "semantic_type": context.get("semantic_type", "diagram"),
+                "technical_subjects": context.get("technical_subjects", []),
+                "figure_reference": context.get("figure_references", [])[0] if context.get("figure_references") else None,
+                "caption": context.get("caption", ""),
+                "nearby_text": context.get("nearby_text", [])[:5],
+                "code_context": context.get("code_context", []),
+                "pedagogical_purpose": self._determine_pedagogical_purpose(context),
+                "search_keywords": self._generate_search_keywords(context),
+                "consumption_hints": self._generate_consumption_hints(stored, context)
+            }
+            
+            catalog.append(metadata)
+            
+            if duplicate:
+                print(f"  ♻️ {local_ref}: duplicate of {stored['local_ref']}")
+            else:
+                print(f"  ✅ {local_ref}: {context.get('semantic_type', 'diagram')} ({stored['width']}×{stored['height']})")
         
-        print(f"\n🎯 Extraction Complete: {total_images} images")
-        return self.image_catalog
+        return catalog
+    
+    def _store_image(self, doc, xref: int, digest: str, local_ref: str) -> Dict:
+        """Decode and save the first occurrence of an image stream; returns its store entry."""
+        entry = {"local_ref": local_ref, "filename": None, "skipped": None}
+        try:
+            pix = fitz.Pixmap(doc, xref)
+        except:
+            entry["skipped"] = f"⚠️ Failed to load image xref {xref}"
+            return self.image_store.add(digest, entry)
+        
+        # Skip small images
+        if pix.width < 50 or pix.height < 50:
+            entry["skipped"] = f"⏭️ Skipping small image: {pix.width}×{pix.height}"
+            return self.image_store.add(digest, entry)
+        
+        # Generate filenames (global IDs are assigned once all pages are done)
+        img_filename = f"{self.pdf_name}_{local_ref}.png"
+        img_path = os.path.join(self.output_dir, img_filename)
+        
+        # Save image
+        if pix.n - pix.alpha < 4:  # GRAY or RGB
+            pix.save(img_path)
+        else:  # CMYK: convert to RGB
+            pix1 = fitz.Pixmap(fitz.csRGB, pix)
+            pix1.save(img_path)
+            pix1 = None
+        
+        # Check for placeholder by file digest; once known, later copies are flagged without decoding
+        file_size = os.path.getsize(img_path)
+        self.image_store.check_placeholder(digest, img_path, self._detect_placeholder)
+        
+        entry.update({
+            "filename": img_filename,
+            "width": pix.width,
+            "height": pix.height,
+            "colorspace": pix.colorspace.name if pix.colorspace else "Unknown",
+            "alpha": bool(pix.alpha),
+            "file_size_bytes": file_size
+        })
+        pix = None  # Free memory
+        return self.image_store.add(digest, entry)
+    
+    def _extract_sharded(self, page_count: int, workers: int) -> List[Dict]:
+        """Extract page shards in worker processes, each with its own fitz document."""
+        shards = [range(start, min(start + SHARD_PAGES, page_count))
+                  for start in range(0, page_count, SHARD_PAGES)]
+        print(f"⚡ Extracting {len(shards)} shards of {SHARD_PAGES} pages with {workers} workers")
+        
+        catalog = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_extract_shard, self.pdf_path, self.output_dir, self.document_structure,
+                                   list(shard), self.use_layout_cache)
+                       for shard in shards]
+            for future in futures:
+                shard_catalog, shard_timings = future.result()
+                catalog.extend(shard_catalog)
+                for page_num, phases in shard_timings.items():
+                    for phase, seconds in phases.items():
+                        self._add_timing(page_num, phase, seconds)
+        return catalog
+    
+    def _assign_global_ids(self, catalog: List[Dict]) -> List[Dict]:
+        """Number images in (page, image) order, so IDs do not depend on the worker count.
+        
+        Also links duplicates across shards: each worker only knows its own
+        pages, so a stream first seen in two shards is written twice; the
+        later copy is removed and referenced like any other duplicate.
+        """
+        catalog.sort(key=lambda img: (img["page_number"], img["image_index"]))
+        first_by_digest = {}
+        for img in catalog:
+            img["global_id"] = self._generate_global_id()
+            first = first_by_digest.setdefault(img["technical_data"]["content_digest"], img)
+            if first is img:
+                continue
+            if img["filename"] != first["filename"]:
+                Path(self.output_dir, img["filename"]).unlink(missing_ok=True)
+                img["filename"] = first["filename"]
+            img["duplicate_of"] = first["global_id"]
+            if first["technical_data"]["extraction_status"] == "failed":
+                img["technical_data"]["extraction_status"] = "failed"
+        
+        duplicates = [img for img in catalog if img["duplicate_of"]]
+        if duplicates:
+            saved = sum(img["technical_data"]["file_size_bytes"] for img in duplicates)
+            print(f"\n♻️  {len(duplicates)} duplicate images referenced instead of written ({saved // 1024} KB saved)")
+        return catalog
+    
+    def print_timing_report(self, slowest: int = 10):
+        """Print per-page extraction cost (layout, image save, context)."""
+        if not self.page_timings:
+            print("⏱️  No timings recorded")
+            return
+        
+        phases = ("layout", "images", "context")
+        totals = {phase: sum(t[phase] for t in self.page_timings.values()) for phase in phases}
+        pages = len(self.page_timings)
+        images_per_page = {}
+        for img in self.image_catalog:
+            images_per_page[img["page_number"]] = images_per_page.get(img["page_number"], 0) + 1
+        
+        cache_mode = "cached" if self.use_layout_cache else "uncached"
+        print(f"\n⏱️  Per-page extraction cost: {self.pdf_name} ({pages} pages, {cache_mode} layouts)")
+        print("=" * 64)
+        for phase in phases:
+            print(f"{phase:>10}: {totals[phase] * 1000:9.1f} ms total  {totals[phase] * 1000 / pages:7.2f} ms/page")
+        total = sum(totals.values())
+        print(f"{'total':>10}: {total * 1000:9.1f} ms total  {total * 1000 / pages:7.2f} ms/page")
+        
+        ranked = sorted(self.page_timings.items(), key=lambda item: sum(item[1].values()), reverse=True)
+        print(f"\nSlowest {min(slowest, pages)} pages:")
+        print(f"{'page':>6} {'images':>7} {'layout ms':>10} {'images ms':>10} {'context ms':>11}")
+        for page_num, t in ranked[:slowest]:
+            print(f"{page_num:>6} {images_per_page.get(page_num, 0):>7} "
+                  f"{t['layout'] * 1000:>10.2f} {t['images'] * 1000:>10.2f} {t['context'] * 1000:>11.2f}")
     
     def _detect_placeholder(self, img_path: str, file_size: int) -> bool:
         """Detect placeholder images."""
@@ -527,14 +695,15 @@ class EnhancedPDFImageExtractor:
         
         return list(keywords)[:20]  # Limit to 20 keywords
     
-    def _generate_consumption_hints(self, pix, context: Dict) -> Dict:
-        """Generate hints for how to best consume this image."""
+    def _generate_consumption_hints(self, image: Dict, context: Dict) -> Dict:
+        """Generate hints for how to best consume this image (image: its store entry)."""
+        width, height = image["width"], image["height"]
         hints = {
-            "ideal_size": "full_width" if pix.width > 1500 else "half_page" if pix.width > 800 else "inline",
+            "ideal_size": "full_width" if width > 1500 else "half_page" if width > 800 else "inline",
             "requires_caption": bool(context.get("caption")),
-            "color_important": pix.colorspace.name != "DeviceGray" if pix.colorspace else False,
-            "high_detail": pix.width > 2000 or pix.height > 1500,
-            "aspect_ratio": round(pix.width / pix.height, 2) if pix.height > 0 else 1
+            "color_important": image["colorspace"] not in ("DeviceGray", "Unknown"),
+            "high_detail": width > 2000 or height > 1500,
+            "aspect_ratio": round(width / height, 2) if height > 0 else 1
         }
         return hints
     
@@ -671,6 +840,18 @@ class EnhancedPDFImageExtractor:
             f.write(f"- **Document Structure Extracted**: {'Yes' if self.document_structure.get('outline') else 'Partial'}\n")
             f.write(f"- **Unique Sections**: {len(set(img['section_hierarchy'].get('chapter', '') for img in self.image_catalog))}\n")
 
+def _extract_shard(pdf_path: str, output_dir: str, document_structure: Dict,
+                   page_nums: List[int], use_layout_cache: bool) -> Tuple[List[Dict], Dict]:
+    """Worker process: extract one shard of pages, returning its catalog entries and timings."""
+    extractor = EnhancedPDFImageExtractor(pdf_path, output_dir)
+    extractor.document_structure = document_structure
+    extractor.use_layout_cache = use_layout_cache
+    doc = fitz.open(pdf_path)
+    try:
+        return extractor._extract_pages(doc, page_nums), extractor.page_timings
+    finally:
+        doc.close()
+
 def main():
     parser = argparse.ArgumentParser(description='Enhanced PDF Image Extractor with Rich Metadata')
     parser.add_argument('pdf_path', nargs='?', help='Path to PDF file')
@@ -678,6 +859,12 @@ def main():
                       help='Output directory (default: extracted_images_enhanced_YYYYMMDD)')
     parser.add_argument('--smartpins', action='store_true',
                       help='Extract Smart Pins document with enhanced metadata')
+    parser.add_argument('--timing', action='store_true',
+                      help='Print per-page extraction cost (layout, image save, context)')
+    parser.add_argument('--no-layout-cache', action='store_true',
+                      help='Re-read page text for every image (baseline for --timing)')
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                      help='Extract page shards in N worker processes (default: 1)')
     
     args = parser.parse_args()
     
@@ -703,7 +890,8 @@ def main():
         )
         
         extractor = EnhancedPDFImageExtractor(smartpins_path, output_dir)
-        extractor.extract_images()
+        extractor.use_layout_cache = not args.no_layout_cache
+        extractor.extract_images(workers=args.workers)
         extractor.save_catalogs()
         
     else:
@@ -712,8 +900,12 @@ def main():
             sys.exit(1)
         
         extractor = EnhancedPDFImageExtractor(args.pdf_path, args.output)
-        extractor.extract_images()
+        extractor.use_layout_cache = not args.no_layout_cache
+        extractor.extract_images(workers=args.workers)
         extractor.save_catalogs()
+    
+    if args.timing:
+        extractor.print_timing_report()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -9,10 +9,17 @@ import os
 import sys
 import json
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 
+from pdf_image_store import ImageStore
+from pdf_text_index import TextBlockIndex
+
+# Pages per shard in --workers mode; several shards per worker keeps them evenly loaded
+SHARD_PAGES = 8
+
 class SmartPinsImageExtractor:
     """Smart Pins-aware extractor that understands modes and context."""
     
@@ -63,9 +70,17 @@ class SmartPinsImageExtractor:
         
         # Track mode context as we go through pages
         self.current_mode = None
+        self.current_mode_name = None
         self.mode_page_map = {}  # page_num -> mode
         self.mode_descriptions = {}  # mode -> description text
         
+        # Text block index and plain text per page, shared by every image on the page
+        self._block_indexes: Dict[int, TextBlockIndex] = {}
+        self._page_texts: Dict[int, str] = {}
+        
+        # Each distinct image is decoded and written once
+        self.image_store = ImageStore()
+        
         Path(output_dir).mkdir(parents=True, exist_ok=True)
         
     def _generate_global_id(self) -> str:
@@ -74,59 +89,72 @@ class SmartPinsImageExtractor:
         self.global_id_counter += 1
         return global_id
     
+    def _block_index(self, page, page_num: int) -> TextBlockIndex:
+        """Text block index for a page, built on the first image of the page."""
+        if page_num not in self._block_indexes:
+            self._block_indexes[page_num] = TextBlockIndex(page.get_text("dict")["blocks"])
+        return self._block_indexes[page_num]
+    
+    def _page_text(self, page, page_num: int) -> str:
+        """Plain text of a page, read on the first image of the page."""
+        if page_num not in self._page_texts:
+            self._page_texts[page_num] = page.get_text()
+        return self._page_texts[page_num]
+    
     def extract_mode_context(self, doc) -> Dict:
         """Pre-scan document to map pages to Smart Pin modes."""
         print("🔍 Scanning for Smart Pin modes...")
-        mode_map = {}
-        current_mode = None
-        current_mode_name = None
+        self.current_mode = None
+        self.current_mode_name = None
+        self.mode_page_map = {}
         
         for page_num in range(len(doc)):
             page = doc.load_page(page_num)
-            text = page.get_text()
-            
-            # Look for mode patterns
-            # Pattern 1: Mode header like "%00011: DAC output with PWM dither"
-            mode_header_pattern = r'(%[01]{5})\s*:\s*([^\n]+)'
-            mode_matches = re.findall(mode_header_pattern, text)
-            
-            if mode_matches:
-                # Found new mode on this page
-                current_mode = mode_matches[0][0]
-                current_mode_name = mode_matches[0][1].strip()
-                self.mode_descriptions[current_mode] = current_mode_name
-                print(f"  📍 Page {page_num + 1}: Found mode {current_mode} - {current_mode_name}")
-            
-            # Pattern 2: Just the mode number in various contexts
-            simple_mode_pattern = r'(%[01]{5})\b'
-            simple_matches = re.findall(simple_mode_pattern, text)
-            if simple_matches and not mode_matches:
-                # Might be continuing previous mode or referencing it
-                for mode in simple_matches:
-                    if mode in self.SMART_PIN_MODES:
-                        if current_mode != mode:
-                            current_mode = mode
-                            print(f"  📍 Page {page_num + 1}: Mode reference {current_mode}")
-                        break
-            
-            # Pattern 3: Look for "Mode %xxxxx" or "Smart Pin Mode"
-            mode_ref_pattern = r'[Mm]ode\s+(%[01]{5})'
-            mode_refs = re.findall(mode_ref_pattern, text)
-            if mode_refs:
-                current_mode = mode_refs[0]
-                print(f"  📍 Page {page_num + 1}: Mode reference {current_mode}")
-            
-            # Store the current mode for this page
-            if current_mode:
-                mode_map[page_num + 1] = {
-                    "mode": current_mode,
-                    "mode_name": self.mode_descriptions.get(current_mode, 
-                                  self.SMART_PIN_MODES.get(current_mode, "unknown")),
-                    "full_description": current_mode_name if current_mode_name else ""
-                }
+            self._scan_mode_page(page_num, page.get_text())
         
-        self.mode_page_map = mode_map
-        return mode_map
+        return self.mode_page_map
+    
+    def _scan_mode_page(self, page_num: int, text: str):
+        """Update the mode in effect from one (0-based) page's text; modes carry over to later pages."""
+        # Look for mode patterns
+        # Pattern 1: Mode header like "%00011: DAC output with PWM dither"
+        mode_header_pattern = r'(%[01]{5})\s*:\s*([^\n]+)'
+        mode_matches = re.findall(mode_header_pattern, text)
+        
+        if mode_matches:
+            # Found new mode on this page
+            self.current_mode = mode_matches[0][0]
+            self.current_mode_name = mode_matches[0][1].strip()
+            self.mode_descriptions[self.current_mode] = self.current_mode_name
+            print(f"  📍 Page {page_num + 1}: Found mode {self.current_mode} - {self.current_mode_name}")
+        
+        # Pattern 2: Just the mode number in various contexts
+        simple_mode_pattern = r'(%[01]{5})\b'
+        simple_matches = re.findall(simple_mode_pattern, text)
+        if simple_matches and not mode_matches:
+            # Might be continuing previous mode or referencing it
+            for mode in simple_matches:
+                if mode in self.SMART_PIN_MODES:
+                    if self.current_mode != mode:
+                        self.current_mode = mode
+                        print(f"  📍 Page {page_num + 1}: Mode reference {self.current_mode}")
+                    break
+        
+        # Pattern 3: Look for "Mode %xxxxx" or "Smart Pin Mode"
+        mode_ref_pattern = r'[Mm]ode\s+(%[01]{5})'
+        mode_refs = re.findall(mode_ref_pattern, text)
+        if mode_refs:
+            self.current_mode = mode_refs[0]
+            print(f"  📍 Page {page_num + 1}: Mode reference {self.current_mode}")
+        
+        # Store the current mode for this page
+        if self.current_mode:
+            self.mode_page_map[page_num + 1] = {
+                "mode": self.current_mode,
+                "mode_name": self.mode_descriptions.get(self.current_mode, 
+                              self.SMART_PIN_MODES.get(self.current_mode, "unknown")),
+                "full_description": self.current_mode_name if self.current_mode_name else ""
+            }
     
     def _extract_image_context_with_mode(self, page, img, page_num: int) -> Dict:
         """Extract context with Smart Pins-specific understanding."""
@@ -137,8 +165,7 @@ class SmartPinsImageExtractor:
                 return {"error": "No image position found"}
             
             img_rect = image_rects[0]
-            page_text = page.get_text()
-            text_blocks = page.get_text("dict")
+            page_text = self._page_text(page, page_num)
             
             # Get the mode for this page
             page_mode_info = self.mode_page_map.get(page_num, {})
@@ -151,64 +178,40 @@ class SmartPinsImageExtractor:
             technical_context = []
             instruction_refs = []
             
-            for block in text_blocks["blocks"]:
-                if "lines" not in block:
-                    continue
+            # Collect text within 200 points (expanded for better context)
+            for distance, (x0, y0, x1, y1), block_text in self._block_index(page, page_num).within(img_rect, 200):
+                position = (
+                    "above" if y1 < img_rect.y0 else
+                    "below" if y0 > img_rect.y1 else
+                    "left" if x1 < img_rect.x0 else "right"
+                )
                 
-                block_rect = fitz.Rect(block["bbox"])
+                nearby_text.append({
+                    "text": block_text,
+                    "distance": distance,
+                    "position": position
+                })
                 
-                # Calculate distance from image
-                distance = min(
-                    abs(block_rect.y1 - img_rect.y0),  # Above
-                    abs(block_rect.y0 - img_rect.y1),  # Below
-                    abs(block_rect.x1 - img_rect.x0),  # Left
-                    abs(block_rect.x0 - img_rect.x1)   # Right
-                )
+                # Look for Smart Pin-specific patterns
+                # Instructions
+                instr_pattern = r'\b(WRPIN|WXPIN|WYPIN|RDPIN|RQPIN|AKPIN|TESTP[N]?|DIRH|DIRL|DRVH|DRVL|FLTL|FLTH|OUTL|OUTH)\b'
+                instr_matches = re.findall(instr_pattern, block_text, re.IGNORECASE)
+                if instr_matches:
+                    instruction_refs.extend(instr_matches)
                 
-                # Extract text from block
-                block_text = ""
-                for line in block["lines"]:
-                    for span in line["spans"]:
-                        block_text += span["text"] + " "
+                # Technical patterns (X/Y/Z registers, bit patterns)
+                tech_pattern = r'\b([XYZ])\[(\d+):(\d+)\]|\b([XYZ])\s*=\s*([^\s,]+)'
+                tech_matches = re.findall(tech_pattern, block_text)
+                if tech_matches:
+                    technical_context.append(block_text[:100])
                 
-                block_text = block_text.strip()
-                if not block_text:
-                    continue
+                # Timing references
+                if any(word in block_text.lower() for word in ['clock', 'cycle', 'timing', 'edge', 'rise', 'fall']):
+                    technical_context.append(f"Timing: {block_text[:100]}")
                 
-                # Collect text within 200 points (expanded for better context)
-                if distance < 200:
-                    position = (
-                        "above" if block_rect.y1 < img_rect.y0 else
-                        "below" if block_rect.y0 > img_rect.y1 else
-                        "left" if block_rect.x1 < img_rect.x0 else "right"
-                    )
-                    
-                    nearby_text.append({
-                        "text": block_text,
-                        "distance": distance,
-                        "position": position
-                    })
-                    
-                    # Look for Smart Pin-specific patterns
-                    # Instructions
-                    instr_pattern = r'\b(WRPIN|WXPIN|WYPIN|RDPIN|RQPIN|AKPIN|TESTP[N]?|DIRH|DIRL|DRVH|DRVL|FLTL|FLTH|OUTL|OUTH)\b'
-                    instr_matches = re.findall(instr_pattern, block_text, re.IGNORECASE)
-                    if instr_matches:
-                        instruction_refs.extend(instr_matches)
-                    
-                    # Technical patterns (X/Y/Z registers, bit patterns)
-                    tech_pattern = r'\b([XYZ])\[(\d+):(\d+)\]|\b([XYZ])\s*=\s*([^\s,]+)'
-                    tech_matches = re.findall(tech_pattern, block_text)
-                    if tech_matches:
-                        technical_context.append(block_text[:100])
-                    
-                    # Timing references
-                    if any(word in block_text.lower() for word in ['clock', 'cycle', 'timing', 'edge', 'rise', 'fall']):
-                        technical_context.append(f"Timing: {block_text[:100]}")
-                    
-                    # Potential captions (very close and short)
-                    if distance < 50 and len(block_text) < 200:
-                        potential_captions.append(block_text)
+                # Potential captions (very close and short)
+                if distance < 50 and len(block_text) < 200:
+                    potential_captions.append(block_text)
             
             # Sort by distance
             nearby_text.sort(key=lambda x: x["distance"])
@@ -308,8 +311,8 @@ class SmartPinsImageExtractor:
         
         return context_snippets
     
-    def extract_images(self) -> List[Dict]:
-        """Extract all images with Smart Pins-specific metadata."""
+    def extract_images(self, workers: int = 1) -> List[Dict]:
+        """Extract all images with Smart Pins-specific metadata (workers > 1: page shards in parallel)."""
         print(f"🚀 Smart Pins Extraction Starting: {self.pdf_name}")
         print(f"📋 Document ID: {self.doc_id}")
         
@@ -331,109 +334,18 @@ class SmartPinsImageExtractor:
             print(f"❌ Error opening PDF: {e}")
             return []
         
-        total_images = 0
-        mode_image_counts = {}  # Track images per mode
+        # Modes carry over from page to page, so the scan above stays sequential
+        page_count = len(doc)
+        if workers > 1 and page_count > SHARD_PAGES:
+            doc.close()
+            catalog = self._extract_sharded(page_count, workers)
+        else:
+            catalog = self._extract_pages(doc, range(page_count))
+            doc.close()
         
-        # Extract images from each page
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            image_list = page.get_images(full=True)
-            
-            if not image_list:
-                continue
-            
-            # Get mode for this page
-            page_mode_info = self.mode_page_map.get(page_num + 1, {})
-            current_mode = page_mode_info.get("mode", "no_mode")
-            
-            print(f"\n📄 Page {page_num + 1}: Found {len(image_list)} images [Mode: {current_mode}]")
-            
-            for img_index, img in enumerate(image_list):
-                # Get image data
-                xref = img[0]
-                try:
-                    pix = fitz.Pixmap(doc, xref)
-                except:
-                    print(f"  ⚠️ Failed to load image xref {xref}")
-                    continue
-                
-                # Skip small images
-                if pix.width < 50 or pix.height < 50:
-                    print(f"  ⏭️ Skipping small image: {pix.width}×{pix.height}")
-                    pix = None
-                    continue
-                
-                # Track images per mode
-                if current_mode not in mode_image_counts:
-                    mode_image_counts[current_mode] = 0
-                mode_image_counts[current_mode] += 1
-                
-                # Generate filenames
-                global_id = self._generate_global_id()
-                local_ref = f"page{page_num+1:02d}_img{img_index+1:02d}"
-                
-                # Add mode to filename for easier identification
-                if current_mode and current_mode != "no_mode":
-                    mode_suffix = current_mode.replace("%", "mode")
-                    img_filename = f"{self.pdf_name}_{mode_suffix}_{local_ref}.png"
-                else:
-                    img_filename = f"{self.pdf_name}_{local_ref}.png"
-                
-                img_path = os.path.join(self.output_dir, img_filename)
-                
-                # Save image
-                if pix.n - pix.alpha < 4:  # GRAY or RGB
-                    pix.save(img_path)
-                else:  # CMYK: convert to RGB
-                    pix1 = fitz.Pixmap(fitz.csRGB, pix)
-                    pix1.save(img_path)
-                    pix1 = None
-                
-                # Extract Smart Pins-specific context
-                context = self._extract_image_context_with_mode(page, img, page_num + 1)
-                
-                # Build enhanced metadata
-                metadata = {
-                    "global_id": global_id,
-                    "document_id": self.doc_id,
-                    "local_ref": local_ref,
-                    "filename": img_filename,
-                    "source_pdf": os.path.basename(self.pdf_path),
-                    "page_number": page_num + 1,
-                    "image_index": img_index + 1,
-                    "image_number_in_mode": mode_image_counts[current_mode],
-                    "dimensions": {
-                        "width": pix.width,
-                        "height": pix.height,
-                        "display": f"{pix.width}×{pix.height}"
-                    },
-                    "smart_pin_context": {
-                        "mode": context.get("smart_pin_mode"),
-                        "mode_name": context.get("mode_name"),
-                        "mode_description": context.get("mode_description"),
-                        "instructions": context.get("instructions_referenced", []),
-                        "technical_context": context.get("technical_context", []),
-                        "discussion_context": context.get("discussion_context", [])
-                    },
-                    "semantic_type": context.get("semantic_type", "smart_pin_diagram"),
-                    "caption": context.get("caption", ""),
-                    "nearby_text": context.get("nearby_text", [])[:5],
-                    "search_keywords": self._generate_search_keywords(context, current_mode),
-                    "consumption_hints": {
-                        "ideal_size": "full_width" if pix.width > 1500 else "half_page",
-                        "mode_specific": True,
-                        "image_sequence": f"{mode_image_counts[current_mode]} of ? in {current_mode}"
-                    }
-                }
-                
-                self.image_catalog.append(metadata)
-                total_images += 1
-                
-                print(f"  ✅ {global_id}: {context.get('semantic_type')} for {current_mode} ({pix.width}×{pix.height})")
-                
-                pix = None  # Free memory
-        
-        doc.close()
+        # IDs and per-mode numbering follow page order whichever way the pages were extracted
+        mode_image_counts = self._assign_global_ids(catalog)
+        self.image_catalog = catalog
         
         # Report mode distribution
         print(f"\n📊 Mode Distribution:")
@@ -441,9 +353,180 @@ class SmartPinsImageExtractor:
             mode_name = self.mode_descriptions.get(mode, self.SMART_PIN_MODES.get(mode, "unknown"))
             print(f"  {mode}: {count} images - {mode_name}")
         
-        print(f"\n🎯 Extraction Complete: {total_images} images")
+        print(f"\n🎯 Extraction Complete: {len(self.image_catalog)} images")
         return self.image_catalog
     
+    def _page_mode(self, page_number: int) -> str:
+        """Smart Pin mode in effect on a (1-based) page."""
+        return self.mode_page_map.get(page_number, {}).get("mode", "no_mode")
+    
+    def _extract_pages(self, doc, page_nums) -> List[Dict]:
+        """Extract the images on the given (0-based) pages of an open document."""
+        catalog = []
+        
+        # Extract images from each page
+        for page_num in page_nums:
+            page = doc.load_page(page_num)
+            catalog.extend(self._extract_page(doc, page, page_num, page.get_images(full=True)))
+        
+        return catalog
+    
+    def _extract_page(self, doc, page, page_num: int, image_list: List) -> List[Dict]:
+        """Catalog entries for the images (page.get_images(full=True)) of one (0-based) page."""
+        catalog = []
+        if not image_list:
+            return catalog
+        
+        # Get mode for this page
+        current_mode = self._page_mode(page_num + 1)
+        
+        print(f"\n📄 Page {page_num + 1}: Found {len(image_list)} images [Mode: {current_mode}]")
+        
+        for img_index, img in enumerate(image_list):
+            # Get image data (an image already written is referenced, not decoded again)
+            xref = img[0]
+            local_ref = f"page{page_num+1:02d}_img{img_index+1:02d}"
+            digest = self.image_store.digest(doc, xref)
+            stored = self.image_store.get(digest)
+            duplicate = stored is not None
+            if not duplicate:
+                stored = self._store_image(doc, xref, digest, local_ref, current_mode)
+            if stored["skipped"]:
+                print(f"  {stored['skipped']}")
+                continue
+            
+            # Extract Smart Pins-specific context
+            context = self._extract_image_context_with_mode(page, img, page_num + 1)
+            
+            # Build enhanced metadata
+            metadata = {
+                "global_id": None,
+                "document_id": self.doc_id,
+                "local_ref": local_ref,
+                "filename": stored["filename"],
+                "duplicate_of": stored["local_ref"] if duplicate else None,
+                "content_digest": digest,
+                "source_pdf": os.path.basename(self.pdf_path),
+                "page_number": page_num + 1,
+                "image_index": img_index + 1,
+                "image_number_in_mode": None,
+                "dimensions": {
+                    "width": stored["width"],
+                    "height": stored["height"],
+                    "display": f"{stored['width']}×{stored['height']}"
+                },
+                "smart_pin_context": {
+                    "mode": context.get("smart_pin_mode"),
+                    "mode_name": context.get("mode_name"),
+                    "mode_description": context.get("mode_description"),
+                    "instructions": context.get("instructions_referenced", []),
+                    "technical_context": context.get("technical_context", []),
+                    "discussion_context": context.get("discussion_context", [])
+                },
+                "semantic_type": context.get("semantic_type", "smart_pin_diagram"),
+                "caption": context.get("caption", ""),
+                "nearby_text": context.get("nearby_text", [])[:5],
+                "search_keywords": self._generate_search_keywords(context, current_mode),
+                "consumption_hints": {
+                    "ideal_size": "full_width" if stored["width"] > 1500 else "half_page",
+                    "mode_specific": True,
+                    "image_sequence": None
+                }
+            }
+            
+            catalog.append(metadata)
+            
+            if duplicate:
+                print(f"  ♻️ {local_ref}: duplicate of {stored['local_ref']}")
+            else:
+                print(f"  ✅ {local_ref}: {context.get('semantic_type')} for {current_mode} ({stored['width']}×{stored['height']})")
+        
+        return catalog
+    
+    def _store_image(self, doc, xref: int, digest: str, local_ref: str, current_mode: str) -> Dict:
+        """Decode and save the first occurrence of an image; returns its store entry."""
+        entry = {"local_ref": local_ref, "filename": None, "skipped": None}
+        try:
+            pix = fitz.Pixmap(doc, xref)
+        except:
+            entry["skipped"] = f"⚠️ Failed to load image xref {xref}"
+            return self.image_store.add(digest, entry)
+        
+        # Skip small images
+        if pix.width < 50 or pix.height < 50:
+            entry["skipped"] = f"⏭️ Skipping small image: {pix.width}×{pix.height}"
+            return self.image_store.add(digest, entry)
+        
+        # Add mode to filename for easier identification
+        # (global IDs and per-mode numbers are assigned once all pages are done)
+        if current_mode and current_mode != "no_mode":
+            mode_suffix = current_mode.replace("%", "mode")
+            img_filename = f"{self.pdf_name}_{mode_suffix}_{local_ref}.png"
+        else:
+            img_filename = f"{self.pdf_name}_{local_ref}.png"
+        
+        img_path = os.path.join(self.output_dir, img_filename)
+        
+        # Save image
+        if pix.n - pix.alpha < 4:  # GRAY or RGB
+            pix.save(img_path)
+        else:  # CMYK: convert to RGB
+            pix1 = fitz.Pixmap(fitz.csRGB, pix)
+            pix1.save(img_path)
+            pix1 = None
+        
+        entry.update({
+            "filename": img_filename,
+            "width": pix.width,
+            "height": pix.height,
+            "file_size_bytes": os.path.getsize(img_path)
+        })
+        pix = None  # Free memory
+        return self.image_store.add(digest, entry)
+    
+    def _extract_sharded(self, page_count: int, workers: int) -> List[Dict]:
+        """Extract page shards in worker processes, each with its own fitz document."""
+        shards = [range(start, min(start + SHARD_PAGES, page_count))
+                  for start in range(0, page_count, SHARD_PAGES)]
+        print(f"⚡ Extracting {len(shards)} shards of {SHARD_PAGES} pages with {workers} workers")
+        
+        catalog = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_extract_shard, self.pdf_path, self.output_dir,
+                                   self.mode_page_map, self.mode_descriptions, list(shard))
+                       for shard in shards]
+            for future in futures:
+                catalog.extend(future.result())
+        return catalog
+    
+    def _assign_global_ids(self, catalog: List[Dict]) -> Dict[str, int]:
+        """Number images in (page, image) order; returns the image count per mode.
+        
+        Also links duplicates to the global ID of their first occurrence, across
+        shards too: a stream first seen in two shards is written twice, and the
+        later copy is removed.
+        """
+        catalog.sort(key=lambda img: (img["page_number"], img["image_index"]))
+        mode_image_counts = {}  # Track images per mode
+        first_by_digest = {}
+        for img in catalog:
+            mode = self._page_mode(img["page_number"])
+            mode_image_counts[mode] = mode_image_counts.get(mode, 0) + 1
+            img["global_id"] = self._generate_global_id()
+            img["image_number_in_mode"] = mode_image_counts[mode]
+            img["consumption_hints"]["image_sequence"] = f"{mode_image_counts[mode]} of ? in {mode}"
+            first = first_by_digest.setdefault(img["content_digest"], img)
+            if first is not img:
+                if img["filename"] != first["filename"]:
+                    Path(self.output_dir, img["filename"]).unlink(missing_ok=True)
+                    img["filename"] = first["filename"]
+                img["duplicate_of"] = first["global_id"]
+        
+        duplicates = sum(1 for img in catalog if img["duplicate_of"])
+        if duplicates:
+            print(f"\n♻️  {duplicates} duplicate images referenced instead of written")
+        return mode_image_counts
+    
     def _generate_search_keywords(self, context, mode):
         """Generate Smart Pins-specific search keywords."""
         keywords = set()
@@ -606,12 +689,26 @@ class SmartPinsImageExtractor:
             f.write(f"- **Unique Modes**: {len(mode_groups)}\n")
             f.write(f"- **Modes with Images**: {', '.join(sorted([m for m in mode_groups.keys() if m and m != 'no_mode']))}\n")
 
+def _extract_shard(pdf_path: str, output_dir: str, mode_page_map: Dict,
+                   mode_descriptions: Dict, page_nums: List[int]) -> List[Dict]:
+    """Worker process: extract one shard of pages using the parent's mode scan."""
+    extractor = SmartPinsImageExtractor(pdf_path, output_dir)
+    extractor.mode_page_map = mode_page_map
+    extractor.mode_descriptions = mode_descriptions
+    doc = fitz.open(pdf_path)
+    try:
+        return extractor._extract_pages(doc, page_nums)
+    finally:
+        doc.close()
+
 def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='Smart Pins-aware PDF Image Extractor')
     parser.add_argument('--extract', action='store_true',
                       help='Extract Smart Pins document with mode awareness')
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                      help='Extract page shards in N worker processes (default: 1)')
     
     args = parser.parse_args()
     
@@ -632,7 +729,7 @@ def main():
         )
         
         extractor = SmartPinsImageExtractor(smartpins_path, output_dir)
-        extractor.extract_images()
+        extractor.extract_images(workers=args.workers)
         extractor.save_catalogs()
     else:
         print("Use --extract to run Smart Pins extraction with mode awareness")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+PDF Image Store
+Content-addressed bookkeeping for the images extracted from one PDF.
+
+Logos, repeated waveform legends and placeholder images appear on many
+pages, often as the same xref and sometimes as separate copies of the same
+stream. The store keys every image by a SHA-1 of its raw (still encoded)
+image stream plus the image dictionary entries that change how that stream
+decodes (size, colour space, filters, Decode array, masks - a soft mask by
+its own stream digest), with the xref as a shortcut. Each distinct image
+is decoded and written to PNG once; later occurrences become catalog
+references to the first file.
+
+Placeholders are recognised by digest too. PyMuPDF writes the same
+warning-triangle PNG for every image it cannot decode, so a written file
+whose SHA-1 is a known placeholder digest is a placeholder whatever its
+size. The caller's size check still catches the first one of a run; its
+file digest is learned from it, and every other image stream known to
+give a placeholder is flagged without being decoded again.
+
+Usage:
+    from pdf_image_store import ImageStore
+
+    store = ImageStore(known_placeholder_pngs)
+    digest = store.digest(doc, xref)
+    stored = store.get(digest)
+    if stored is None:
+        ...  # decode and save, store.check_placeholder(digest, path, size_check),
+             # then store.add(digest, {...})
+"""
+
+import hashlib
+from typing import Callable, Dict, Iterable, Optional
+
+# Image dictionary entries that change the decoded image for the same raw stream
+IMAGE_DICT_KEYS = ('Width', 'Height', 'BitsPerComponent', 'ColorSpace', 'Decode', 'Filter',
+                   'DecodeParms', 'ImageMask', 'Intent', 'Mask', 'SMask')
+# Entries that may point at another image stream, hashed by that stream's digest
+MASK_KEYS = ('Mask', 'SMask')
+
+
+class ImageStore:
+    """Images already written for one document, by image digest"""
+
+    def __init__(self, known_placeholders: Iterable[str] = ()):
+        self._by_xref: Dict[int, str] = {}
+        self._by_digest: Dict[str, Dict] = {}
+        # Image digests known to decode to a placeholder
+        self.placeholders = set()
+        # SHA-1s of placeholder PNG files: the known ones plus those learned this run
+        self.placeholder_pngs = set(known_placeholders)
+        self.stats = {
+            'written': 0,
+            'duplicates': 0,
+            'bytes_saved': 0
+        }
+
+    def digest(self, doc, xref: int, masks: bool = True) -> str:
+        """SHA-1 of the xref's raw image stream and decoding entries (computed once per xref)"""
+        digest = self._by_xref.get(xref) if masks else None
+        if digest is not None:
+            return digest
+
+        sha1 = hashlib.sha1(doc.xref_stream_raw(xref) or b"")
+        for key in IMAGE_DICT_KEYS:
+            kind, value = doc.xref_get_key(xref, key)
+            if kind == 'null':
+                continue
+            if key in MASK_KEYS and kind == 'xref':
+                # A mask of a mask is not allowed, so one level is enough
+                value = self.digest(doc, int(value.split()[0]), masks=False) if masks else value
+            sha1.update(f"/{key} {value}\0".encode('utf-8'))
+        digest = sha1.hexdigest()
+        if masks:
+            self._by_xref[xref] = digest
+        return digest
+
+    def get(self, digest: str) -> Optional[Dict]:
+        """The entry stored for an image (counted as a duplicate), or None"""
+        entry = self._by_digest.get(digest)
+        if entry is not None:
+            self.stats['duplicates'] += 1
+            self.stats['bytes_saved'] += entry.get('file_size_bytes', 0)
+        return entry
+
+    def add(self, digest: str, entry: Dict) -> Dict:
+        """Record the first occurrence of an image (written or deliberately skipped)"""
+        self._by_digest[digest] = entry
+        if entry.get('filename'):
+            self.stats['written'] += 1
+        return entry
+
+    def check_placeholder(self, digest: str, path: str,
+                          size_check: Callable[[str, int], bool]) -> bool:
+        """Whether the PNG just written for an image is a placeholder.
+
+        Known placeholder files are found by SHA-1; otherwise size_check(path,
+        file size) decides, and a file it flags teaches the store its SHA-1.
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        png_digest = hashlib.sha1(data).hexdigest()
+        if png_digest not in self.placeholder_pngs:
+            if not size_check(path, len(data)):
+                return False
+            self.placeholder_pngs.add(png_digest)
+        self.placeholders.add(digest)
+        return True
+
+    def is_placeholder(self, digest: str) -> bool:
+        return digest in self.placeholders
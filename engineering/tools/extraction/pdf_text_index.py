@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+PDF Text Block Index
+Spatial lookup of the text blocks around an image on a PDF page.
+
+The image extractors find captions and nearby text by the gap between a
+block edge and the opposite image edge (block bottom vs image top, block
+top vs image bottom, block right vs image left, block left vs image right);
+a block's distance is the smallest of the four gaps. Scanning every block
+for every image is O(blocks) per image, which adds up on dense datasheet
+pages. TextBlockIndex keeps each of the four block edges in a sorted list,
+so within(rect, radius) finds the blocks closer than radius in
+O(log n + hits). It returns (distance, bbox, text) tuples in page order,
+with exactly the distances the extractors computed before.
+
+Usage:
+    from pdf_text_index import TextBlockIndex
+
+    index = TextBlockIndex(page.get_text("dict")["blocks"])
+    for distance, (x0, y0, x1, y1), text in index.within(img_rect, 150):
+        ...
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Tuple
+
+BBox = Tuple[float, float, float, float]
+
+# (block bbox index, image rect index) of each edge pair that is compared
+EDGES = ((3, 1), (1, 3), (2, 0), (0, 2))
+
+
+def block_text(block: Dict) -> str:
+    """Text of a get_text("dict") block, spans joined by spaces."""
+    return "".join(span["text"] + " " for line in block.get("lines", []) for span in line["spans"]).strip()
+
+
+class TextBlockIndex:
+    """Sorted-edge index over the text blocks of one page."""
+
+    def __init__(self, blocks: List[Dict]):
+        # (bbox, text) per block with any text, in page order
+        self.blocks: List[Tuple[BBox, str]] = []
+        for block in blocks:
+            if "lines" not in block:
+                continue
+            text = block_text(block)
+            if text:
+                self.blocks.append((tuple(block["bbox"]), text))
+
+        # Per edge: sorted edge values and the block each belongs to
+        self._edges = []
+        for block_edge, _ in EDGES:
+            entries = sorted((bbox[block_edge], i) for i, (bbox, _) in enumerate(self.blocks))
+            self._edges.append(([value for value, _ in entries], [i for _, i in entries]))
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    @staticmethod
+    def _image_edges(rect) -> BBox:
+        return (rect.x0, rect.y0, rect.x1, rect.y1)
+
+    def within(self, rect, radius: float) -> List[Tuple[float, BBox, str]]:
+        """(distance, bbox, text) of blocks closer than radius, in page order"""
+        image_edges = self._image_edges(rect)
+        candidates = set()
+        for (_, image_edge), (values, indexes) in zip(EDGES, self._edges):
+            target = image_edges[image_edge]
+            candidates.update(indexes[bisect_right(values, target - radius):bisect_left(values, target + radius)])
+
+        # A block in range on one edge can still be closer on another: take the minimum
+        rx0, ry0, rx1, ry1 = image_edges
+        near = []
+        for i in sorted(candidates):
+            bbox, text = self.blocks[i]
+            distance = min(abs(bbox[3] - ry0), abs(bbox[1] - ry1), abs(bbox[2] - rx0), abs(bbox[0] - rx1))
+            if distance < radius:
+                near.append((distance, bbox, text))
+        return near
@@ -1,77 +1,82 @@
 #!/usr/bin/env python3
 """
 Simple black image detector using just PIL and file sizes.
-Usage: python simple_black_detector.py <directory>
+Usage: python simple_black_detector.py <directory> [--catalog catalog.json] [--workers N] [--exact] [--check]
+
+Images are checked in parallel and decoding stops as soon as an image is
+known to be too bright to be a failed extraction (see black_image_scan.py);
+those brightness values are lower bounds, shown as "≥". Use --exact for full means,
+--check to rescan exactly and fail if any early-exit result disagrees.
 """
 
+import argparse
 import os
 import sys
-from PIL import Image, ImageStat
 
-def analyze_image(image_path):
+from black_image_scan import compare_scans, image_size, scan_brightness, scan_directory, update_catalog
+
+def analyze_image(image_path, exact=False):
     """
     Analyze image for potential extraction failure.
     Returns: (is_likely_failed, file_size_kb, mean_brightness, width, height)
+    mean_brightness is a lower bound for valid images unless exact.
     """
     try:
         file_size = os.path.getsize(image_path) / 1024  # KB
+        width, height = image_size(image_path)
         
-        with Image.open(image_path) as img:
-            width, height = img.size
-            
-            # Convert to grayscale for analysis
-            gray = img.convert('L')
-            stat = ImageStat.Stat(gray)
-            mean_brightness = stat.mean[0]  # Mean pixel value (0-255)
-            
-            # Heuristics for failed extraction:
-            # 1. Very low file size for large dimensions
-            # 2. Very low brightness (nearly black)
-            size_ratio = file_size / (width * height / 1000)  # KB per 1000 pixels
-            
-            is_likely_failed = (
-                mean_brightness < 10 or  # Very dark
-                (size_ratio < 0.5 and mean_brightness < 50)  # Small file + dark
-            )
-            
-            return is_likely_failed, file_size, mean_brightness, width, height
+        # Heuristics for failed extraction:
+        # 1. Very low file size for large dimensions
+        # 2. Very low brightness (nearly black)
+        size_ratio = file_size / (width * height / 1000)  # KB per 1000 pixels
+        dark_limit = 50 if size_ratio < 0.5 else 10  # Small file + dark, or very dark
+        
+        scan = scan_brightness(image_path, rule_out_below=None if exact else dark_limit)
+        mean_brightness = scan.mean  # Mean pixel value (0-255)
+        is_likely_failed = mean_brightness < dark_limit
+        
+        return is_likely_failed, file_size, mean_brightness, width, height
             
     except Exception as e:
         return None, 0, 0, 0, 0, f"Error: {e}"
 
-def analyze_directory(directory):
+def analyze_directory(directory, exact=False, workers=None):
     """Analyze all PNG files in directory."""
     failed_images = []
     valid_images = []
     errors = []
     
-    for filename in sorted(os.listdir(directory)):
-        if filename.lower().endswith('.png'):
-            filepath = os.path.join(directory, filename)
-            result = analyze_image(filepath)
-            
-            if len(result) == 6:  # Error case
-                errors.append((filename, result[5]))
+    for filename, result in scan_directory(directory, lambda path: analyze_image(path, exact), workers):
+        if len(result) == 6:  # Error case
+            errors.append((filename, result[5]))
+        else:
+            is_failed, size, brightness, w, h = result
+            if is_failed:
+                failed_images.append((filename, size, brightness, w, h))
             else:
-                is_failed, size, brightness, w, h = result
-                if is_failed:
-                    failed_images.append((filename, size, brightness, w, h))
-                else:
-                    valid_images.append((filename, size, brightness, w, h))
+                valid_images.append((filename, size, brightness, w, h))
     
     return failed_images, valid_images, errors
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python simple_black_detector.py <directory>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description='Detect likely failed image extractions')
+    parser.add_argument('directory', help='Directory of extracted PNG images')
+    parser.add_argument('--exact', action='store_true',
+                        help='Compute the full mean of every image (no early exit)')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='Decoder threads (default: Python\'s ThreadPoolExecutor default)')
+    parser.add_argument('--catalog', help='Extraction catalog JSON to update with the results')
+    parser.add_argument('--check', action='store_true',
+                        help='Rescan every image exactly and fail if an early-exit result disagrees')
+    args = parser.parse_args()
     
-    directory = sys.argv[1]
+    directory = args.directory
     if not os.path.exists(directory):
         print(f"Directory not found: {directory}")
         sys.exit(1)
     
-    failed_images, valid_images, errors = analyze_directory(directory)
+    failed_images, valid_images, errors = analyze_directory(directory, args.exact, args.workers)
+    bound = "" if args.exact else "≥"
     
     print(f"🔍 P2 DATASHEET IMAGE ANALYSIS")
     print("=" * 50)
@@ -85,7 +90,7 @@ if __name__ == "__main__":
     
     print(f"✅ VALID EXTRACTIONS ({len(valid_images)}):")
     for filename, size, brightness, w, h in valid_images:
-        print(f"   {filename} - {size:.1f}KB, {brightness:.1f} brightness, {w}×{h}")
+        print(f"   {filename} - {size:.1f}KB, {bound}{brightness:.1f} brightness, {w}×{h}")
     
     if errors:
         print(f"\n⚠️  ANALYSIS ERRORS ({len(errors)}):")
@@ -104,4 +109,26 @@ if __name__ == "__main__":
         print(f"\n🔧 RECOVERY RECOMMENDATIONS:")
         print(f"   1. Try pdf2image rescue on failed extractions")
         print(f"   2. Check original PDF pages {', '.join([f.split('_page')[1].split('_')[0] for f, _, _, _, _ in failed_images])}")
-        print(f"   3. Consider manual screenshot as fallback")
\ No newline at end of file
+        print(f"   3. Consider manual screenshot as fallback")
+    
+    if args.catalog:
+        results = {filename: {"mean_brightness": round(brightness, 2),
+                              "brightness_exact": is_failed or args.exact,
+                              "likely_failed": is_failed}
+                   for is_failed, images in ((True, failed_images), (False, valid_images))
+                   for filename, brightness in ((f, b) for f, _, b, _, _ in images)}
+        updated = update_catalog(args.catalog, results)
+        print(f"\n📝 Updated {updated} catalog entries in {args.catalog}")
+    
+    if args.check and not args.exact:
+        scanned = lambda *groups: {filename: (is_failed, brightness)
+                                   for is_failed, images in zip((True, False), groups)
+                                   for filename, _, brightness, _, _ in images}
+        exact_failed, exact_valid, _ = analyze_directory(directory, True, args.workers)
+        problems = compare_scans(scanned(failed_images, valid_images), scanned(exact_failed, exact_valid))
+        if problems:
+            print(f"\n❌ Early exit disagrees with exact means for {len(problems)} images:")
+            for problem in problems:
+                print(f"   {problem}")
+            sys.exit(1)
+        print("\n✅ Early exit agrees with exact means")
@@ -2,16 +2,33 @@
 """
 Source Code Extractor for P2 Knowledge Base
 Extracts Spin2 and PASM2 code blocks from PDF documents with context preservation.
+
+Code blocks are memoized per page in $P2KB_CACHE_DIR/source-code-pages.json
+(default ~/.cache/p2-knowledge-base), keyed by a digest of everything the
+page's text is drawn from (its content stream and every object its
+resources reach: fonts with their font files and ToUnicode maps, Form
+XObjects and their own resources; image data aside) plus the page number,
+so a re-run only extracts text from new or changed pages. Bump EXTRACTOR_VERSION when block
+detection changes; set P2KB_NO_CACHE=1 (or --no-cache) to bypass the memo.
+Cold runs can spread the pages over worker processes with -j/--workers.
 """
 
 import fitz  # PyMuPDF
+import hashlib
 import re
 import os
 import sys
 import json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import argparse
 
+# Bump when page processing changes, so memoized pages are re-extracted
+EXTRACTOR_VERSION = 1
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "p2-knowledge-base"
+SHARD_PAGES = 16
+OBJECT_REF = re.compile(r'\b(\d+) 0 R\b')
+
 def clean_code_text(text):
     """Remove Unicode formatting markers that interfere with code extraction"""
     # Remove right-to-left and left-to-right markers
@@ -240,7 +257,156 @@ def generate_markdown_catalog(all_code_blocks, pdf_name, output_dir):
     
     return catalog_content
 
-def extract_code_from_pdf(pdf_path, output_dir="extracted_code", req_start=1):
+def extract_page_blocks(page_text, page_num, pdf_name):
+    """Classified code blocks, with context, from one page's cleaned text"""
+    blocks = extract_code_blocks_from_text(page_text, page_num)
+    
+    # Add context and classification to each block
+    for block in blocks:
+        language, block_type = classify_code_block(block)
+        context = extract_surrounding_context(page_text, block)
+        
+        block.update({
+            'language': language,
+            'type': block_type,
+            'context': context,
+            'source_pdf': pdf_name,
+            'extraction_status': 'success'
+        })
+    
+    return blocks
+
+def _object_digest(doc, xref, objects):
+    """(digest, referenced xrefs) of one PDF object, memoized in objects by xref"""
+    if xref not in objects:
+        source = doc.xref_object(xref, compressed=True)
+        digest = hashlib.sha1(source.encode('utf-8', 'surrogateescape'))
+        # Image data never changes the text; every other stream (font files, ToUnicode, forms) can
+        if doc.xref_is_stream(xref) and doc.xref_get_key(xref, 'Subtype') != ('name', '/Image'):
+            digest.update(doc.xref_stream_raw(xref) or b"")
+        objects[xref] = (digest.hexdigest(), [int(ref) for ref in OBJECT_REF.findall(source)])
+    return objects[xref]
+
+def page_digest(page, objects=None):
+    """Digest of what a page's text is extracted from: content stream, size and
+    every object reachable from its (possibly inherited) resources.
+    
+    objects memoizes per-object digests across the pages of one document.
+    """
+    doc = page.parent
+    objects = {} if objects is None else objects
+    digest = hashlib.sha1(page.read_contents())
+    digest.update(repr(tuple(page.rect)).encode())
+    
+    # Resources may be inherited from the page tree
+    xref, resources = page.xref, ''
+    while xref:
+        kind, resources = doc.xref_get_key(xref, 'Resources')
+        if kind != 'null':
+            break
+        kind, parent = doc.xref_get_key(xref, 'Parent')
+        xref = int(parent.split()[0]) if kind == 'xref' else 0
+    digest.update(resources.encode('utf-8', 'surrogateescape'))
+    
+    pending = [int(ref) for ref in OBJECT_REF.findall(resources)]
+    reached = set()
+    while pending:
+        xref = pending.pop()
+        if xref in reached or not 0 < xref < doc.xref_length():
+            continue
+        reached.add(xref)
+        pending.extend(_object_digest(doc, xref, objects)[1])
+    for xref in sorted(reached):
+        digest.update(objects[xref][0].encode())
+    return digest.hexdigest()
+
+class PageMemo:
+    """Code blocks already extracted from one PDF's pages, by page digest and number"""
+    
+    def __init__(self, pdf_path, enabled=True):
+        self.enabled = enabled and not os.environ.get("P2KB_NO_CACHE")
+        self.path = Path(os.environ.get("P2KB_CACHE_DIR", DEFAULT_CACHE_DIR)) / "source-code-pages.json"
+        self.pdf_key = os.path.abspath(pdf_path)
+        self.pdfs = {}
+        if self.enabled and self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    memo = json.load(f)
+                if memo.get('version') == EXTRACTOR_VERSION:
+                    self.pdfs = memo.get('pdfs', {})
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Ignoring unreadable page memo {self.path}: {e}")
+        self.previous = self.pdfs.get(self.pdf_key, {})
+        self.current = {}
+        # Object digests shared by the page digests of this run (see page_digest)
+        self.objects = {}
+    
+    @staticmethod
+    def key(digest, page_num):
+        return f"{digest}:{page_num}"
+    
+    def get(self, key):
+        """Memoized blocks for a page (None if it must be extracted)"""
+        if not self.enabled or key not in self.previous:
+            return None
+        self.current[key] = self.previous[key]
+        return self.previous[key]
+    
+    def put(self, key, blocks):
+        self.current[key] = blocks
+    
+    def save(self):
+        """Keep exactly this run's pages for the PDF, so edited pages don't pile up"""
+        if not self.enabled:
+            return
+        self.pdfs[self.pdf_key] = self.current
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(f".tmp{os.getpid()}")
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': EXTRACTOR_VERSION, 'pdfs': self.pdfs}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️  Could not write page memo {self.path}: {e}")
+
+def _extract_shard(pdf_path, pdf_name, page_nums):
+    """Worker process: code blocks for a shard of pages, by page number"""
+    with fitz.open(pdf_path) as doc:
+        return {page_num: extract_page_blocks(clean_code_text(doc.load_page(page_num).get_text()),
+                                              page_num, pdf_name)
+                for page_num in page_nums}
+
+def extract_pages(doc, pdf_path, pdf_name, memo, workers=1):
+    """Code blocks per page number: memoized pages reused, the rest extracted"""
+    page_blocks = {}
+    keys = {}
+    for page_num in range(len(doc)):
+        keys[page_num] = PageMemo.key(page_digest(doc.load_page(page_num), memo.objects), page_num)
+        blocks = memo.get(keys[page_num])
+        if blocks is not None:
+            page_blocks[page_num] = blocks
+    
+    pending = [page_num for page_num in range(len(doc)) if page_num not in page_blocks]
+    if page_blocks:
+        print(f"♻️  Reusing {len(page_blocks)} unchanged pages, extracting {len(pending)}")
+    
+    if workers > 1 and len(pending) > SHARD_PAGES:
+        shards = [pending[start:start + SHARD_PAGES] for start in range(0, len(pending), SHARD_PAGES)]
+        print(f"⚡ Extracting {len(shards)} shards of {SHARD_PAGES} pages with {workers} workers")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for extracted in pool.map(_extract_shard, [pdf_path] * len(shards), [pdf_name] * len(shards), shards):
+                page_blocks.update(extracted)
+    else:
+        for page_num in pending:
+            page_text = clean_code_text(doc.load_page(page_num).get_text())
+            page_blocks[page_num] = extract_page_blocks(page_text, page_num, pdf_name)
+    
+    for page_num in pending:
+        memo.put(keys[page_num], page_blocks[page_num])
+    memo.save()
+    return page_blocks
+
+def extract_code_from_pdf(pdf_path, output_dir="extracted_code", req_start=1, workers=1, use_cache=True):
     """Extract all code blocks from a PDF document to individual files with markdown catalog"""
     
     # Ensure output directory exists
@@ -257,30 +423,26 @@ def extract_code_from_pdf(pdf_path, output_dir="extracted_code", req_start=1):
     all_code_blocks = []
     pdf_name = Path(pdf_path).stem
     
+    page_blocks = extract_pages(doc, pdf_path, pdf_name, PageMemo(pdf_path, use_cache), workers)
+    
     for page_num in range(len(doc)):
-        page = doc.load_page(page_num)
-        page_text = clean_code_text(page.get_text())
-        
-        blocks = extract_code_blocks_from_text(page_text, page_num)
+        blocks = page_blocks[page_num]
         
         if blocks:
             print(f"📋 Page {page_num + 1}: Found {len(blocks)} code blocks")
             
-            # Add context and classification to each block
             for block in blocks:
-                language, block_type = classify_code_block(block)
-                context = extract_surrounding_context(page_text, block)
-                
-                block.update({
-                    'language': language,
-                    'type': block_type,
-                    'context': context,
-                    'source_pdf': pdf_name,
-                    'extraction_status': 'success'
-                })
-                
+                block['source_pdf'] = pdf_name  # Memoized under whatever the PDF was called then
                 all_code_blocks.append(block)
     
+    write_code_outputs(all_code_blocks, pdf_name, output_dir, req_start)
+    
+    doc.close()
+    
+    return all_code_blocks
+
+def write_code_outputs(all_code_blocks, pdf_name, output_dir, req_start=1):
+    """Write one file per code block plus the markdown catalog"""
     # Generate individual files and markdown catalog
     if all_code_blocks:
         req_number = req_start
@@ -313,21 +475,20 @@ def extract_code_from_pdf(pdf_path, output_dir="extracted_code", req_start=1):
         
         print(f"📋 Created catalog: code-catalog.md")
     
-    doc.close()
-    
     print(f"\n🎯 EXTRACTION COMPLETE:")
     print(f"   📊 Total code blocks extracted: {len(all_code_blocks)}")
     print(f"   📁 Output directory: {output_dir}")
     print(f"   📄 Individual files: {len(all_code_blocks)}")
     print(f"   📋 Catalog: code-catalog.md")
-    
-    return all_code_blocks
 
 def main():
     parser = argparse.ArgumentParser(description='Extract source code from P2 PDF documents')
     parser.add_argument('pdf_path', help='Path to PDF file')
     parser.add_argument('-o', '--output', default='extracted_code', help='Output directory')
     parser.add_argument('--test', action='store_true', help='Test mode - process only first 5 pages')
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help='Worker processes for pages not in the page memo (default: 1)')
+    parser.add_argument('--no-cache', action='store_true', help='Re-extract every page, ignoring the page memo')
     
     args = parser.parse_args()
     
@@ -335,7 +496,8 @@ def main():
         print(f"❌ PDF file not found: {args.pdf_path}")
         sys.exit(1)
     
-    code_blocks = extract_code_from_pdf(args.pdf_path, args.output)
+    code_blocks = extract_code_from_pdf(args.pdf_path, args.output, workers=args.workers,
+                                        use_cache=not args.no_cache)
     
     # Summary by language and type
     language_counts = {}
@@ -5,13 +5,14 @@ This creates the packaged, versioned content for AI consumption.
 """
 
 import json
-import yaml
 import os
 from pathlib import Path
 from datetime import datetime
 import shutil
 from typing import Dict, List, Any
 
+from kb_corpus import get_corpus
+
 class AIReferenceGenerator:
     def __init__(self, version: str):
         self.version = version
@@ -19,6 +20,7 @@ class AIReferenceGenerator:
         self.base_path = Path.cwd()
         self.kb_path = self.base_path / "engineering/knowledge-base/P2"
         self.output_path = self.base_path / "deliverables/ai-reference" / f"v{version}"
+        self.corpus = get_corpus()
         self.stats = {
             "instructions": 0,
             "keywords": 0,
@@ -33,9 +35,8 @@ class AIReferenceGenerator:
         }
         
     def load_yaml(self, file_path: Path) -> Dict:
-        """Load and parse a YAML file."""
-        with open(file_path, 'r') as f:
-            return yaml.safe_load(f)
+        """Load and parse a YAML file (served from the shared corpus cache)."""
+        return self.corpus.load(file_path)
     
     def collect_spin2_elements(self) -> Dict[str, List[Dict]]:
         """Collect all SPIN2 language elements from YAML files."""
@@ -292,6 +293,7 @@ Repository: https://github.com/ironsheep/P2-Knowledge-Base
         print(f"\nGeneration complete!")
         print(f"Output: {self.output_path}")
         print(f"Total elements: {self.stats['total_elements']}")
+        print(self.corpus.report())
         
         return self.stats
 
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+P2 Knowledge Base Release Archive Writer
+Streams files straight from their source trees into a reproducible tarball.
+
+Members are added in sorted order with normalized owners, modes and mtimes,
+and the SHA-256 of the compressed archive is computed as it is written, so
+release checksums never need a second read of the finished file. The
+archive is written to a temporary file next to its destination and only
+renamed into place once it is complete, so a failed build never leaves a
+truncated archive behind.
+
+Compression backends:
+    gzip   - single-threaded gzip (stdlib)
+    pgzip  - parallel gzip: the stream is cut into blocks that are deflated
+             concurrently (each primed with the previous 32 KiB, like pigz)
+             and joined into a single standard gzip member
+    zstd   - Zstandard via the optional `zstandard` package (multi-threaded)
+
+Usage:
+    from kb_archive import ArchiveWriter
+
+    with ArchiveWriter(Path("releases/v1.3.0/p2-complete-kb-v1.3.0.tar.gz"),
+                       compression="pgzip", jobs=8, mtime=epoch) as archive:
+        archive.add_tree(kb_path, "p2-complete-kb-v1.3.0/P2")
+        archive.add_bytes("p2-complete-kb-v1.3.0/MANIFEST.json", manifest_bytes)
+    print(archive.sha256)
+"""
+
+import fnmatch
+import gzip
+import hashlib
+import io
+import os
+import struct
+import tarfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional
+
+COMPRESSIONS = ("gzip", "pgzip", "zstd")
+ARCHIVE_SUFFIXES = {"gzip": ".tar.gz", "pgzip": ".tar.gz", "zstd": ".tar.zst"}
+DEFAULT_IGNORE = ('.DS_Store', '*.pyc', '__pycache__', '.git*')
+
+PGZIP_BLOCK_SIZE = 128 * 1024   # pigz default
+DEFLATE_WINDOW = 32 * 1024
+
+
+class HashingWriter:
+    """File wrapper that feeds everything written through SHA-256"""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.fileobj.write(data)
+
+    def flush(self) -> None:
+        self.fileobj.flush()
+
+
+def _deflate_block(block: bytes, level: int, zdict: bytes, last: bool) -> bytes:
+    """Raw-deflate one block; non-final blocks end byte-aligned so blocks concatenate."""
+    if zdict:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, 9,
+                                      zlib.Z_DEFAULT_STRATEGY, zdict)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, 9)
+    return compressor.compress(block) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+class ParallelGzipWriter:
+    """pigz-style gzip writer: blocks are deflated on a thread pool, output stays ordered.
+
+    zlib releases the GIL while compressing, so threads scale across cores.
+    The output is one ordinary gzip member and depends only on the data,
+    level and block size - never on the number of threads.
+    """
+
+    def __init__(self, fileobj, level: int = 9, jobs: int = 4, mtime: int = 0,
+                 block_size: int = PGZIP_BLOCK_SIZE):
+        self.fileobj = fileobj
+        self.level = level
+        self.jobs = max(1, jobs)
+        self.block_size = block_size
+        self._buffer = bytearray()
+        self._dictionary = b""
+        self._crc = 0
+        self._size = 0
+        self._pending = deque()
+        self._pool = ThreadPoolExecutor(max_workers=self.jobs)
+
+        # Same header layout the gzip module writes (no file name, OS unknown)
+        xfl = 2 if level == 9 else (4 if level == 1 else 0)
+        self.fileobj.write(b"\x1f\x8b\x08\x00" + struct.pack("<I", mtime) + bytes([xfl, 255]))
+
+    def write(self, data) -> int:
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += len(data)
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            block = bytes(self._buffer[:self.block_size])
+            del self._buffer[:self.block_size]
+            self._submit(block, last=False)
+        return len(data)
+
+    def _submit(self, block: bytes, last: bool) -> None:
+        self._pending.append(self._pool.submit(_deflate_block, block, self.level,
+                                               self._dictionary, last))
+        self._dictionary = (self._dictionary + block)[-DEFLATE_WINDOW:]
+        # Bound memory: keep at most two blocks in flight per worker
+        while len(self._pending) > self.jobs * 2:
+            self.fileobj.write(self._pending.popleft().result())
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self._submit(bytes(self._buffer), last=True)
+        self._buffer.clear()
+        while self._pending:
+            self.fileobj.write(self._pending.popleft().result())
+        self._pool.shutdown()
+        self.fileobj.write(struct.pack("<II", self._crc & 0xffffffff, self._size & 0xffffffff))
+
+    def abort(self) -> None:
+        """Stop compressing without writing anything further."""
+        self._pending.clear()
+        self._pool.shutdown(cancel_futures=True)
+
+
+class ArchiveWriter:
+    """Streaming, reproducible tarball writer that checksums while it writes"""
+
+    def __init__(self, path: Path, compression: str = "gzip", jobs: int = 1,
+                 mtime: int = 0, level: Optional[int] = None):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression '{compression}' (expected one of {', '.join(COMPRESSIONS)})")
+
+        self.path = Path(path)
+        self.compression = compression
+        self.mtime = mtime
+        self.sha256 = None
+        self.size = 0
+        self.members = 0
+
+        # Renamed to path by close(); an existing archive at path stays intact until then
+        self._tmp_path = self.path.with_name(f".{self.path.name}.tmp{os.getpid()}")
+        self._raw = open(self._tmp_path, 'wb')
+        self._hashing = HashingWriter(self._raw)
+        if compression == "gzip":
+            self._compressor = gzip.GzipFile(filename="", mode="wb", fileobj=self._hashing,
+                                             compresslevel=level or 9, mtime=mtime)
+        elif compression == "pgzip":
+            self._compressor = ParallelGzipWriter(self._hashing, level=level or 9,
+                                                  jobs=jobs, mtime=mtime)
+        else:
+            try:
+                import zstandard
+            except ImportError:
+                self._raw.close()
+                self._tmp_path.unlink()
+                raise RuntimeError("zstd compression requires the 'zstandard' package (pip install zstandard)")
+            cctx = zstandard.ZstdCompressor(level=level or 19, threads=jobs if jobs > 1 else 0)
+            self._compressor = cctx.stream_writer(self._hashing, closefd=False)
+
+        self._tar = tarfile.open(fileobj=self._compressor, mode="w|", format=tarfile.PAX_FORMAT)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def _normalize(self, tarinfo: tarfile.TarInfo) -> tarfile.TarInfo:
+        """Strip host-specific metadata so identical inputs give identical archives."""
+        tarinfo.mtime = self.mtime
+        tarinfo.uid = tarinfo.gid = 0
+        tarinfo.uname = tarinfo.gname = ""
+        tarinfo.mode = 0o755 if tarinfo.isdir() else 0o644
+        return tarinfo
+
+    def add_directory(self, arcname: str) -> None:
+        """Add an empty directory entry."""
+        info = tarfile.TarInfo(arcname)
+        info.type = tarfile.DIRTYPE
+        self._tar.addfile(self._normalize(info))
+        self.members += 1
+
+    def add_file(self, source: Path, arcname: str) -> None:
+        """Stream one file from disk into the archive."""
+        self._tar.add(str(source), arcname=arcname, recursive=False, filter=self._normalize)
+        self.members += 1
+
+    def add_bytes(self, arcname: str, data: bytes) -> None:
+        """Add an in-memory file."""
+        info = tarfile.TarInfo(arcname)
+        info.size = len(data)
+        self._tar.addfile(self._normalize(info), io.BytesIO(data))
+        self.members += 1
+
+    def add_tree(self, source_dir: Path, arcname: str,
+                 ignore: Iterable[str] = DEFAULT_IGNORE, exclude: Iterable[str] = ()) -> None:
+        """Stream a directory tree in sorted order, skipping ignored names and excluded top-level entries."""
+        source_dir = Path(source_dir)
+        ignore = tuple(ignore)
+        exclude = set(exclude)
+        self.add_directory(arcname)
+        for dirpath, dirnames, filenames in os.walk(source_dir):
+            rel_dir = Path(dirpath).relative_to(source_dir)
+            names = [n for n in dirnames + filenames
+                     if not any(fnmatch.fnmatch(n, pattern) for pattern in ignore)
+                     and not (rel_dir == Path(".") and n in exclude)]
+            dirnames[:] = sorted(d for d in dirnames if d in names)
+            for name in sorted(names):
+                member_arcname = str(Path(arcname) / rel_dir / name)
+                if name in dirnames:
+                    self.add_directory(member_arcname)
+                else:
+                    self.add_file(Path(dirpath) / name, member_arcname)
+
+    def close(self) -> str:
+        """Finish the archive, move it into place and return its SHA-256."""
+        if self.sha256 is None:
+            try:
+                self._tar.close()
+                self._compressor.close()
+                self._raw.close()
+                os.replace(self._tmp_path, self.path)
+            except BaseException:
+                self.abort()
+                raise
+            self.sha256 = self._hashing.sha256.hexdigest()
+            self.size = self._hashing.size
+        return self.sha256
+
+    def abort(self) -> None:
+        """Discard the partly written archive, leaving path as it was."""
+        if self.sha256 is not None:
+            return
+        # Close the streams into the file that is about to be deleted, so they don't flush at exit
+        try:
+            self._tar.close()
+            if isinstance(self._compressor, ParallelGzipWriter):
+                self._compressor.abort()
+            else:
+                self._compressor.close()
+        except Exception:
+            pass
+        self._raw.close()
+        try:
+            self._tmp_path.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+P2 Knowledge Base YAML Corpus Loader
+Shared, cached access to the parsed YAML files under engineering/knowledge-base/P2.
+
+Every tool that walks the knowledge base (packagers, validators, conflict
+tracking, AI reference generation) loads YAML through this module. Parsed
+entries are kept in an on-disk cache keyed by path, mtime and size, so only
+files that changed since the last run are parsed again.
+
+Usage:
+    from kb_corpus import get_corpus
+
+    corpus = get_corpus()
+    data = corpus.load(kb_path / "language/spin2/methods/pinwrite.yaml")
+    for yaml_file, data in corpus.iter_yaml(kb_path / "language/pasm2", "*.yaml"):
+        ...
+    print(corpus.report())
+
+get_corpus() with no argument returns the corpus rooted at KB_ROOT, which
+all of these tools share, so they read and write one cache file. Files
+are cached by absolute path, so files outside the root load fine too.
+
+The cache lives in $P2KB_CACHE_DIR (default: ~/.cache/p2-knowledge-base).
+Set P2KB_NO_CACHE=1 to bypass it completely.
+
+Parsing and emitting use the libyaml C bindings (CSafeLoader/CSafeDumper)
+when PyYAML was built with them, and the pure-Python SafeLoader/SafeDumper
+otherwise. Set P2KB_PURE_YAML=1 to force the pure-Python implementation.
+Tools that read or write YAML outside the corpus should use safe_load() and
+safe_dump() from this module instead of the yaml.safe_* functions.
+"""
+
+import atexit
+import hashlib
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+import yaml
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "p2-knowledge-base"
+KB_ROOT = Path(__file__).resolve().parents[1] / "knowledge-base" / "P2"
+
+PathLike = Union[str, Path]
+
+# Prefer the libyaml C implementation; fall back cleanly when PyYAML lacks it
+if getattr(yaml, "CSafeLoader", None) and not os.environ.get("P2KB_PURE_YAML"):
+    SafeLoader = yaml.CSafeLoader
+    SafeDumper = yaml.CSafeDumper
+    YAML_BACKEND = "libyaml"
+else:
+    SafeLoader = yaml.SafeLoader
+    SafeDumper = yaml.SafeDumper
+    YAML_BACKEND = "python"
+
+
+def safe_load(stream: Any) -> Any:
+    """yaml.safe_load using the fastest available safe loader"""
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def safe_dump(data: Any, stream: Any = None, **kwargs) -> Any:
+    """yaml.safe_dump using the fastest available safe dumper"""
+    return yaml.dump(data, stream, Dumper=SafeDumper, **kwargs)
+
+
+class CorpusLoadError(yaml.YAMLError):
+    """A YAML file in the corpus could not be parsed (possibly a cached failure)"""
+
+
+def _parse_for_cache(path: str) -> Optional[Tuple[str, int, int, Optional[bytes], Optional[str]]]:
+    """Worker: parse one YAML file into a cache record (path, mtime_ns, size, blob, error).
+
+    Returns None for failures that are not YAML errors (unreadable file, bad
+    encoding) so the caller's serial load() reports them the usual way.
+    """
+    try:
+        st = os.stat(path)
+        with open(path, 'r') as f:
+            data = safe_load(f)
+    except yaml.YAMLError as e:
+        return path, st.st_mtime_ns, st.st_size, None, str(e)
+    except Exception:
+        return None
+    return path, st.st_mtime_ns, st.st_size, pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL), None
+
+
+class YAMLCorpus:
+    """Parsed-YAML cache for one directory tree"""
+
+    def __init__(self, root: PathLike, cache_dir: Optional[PathLike] = None,
+                 use_cache: bool = True):
+        self.root = Path(root).resolve()
+        self.use_cache = use_cache and not os.environ.get("P2KB_NO_CACHE")
+        self.cache_dir = Path(cache_dir or os.environ.get("P2KB_CACHE_DIR", DEFAULT_CACHE_DIR))
+        root_key = hashlib.sha1(str(self.root).encode("utf-8")).hexdigest()[:16]
+        self.cache_file = self.cache_dir / f"corpus-{root_key}.pickle"
+
+        # path -> (mtime_ns, size, pickled_data, error)
+        self._entries: Dict[str, Tuple[int, int, Optional[bytes], Optional[str]]] = {}
+        self._dirty = False
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "invalidated": 0,
+            "errors": 0,
+        }
+
+        if self.use_cache:
+            self._read_cache()
+
+    def _read_cache(self) -> None:
+        """Load the on-disk cache, discarding it if unreadable or outdated"""
+        if not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, 'rb') as f:
+                cached = pickle.load(f)
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable corpus cache {self.cache_file}: {e}")
+            return
+
+        if (cached.get("format") != CACHE_FORMAT_VERSION
+                or cached.get("root") != str(self.root)
+                or cached.get("yaml_version") != yaml.__version__
+                or cached.get("yaml_backend") != YAML_BACKEND):
+            return
+        self._entries = cached.get("entries", {})
+
+    def load(self, file_path: PathLike) -> Any:
+        """Return the parsed contents of a YAML file, parsing only on cache miss.
+
+        Each call returns a fresh object, so callers may mutate the result.
+        Raises CorpusLoadError (a yaml.YAMLError) or OSError like yaml.safe_load would.
+        """
+        path = Path(file_path).resolve()
+        key = str(path)
+        st = path.stat()
+
+        cached = self._entries.get(key)
+        if cached is not None:
+            mtime_ns, size, blob, error = cached
+            if mtime_ns == st.st_mtime_ns and size == st.st_size:
+                self.stats["hits"] += 1
+                if error is not None:
+                    raise CorpusLoadError(error)
+                return pickle.loads(blob)
+            self.stats["invalidated"] += 1
+
+        self.stats["misses"] += 1
+        try:
+            with open(path, 'r') as f:
+                data = safe_load(f)
+        except yaml.YAMLError as e:
+            self.stats["errors"] += 1
+            self._store(key, st, None, str(e))
+            raise CorpusLoadError(str(e)) from e
+
+        blob = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        self._store(key, st, blob, None)
+        return pickle.loads(blob)
+
+    def prefetch(self, paths: Iterable[PathLike], jobs: int = 1) -> int:
+        """Parse every uncached or stale file in paths across a pool of jobs processes.
+
+        Results go into the cache only; later load() calls are served from it,
+        so callers keep their serial, deterministic iteration order. Returns the
+        number of files parsed.
+        """
+        if jobs <= 1:
+            return 0
+
+        stale = []
+        for file_path in paths:
+            path = Path(file_path).resolve()
+            cached = self._entries.get(str(path))
+            if cached is not None:
+                st = path.stat()
+                if cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                    continue
+                self.stats["invalidated"] += 1
+            stale.append(str(path))
+
+        if not stale:
+            return 0
+
+        parsed = 0
+        chunksize = max(1, len(stale) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for record in pool.map(_parse_for_cache, stale, chunksize=chunksize):
+                if record is None:
+                    continue
+                key, mtime_ns, size, blob, error = record
+                self.stats["misses"] += 1
+                if error is not None:
+                    self.stats["errors"] += 1
+                self._entries[key] = (mtime_ns, size, blob, error)
+                self._dirty = True
+                parsed += 1
+        return parsed
+
+    def _store(self, key: str, st: os.stat_result, blob: Optional[bytes],
+               error: Optional[str]) -> None:
+        self._entries[key] = (st.st_mtime_ns, st.st_size, blob, error)
+        self._dirty = True
+
+    def iter_yaml(self, directory: PathLike, pattern: str = "**/*.yaml",
+                  skip_errors: bool = True) -> Iterator[Tuple[Path, Any]]:
+        """Yield (path, data) for every YAML file matching pattern, in sorted order.
+
+        Unparseable files are reported and skipped unless skip_errors is False.
+        """
+        for yaml_file in sorted(Path(directory).glob(pattern)):
+            try:
+                data = self.load(yaml_file)
+            except (yaml.YAMLError, OSError) as e:
+                if not skip_errors:
+                    raise
+                print(f"Warning: Could not load {yaml_file}: {e}")
+                continue
+            yield yaml_file, data
+
+    def invalidate(self, file_path: Optional[PathLike] = None) -> None:
+        """Drop one file (or, with no argument, every file) from the cache"""
+        if file_path is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(str(Path(file_path).resolve()), None)
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache back to disk, pruning files that no longer exist"""
+        if not self.use_cache or not self._dirty:
+            return
+
+        for key in [k for k in self._entries if not os.path.exists(k)]:
+            del self._entries[key]
+
+        payload = {
+            "format": CACHE_FORMAT_VERSION,
+            "root": str(self.root),
+            "yaml_version": yaml.__version__,
+            "yaml_backend": YAML_BACKEND,
+            "entries": self._entries,
+        }
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix(f".tmp{os.getpid()}")
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.cache_file)
+            self._dirty = False
+        except OSError as e:
+            print(f"Warning: Could not write corpus cache {self.cache_file}: {e}")
+
+    def report(self) -> str:
+        """One-line cache hit/miss summary"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        hit_rate = (self.stats["hits"] / lookups * 100) if lookups else 0.0
+        return (f"YAML corpus cache ({YAML_BACKEND}): {self.stats['hits']} hits, "
+                f"{self.stats['misses']} misses "
+                f"({self.stats['invalidated']} invalidated, {self.stats['errors']} errors), "
+                f"{hit_rate:.1f}% hit rate")
+
+
+_corpora: Dict[str, YAMLCorpus] = {}
+
+
+def get_corpus(root: Optional[PathLike] = None) -> YAMLCorpus:
+    """Return the shared YAMLCorpus for root (default KB_ROOT); it is saved automatically at exit"""
+    key = str(Path(root or KB_ROOT).resolve())
+    if key not in _corpora:
+        _corpora[key] = YAMLCorpus(key)
+    return _corpora[key]
+
+
+def save_all() -> None:
+    """Persist every corpus opened through get_corpus()"""
+    for corpus in _corpora.values():
+        corpus.save()
+
+
+atexit.register(save_all)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    root = Path(sys.argv[1]) if len(sys.argv) > 1 else KB_ROOT
+    if len(sys.argv) > 2 and sys.argv[2] == "--clear":
+        corpus = get_corpus(root)
+        corpus.invalidate()
+        corpus.save()
+        print(f"Cleared corpus cache {corpus.cache_file}")
+        sys.exit(0)
+
+    start = time.perf_counter()
+    corpus = get_corpus(root)
+    count = sum(1 for _ in corpus.iter_yaml(root))
+    elapsed = time.perf_counter() - start
+    print(f"Loaded {count} YAML files from {root} in {elapsed * 1000:.0f} ms")
+    print(corpus.report())
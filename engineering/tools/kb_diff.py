@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+P2 Knowledge Base Structural Diff
+Merkle-hashed structural diff of parsed YAML entries, as JSON Patch operations.
+
+Every dict and list gets a digest built from its children's digests (dict
+keys in any order, list items in order; numbers by value, so 1, 1.0 and
+True hash alike, as they compare equal in Python). Subtrees with the same
+digest are equal and are skipped without being walked. Digests are
+memoized per object for the life of a StructuralDiff, so an entry diffed
+against several versions is hashed once; treat diffed data as read-only
+while the StructuralDiff is in use.
+
+Lists are matched by digest from both ends first, so inserting or
+removing an item yields one add/remove instead of a replace for every
+item after it.
+
+diff() returns RFC 6902 operations (add, remove, replace; paths are JSON
+Pointers) that turn the old value into the new one when applied in order.
+diff_many() diffs a batch of pairs, across a process pool when asked.
+
+Usage:
+    from kb_diff import StructuralDiff, diff, diff_many
+
+    diff({'timing': {'cycles': 2}}, {'timing': {'cycles': 4}})
+    # [{'op': 'replace', 'path': '/timing/cycles', 'value': 4}]
+
+    patches = diff_many([(old, new), ...], workers=4)
+"""
+
+import hashlib
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Below this many pairs a process pool costs more than it saves
+MIN_PARALLEL_PAIRS = 64
+
+Patch = List[Dict[str, Any]]
+
+
+def pointer_token(key: Any) -> str:
+    """A dict key or list index as a JSON Pointer reference token"""
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def _scalar_bytes(value: Any) -> bytes:
+    """Tagged bytes of a scalar; equal (==) scalars give equal bytes"""
+    if value is None:
+        return b'z'
+    if isinstance(value, str):
+        return b's' + value.encode('utf-8', 'surrogatepass')
+    if isinstance(value, (bool, int, float)):
+        if isinstance(value, float) and math.isfinite(value) and value.is_integer():
+            value = int(value)
+        return b'n' + repr(int(value) if isinstance(value, bool) else value).encode()
+    return b'o' + type(value).__name__.encode() + b':' + repr(value).encode('utf-8', 'surrogatepass')
+
+
+class StructuralDiff:
+    """Structural diffs with subtree digests memoized across calls"""
+
+    def __init__(self):
+        # id(container) -> (container, digest); the container is kept so its id stays unique
+        self._digests: Dict[int, Tuple[Any, bytes]] = {}
+
+    def digest(self, value: Any) -> bytes:
+        """Merkle digest of a value: equal digests mean equal values"""
+        if not isinstance(value, (dict, list)):
+            return hashlib.blake2b(_scalar_bytes(value), digest_size=16).digest()
+        cached = self._digests.get(id(value))
+        if cached is not None and cached[0] is value:
+            return cached[1]
+
+        h = hashlib.blake2b(digest_size=16)
+        if isinstance(value, dict):
+            h.update(b'd')
+            for pair in sorted(self.digest(k) + self.digest(v) for k, v in value.items()):
+                h.update(pair)
+        else:
+            h.update(b'l')
+            for item in value:
+                h.update(self.digest(item))
+        digest = h.digest()
+        self._digests[id(value)] = (value, digest)
+        return digest
+
+    def same(self, old: Any, new: Any) -> bool:
+        """Whether two values are structurally equal"""
+        if isinstance(old, (dict, list)) and isinstance(new, (dict, list)):
+            return self.digest(old) == self.digest(new)
+        return old == new
+
+    def diff(self, old: Any, new: Any) -> Patch:
+        """JSON Patch operations that turn old into new"""
+        ops: Patch = []
+        self._diff(old, new, '', ops)
+        return ops
+
+    def _diff(self, old: Any, new: Any, path: str, ops: Patch) -> None:
+        if old is new:
+            return
+        if isinstance(old, dict) and isinstance(new, dict):
+            if self.digest(old) != self.digest(new):
+                self._diff_dict(old, new, path, ops)
+        elif isinstance(old, list) and isinstance(new, list):
+            if self.digest(old) != self.digest(new):
+                self._diff_list(old, new, path, ops)
+        elif isinstance(old, (dict, list)) or isinstance(new, (dict, list)) or old != new:
+            ops.append({'op': 'replace', 'path': path, 'value': new})
+
+    def _diff_dict(self, old: Dict, new: Dict, path: str, ops: Patch) -> None:
+        for key, value in new.items():
+            key_path = f"{path}/{pointer_token(key)}"
+            if key in old:
+                self._diff(old[key], value, key_path, ops)
+            else:
+                ops.append({'op': 'add', 'path': key_path, 'value': value})
+        for key in old:
+            if key not in new:
+                ops.append({'op': 'remove', 'path': f"{path}/{pointer_token(key)}"})
+
+    def _diff_list(self, old: List, new: List, path: str, ops: Patch) -> None:
+        old_digests = [self.digest(item) for item in old]
+        new_digests = [self.digest(item) for item in new]
+
+        # Equal items at both ends stay where they are
+        start = 0
+        limit = min(len(old), len(new))
+        while start < limit and old_digests[start] == new_digests[start]:
+            start += 1
+        end = 0
+        while end < limit - start and old_digests[-1 - end] == new_digests[-1 - end]:
+            end += 1
+
+        old_middle = len(old) - end - start
+        new_middle = len(new) - end - start
+        for offset in range(min(old_middle, new_middle)):
+            index = start + offset
+            self._diff(old[index], new[index], f"{path}/{index}", ops)
+        for index in range(start + old_middle, start + new_middle):
+            ops.append({'op': 'add', 'path': f"{path}/{index}", 'value': new[index]})
+        # Highest index first, so the indexes of the removals still to come don't shift
+        for index in range(start + old_middle - 1, start + new_middle - 1, -1):
+            ops.append({'op': 'remove', 'path': f"{path}/{index}"})
+
+
+def diff(old: Any, new: Any) -> Patch:
+    """JSON Patch operations that turn old into new"""
+    return StructuralDiff().diff(old, new)
+
+
+def _diff_pair(pair: Tuple[Any, Any]) -> Patch:
+    """Worker: diff one (old, new) pair"""
+    return StructuralDiff().diff(*pair)
+
+
+def diff_many(pairs: Sequence[Tuple[Any, Any]], workers: Optional[int] = 1,
+              differ: Optional[StructuralDiff] = None) -> List[Patch]:
+    """Patches for a batch of (old, new) pairs, in order.
+
+    With workers > 1 (None: one per CPU) and enough pairs, the pairs are
+    diffed across a process pool; otherwise serially with differ (or a new
+    StructuralDiff), reusing its memoized digests.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(pairs) < MIN_PARALLEL_PAIRS:
+        differ = differ or StructuralDiff()
+        return [differ.diff(old, new) for old, new in pairs]
+
+    chunksize = max(1, len(pairs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_diff_pair, pairs, chunksize=chunksize))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark OBEX object-page parsing: BeautifulSoup html.parser vs single-pass lxml.
+
+Runs both OBEXDiscovery detail parsers over recorded object pages (the
+layout written by `obex_discovery.py --record-dir`), reports the CPU time
+per page for each, and checks that both produce identical fields.
+
+Differences come from malformed markup: html.parser does not apply
+HTML's implied end tags (an unclosed <p> swallows the next paragraph), lxml
+does, like a browser.
+
+Usage:
+    python3 benchmark_obex_parsing.py recordings/ [--rounds 5]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from bs4 import BeautifulSoup
+
+import obex_fastparse
+from obex_discovery import OBEXDiscovery
+
+
+def load_pages(recordings: Path) -> List[Tuple[str, bytes]]:
+    """Recorded object pages (recordings/obex/<slug>/index.html)"""
+    return [(page.parent.name, page.read_bytes())
+            for page in sorted(recordings.glob('obex/*/index.html'))]
+
+
+def soup_parser(discovery: OBEXDiscovery) -> Callable[[bytes], Dict]:
+    def parse(content: bytes) -> Dict:
+        return discovery.parse_detail_page({}, BeautifulSoup(content, 'html.parser'))
+    return parse
+
+
+def lxml_parser(discovery: OBEXDiscovery) -> Callable[[bytes], Dict]:
+    def parse(content: bytes) -> Dict:
+        return discovery.parse_detail_content({}, content)
+    return parse
+
+
+def time_parser(parse: Callable[[bytes], Dict], pages: List[Tuple[str, bytes]], rounds: int) -> float:
+    """Best-of-N CPU seconds to parse every page once"""
+    best = None
+    for _ in range(rounds):
+        start = time.process_time()
+        for _, content in pages:
+            parse(content)
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare OBEX object-page parser backends')
+    parser.add_argument('recordings', help='Directory of recorded pages (see obex_standin_server.py)')
+    parser.add_argument('--rounds', type=int, default=5, help='Timing rounds, best is reported (default: 5)')
+    args = parser.parse_args()
+
+    if not obex_fastparse.AVAILABLE:
+        print("lxml is not installed - nothing to compare (pip3 install lxml)")
+        sys.exit(1)
+
+    pages = load_pages(Path(args.recordings))
+    if not pages:
+        print(f"No recorded object pages under {args.recordings}/obex/")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        discovery = OBEXDiscovery(base_dir=scratch, use_cache=False)
+        discovery.fast_parse = True
+        soup_parse, lxml_parse = soup_parser(discovery), lxml_parser(discovery)
+
+        # Both backends should agree before their speed means anything
+        mismatches = {}
+        for slug, content in pages:
+            soup_fields, lxml_fields = soup_parse(content), lxml_parse(content)
+            differing = sorted(k for k in set(soup_fields) | set(lxml_fields)
+                               if soup_fields.get(k) != lxml_fields.get(k))
+            if differing:
+                mismatches[slug] = differing
+
+        total_kb = sum(len(content) for _, content in pages) // 1024
+        print(f"OBEX parsing benchmark: {len(pages)} object pages ({total_kb} KB), best of {args.rounds}")
+        print("=" * 60)
+        results = {}
+        for name, parse in (("html.parser", soup_parse), ("lxml", lxml_parse)):
+            results[name] = time_parser(parse, pages, args.rounds)
+            per_page_ms = results[name] * 1000 / len(pages)
+            print(f"{name:>12}: {results[name] * 1000:8.1f} ms total   {per_page_ms:7.2f} ms/page CPU")
+        print("-" * 60)
+        print(f"     speedup: {results['html.parser'] / results['lxml']:.1f}x")
+
+    if mismatches:
+        print(f"⚠️  {len(mismatches)} of {len(pages)} pages parsed differently (malformed markup?):")
+        for slug, fields in list(mismatches.items())[:10]:
+            print(f"  • {slug}: {', '.join(fields)}")
+        sys.exit(1)
+    print(f"✅ Identical fields from both parsers on all {len(pages)} pages")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,112 +4,53 @@ Comprehensive P2 OBEX Discovery - Pages 1,3-14
 Skips broken page 2, processes all other available pages
 """
 
-import requests
 import re
-import time
-import yaml
-from urllib.parse import urljoin
 from bs4 import BeautifulSoup
 from typing import Dict, List, Optional
 from datetime import datetime
-from pathlib import Path
 import sys
 
-class ComprehensiveP2Discovery:
-    def __init__(self, base_dir: str = None):
-        self.base_url = "https://obex.parallax.com"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'P2-Knowledge-Base/1.0 (Educational/Research Purpose)'
-        })
-        
-        # Setup paths
-        if base_dir:
-            self.base_dir = Path(base_dir)
-        else:
-            self.base_dir = Path(__file__).parent.parent.parent / "knowledge-base" / "external-resources" / "obex"
-        
-        self.objects_dir = self.base_dir / "objects"
+from obex_engine import OBEXCrawlerEngine
+
+class ComprehensiveP2Discovery(OBEXCrawlerEngine):
+    # Objects whose page could not be fetched are not confirmed P2 objects
+    keep_failed_objects = False
+
+    def __init__(self, base_dir: str = None, **engine_options):
+        super().__init__(base_dir, **engine_options)
         self.request_delay = 1.5
         
         # Pages to process (skip broken page 2)
         self.pages_to_process = [1] + list(range(3, 15))  # 1,3,4,5,6,7,8,9,10,11,12,13,14
         
         # Statistics
-        self.stats = {
-            'pages_processed': 0,
+        self.stats.update({
             'pages_failed': 0,
-            'objects_discovered': 0,
-            'objects_validated': 0,
             'p2_objects': 0,
-            'p1_objects_skipped': 0,
-            'errors': []
-        }
+            'p1_objects_skipped': 0
+        })
 
     def discover_all_p2_objects(self) -> List[Dict]:
         """Discover P2 objects from specified pages"""
         print(f"🔍 Starting comprehensive P2 discovery...")
         print(f"📄 Processing pages: {self.pages_to_process}")
         
-        all_objects = []
-        
-        for page_num in self.pages_to_process:
-            if page_num == 1:
-                url = f"{self.base_url}/microcontroller/propeller-2/"
-            else:
-                url = f"{self.base_url}/microcontroller/propeller-2/page/{page_num}/"
-                
-            print(f"  📄 Processing page {page_num}: {url}")
-            
-            try:
-                response = self.session.get(url)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                page_objects = self._extract_objects_from_page(soup, page_num)
-                
-                if page_objects:
-                    all_objects.extend(page_objects)
-                    self.stats['pages_processed'] += 1
-                    print(f"  📦 Found {len(page_objects)} objects on page {page_num}")
-                else:
-                    print(f"  ⚠️  No objects found on page {page_num}")
-                
-                # Rate limiting
-                time.sleep(self.request_delay)
-                
-            except requests.RequestException as e:
-                error = f"Error processing page {page_num}: {e}"
-                print(f"  ❌ {error}")
-                self.stats['errors'].append(error)
-                self.stats['pages_failed'] += 1
-                continue
+        pages = [(page_num, f"{self.base_url}/microcontroller/propeller-2/" if page_num == 1
+                  else f"{self.base_url}/microcontroller/propeller-2/page/{page_num}/")
+                 for page_num in self.pages_to_process]
+        # Fixed page list: carry on past empty or failing pages
+        all_objects = self.crawl_listing(pages, stop_when_empty=False, stop_on_error=False)
                 
         print(f"🎯 Discovery complete: {len(all_objects)} objects discovered across {self.stats['pages_processed']} pages")
         return all_objects
 
-    def _extract_objects_from_page(self, soup: BeautifulSoup, page_num: int) -> List[Dict]:
+    def parse_listing_page(self, soup: BeautifulSoup, page_num: int, context=None) -> List[Dict]:
         """Extract object metadata from page"""
         objects = []
         
         # Look for object title links that go to /obex/object-name/
-        object_links = soup.find_all('a', href=re.compile(r'/obex/[^/]+/$'))
-        
-        for link in object_links:
+        for link, title, slug, url in self.iter_object_links(soup):
             try:
-                title = link.get_text().strip()
-                url = urljoin(self.base_url, link['href'])
-                
-                if not title or '/page/' in url:
-                    continue
-                    
-                # Extract object slug
-                slug_match = re.search(r'/obex/([^/]+)/$', url)
-                if not slug_match:
-                    continue
-                    
-                slug = slug_match.group(1)
-                
                 object_data = {
                     'title': title,
                     'slug': slug,
@@ -128,70 +69,46 @@ class ComprehensiveP2Discovery:
                 
         return objects
 
-    def extract_detailed_metadata(self, object_data: Dict) -> Optional[Dict]:
+    def parse_detail_page(self, object_data: Dict, soup: BeautifulSoup) -> Optional[Dict]:
         """Extract detailed metadata and filter P1 objects"""
-        print(f"  🔍 Processing: {object_data['title']}")
-        
-        try:
-            response = self.session.get(object_data['url'])
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract Object ID
-            object_id = self._extract_object_id(soup)
-            if not object_id:
-                print(f"    ⚠️  No object ID found, skipping")
-                return None
-                
-            object_data['object_id'] = object_id
-            object_data['download_url'] = f"{self.base_url}/wp-admin/admin-ajax.php?action=download_obex_zip&popcorn=salty&obuid=OB{object_id}"
-            
-            # Extract technical details and check P1/P2 compatibility
-            technical_details = self._extract_technical_details(soup)
-            object_data.update(technical_details)
-            
-            # P1/P2 filtering - CRITICAL CHECK
-            languages = object_data.get('languages', [])
-            microcontrollers = object_data.get('microcontrollers', [])
-            
-            # Check for P1 contamination indicators
-            page_text = soup.get_text().upper()
-            is_p1_object = (
-                'PROPELLER 1' in page_text or 
-                ('PASM' in languages and 'PASM2' not in languages and 'SPIN2' not in languages) or
-                ('P1' in microcontrollers and 'P2' not in microcontrollers)
-            )
-            
-            if is_p1_object:
-                print(f"    ❌ P1 object detected, skipping")
-                self.stats['p1_objects_skipped'] += 1
-                return None
-            
-            # Extract enhanced metadata
-            object_data['description'] = self._extract_description(soup)
-            object_data['author'] = self._extract_author(soup)
-            
-            self.stats['objects_validated'] += 1
-            self.stats['p2_objects'] += 1
-            print(f"    ✅ P2 object confirmed: {object_id}")
-            
-            time.sleep(self.request_delay)
-            return object_data
+        # Extract Object ID
+        object_id = self._extract_object_id(soup)
+        if not object_id:
+            print(f"    ⚠️  No object ID found, skipping")
+            return None
             
-        except Exception as e:
-            error = f"Error processing {object_data['title']}: {e}"
-            print(f"    ❌ {error}")
-            self.stats['errors'].append(error)
+        object_data['object_id'] = object_id
+        object_data['download_url'] = self.download_url(object_id)
+        
+        # Extract technical details and check P1/P2 compatibility
+        technical_details = self._extract_technical_details(soup)
+        object_data.update(technical_details)
+        
+        # P1/P2 filtering - CRITICAL CHECK
+        languages = object_data.get('languages', [])
+        microcontrollers = object_data.get('microcontrollers', [])
+        
+        # Check for P1 contamination indicators
+        page_text = soup.get_text().upper()
+        is_p1_object = (
+            'PROPELLER 1' in page_text or 
+            ('PASM' in languages and 'PASM2' not in languages and 'SPIN2' not in languages) or
+            ('P1' in microcontrollers and 'P2' not in microcontrollers)
+        )
+        
+        if is_p1_object:
+            print(f"    ❌ P1 object detected, skipping")
+            self.stats['p1_objects_skipped'] += 1
             return None
-
-    def _extract_object_id(self, soup: BeautifulSoup) -> Optional[str]:
-        """Extract Object ID from page"""
-        text = soup.get_text()
-        id_match = re.search(r'Object\s+ID\s*:?\s*(\d+)', text, re.IGNORECASE)
-        if id_match:
-            return id_match.group(1)
-        return None
+        
+        # Extract enhanced metadata
+        object_data['description'] = self._extract_description(soup)
+        object_data['author'] = self._extract_author(soup)
+        
+        self.stats['objects_validated'] += 1
+        self.stats['p2_objects'] += 1
+        print(f"    ✅ P2 object confirmed: {object_id}")
+        return object_data
 
     def _extract_description(self, soup: BeautifulSoup) -> str:
         """Extract object description"""
@@ -245,13 +162,10 @@ class ComprehensiveP2Discovery:
         
         return details
 
-    def save_object_metadata(self, object_data: Dict):
-        """Save P2 object metadata to YAML file"""
+    def _convert_to_detailed_format(self, object_data: Dict) -> Dict:
+        """Create comprehensive YAML metadata for a P2 object"""
         object_id = object_data['object_id']
-        file_path = self.objects_dir / f"{object_id}.yaml"
-        
-        # Create comprehensive YAML metadata
-        yaml_data = {
+        return {
             'object_metadata': {
                 'object_id': object_id,
                 'title': object_data.get('title', ''),
@@ -301,15 +215,6 @@ class ComprehensiveP2Discovery:
                 }
             }
         }
-        
-        try:
-            with open(file_path, 'w') as f:
-                yaml.dump(yaml_data, f, default_flow_style=False, indent=2)
-            print(f"    💾 Saved: {file_path}")
-        except Exception as e:
-            error = f"Error saving {file_path}: {e}"
-            print(f"    ❌ {error}")
-            self.stats['errors'].append(error)
 
     def _categorize_object(self, object_data: Dict) -> str:
         """Categorize object based on title and description"""
@@ -356,15 +261,8 @@ class ComprehensiveP2Discovery:
         # Discover objects from all accessible pages
         all_objects = self.discover_all_p2_objects()
         
-        # Process each object with P1/P2 filtering
-        p2_objects = []
-        for i, obj in enumerate(all_objects, 1):
-            print(f"📋 Processing {i}/{len(all_objects)}: {obj['title']} (Page {obj['page_discovered']})")
-            
-            detailed_obj = self.extract_detailed_metadata(obj)
-            if detailed_obj:  # Only P2 objects pass the filter
-                p2_objects.append(detailed_obj)
-                self.save_object_metadata(detailed_obj)
+        # Process each object with P1/P2 filtering (only P2 objects are kept and saved)
+        p2_objects = self.process_objects(all_objects, label=lambda obj: f"Page {obj['page_discovered']}")
         
         # Final comprehensive stats
         print(f"\n{'='*70}")
@@ -377,6 +275,8 @@ class ComprehensiveP2Discovery:
         print(f"❌ P1 objects skipped: {self.stats['p1_objects_skipped']}")
         print(f"💾 Objects saved: {len(p2_objects)}")
         print(f"⚠️  Errors: {len(self.stats['errors'])}")
+        if self.http_cache:
+            print(self.http_cache.report())
         
         return {
             'success': True,
@@ -392,11 +292,17 @@ if __name__ == '__main__':
     
     parser = argparse.ArgumentParser(description='Comprehensive P2 OBEX discovery (pages 1,3-14)')
     parser.add_argument('--delay', type=float, default=1.5, help='Request delay')
+    parser.add_argument('--base-url', help='Fetch pages from this server instead (e.g. obex_standin_server.py)')
+    parser.add_argument('--output-dir', help='Output directory for results')
+    parser.add_argument('--offline', action='store_true', help='Serve every page from the HTTP cache (no network)')
+    parser.add_argument('--no-cache', action='store_true', help='Bypass the HTTP cache and download every page')
+    parser.add_argument('--cache-dir', help='HTTP cache directory (default: $P2KB_CACHE_DIR/obex-http)')
     args = parser.parse_args()
     
     try:
-        discovery = ComprehensiveP2Discovery()
-        discovery.request_delay = args.delay
+        discovery = ComprehensiveP2Discovery(args.output_dir, fetch_base_url=args.base_url, use_cache=not args.no_cache,
+                                             offline=args.offline, cache_dir=args.cache_dir)
+        discovery.request_delay = 0 if args.offline else args.delay
         
         result = discovery.run_comprehensive_discovery()
         
@@ -11,10 +11,14 @@ import time
 from pathlib import Path
 from bs4 import BeautifulSoup
 
+from obex_http_cache import CachingSession
+
 class DeepAuthorSearcher:
-    def __init__(self, objects_dir):
+    def __init__(self, objects_dir, use_cache=True, offline=False, cache_dir=None):
         self.objects_dir = Path(objects_dir)
-        self.session = requests.Session()
+        self.request_delay = 0 if offline else 1.5
+        # Conditional-request HTTP cache: unchanged pages come back as 304s
+        self.session = CachingSession(cache_dir, offline=offline) if use_cache or offline else requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
@@ -115,8 +119,10 @@ class DeepAuthorSearcher:
                 print(f"  ✗ No OBEX URL available")
             
             # Rate limiting
-            time.sleep(1.5)
+            time.sleep(self.request_delay)
         
+        if isinstance(self.session, CachingSession):
+            print(f"\n{self.session.cache.report()}")
         return findings
     
     def update_yaml_files(self, findings):
@@ -148,9 +154,18 @@ class DeepAuthorSearcher:
                 print(f"✗ Error updating {finding['object_id']}: {e}")
 
 def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Deep search OBEX pages for unknown authors')
+    parser.add_argument('--offline', action='store_true', help='Serve every page from the HTTP cache (no network)')
+    parser.add_argument('--no-cache', action='store_true', help='Bypass the HTTP cache and download every page')
+    parser.add_argument('--cache-dir', help='HTTP cache directory (default: $P2KB_CACHE_DIR/obex-http)')
+    args = parser.parse_args()
+    
     objects_dir = "/Users/stephen/Projects/Projects-ExtGit/IronSheepProductionsLLC/Propeller2/P2-Language-Study/P2-Knowledge-Base/engineering/knowledge-base/external-resources/obex/objects"
     
-    searcher = DeepAuthorSearcher(objects_dir)
+    searcher = DeepAuthorSearcher(objects_dir, use_cache=not args.no_cache, offline=args.offline,
+                                  cache_dir=args.cache_dir)
     
     # Search a sample of objects
     findings = searcher.search_sample_objects(sample_size=15)
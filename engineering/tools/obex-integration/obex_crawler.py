@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+OBEX Async Crawler
+Concurrent but polite page fetching for the OBEX discovery tools.
+
+Replaces the one-request-then-sleep loop with:
+- a token-bucket rate limiter (sustained rate = 1 / request_delay, small burst)
+- a per-host concurrency limit
+- pooled keep-alive connections (one aiohttp session for the whole crawl)
+- retries with exponential backoff and jitter on timeouts, 429 and 5xx,
+  honouring Retry-After when the server sends it
+
+Point base_url at obex_standin_server.py to crawl recorded pages locally.
+Pass an obex_http_cache.HTTPCache to send conditional requests (or to crawl
+offline from the cache).
+
+Requires: pip3 install aiohttp
+"""
+
+import asyncio
+import random
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+
+try:
+    import aiohttp
+except ImportError:  # Only needed for --async crawls
+    aiohttp = None
+
+USER_AGENT = 'P2-Knowledge-Base/1.0 (Educational/Research Purpose)'
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, at most `capacity` banked"""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available, then take it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncOBEXCrawler:
+    """Rate-limited, retrying, connection-pooling page fetcher"""
+
+    def __init__(self, request_delay: float = 1.0, burst: int = 2, per_host: int = 4,
+                 max_retries: int = 4, backoff: float = 1.0, timeout: float = 30.0,
+                 record_dir: Optional[str] = None, cache=None):
+        if aiohttp is None:
+            raise RuntimeError("Async crawling requires aiohttp (pip3 install aiohttp)")
+
+        # request_delay keeps its meaning: the sustained gap between requests
+        rate = 1.0 / request_delay if request_delay > 0 else 1000.0
+        self.bucket = TokenBucket(rate, burst)
+        self.per_host = per_host
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.record_dir = Path(record_dir) if record_dir else None
+        self.cache = cache
+        self.session = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+        self.stats = {
+            'requests': 0,
+            'retries': 0,
+            'failures': 0,
+            'bytes_received': 0
+        }
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit_per_host=self.per_host, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers={'User-Agent': USER_AGENT},
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        return self._host_limits[host]
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        """Exponential backoff with jitter; a numeric Retry-After wins if larger"""
+        delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        return delay
+
+    async def fetch(self, url: str) -> Optional[bytes]:
+        """Fetch one page; returns None on 404, raises once retries are exhausted"""
+        if self.cache is not None:
+            self.cache.stats['requests'] += 1
+            if self.cache.offline:
+                cached = self.cache.lookup(url)
+                if cached is None:
+                    raise aiohttp.ClientError(f"Offline mode: {url} is not in the HTTP cache")
+                self.cache.record_hit(cached[1], offline=True)
+                return cached[1]
+
+        async with self._host_limit(url):
+            conditional = self.cache is not None
+            for attempt in range(self.max_retries + 1):
+                await self.bucket.acquire()
+                self.stats['requests'] += 1
+                retry_after = None
+                try:
+                    headers = self.cache.conditional_headers(url) if conditional else None
+                    async with self.session.get(url, headers=headers) as response:
+                        if response.status == 404:
+                            return None
+                        if response.status == 304 and self.cache is not None:
+                            cached = self.cache.lookup(url)
+                            if cached is not None:
+                                self.cache.record_hit(cached[1])
+                                self._record(url, cached[1])
+                                return cached[1]
+                            # The cached body vanished after the validators were read: a 304
+                            # has no body to return, so ask again without validators
+                            conditional = False
+                            if attempt < self.max_retries:
+                                continue
+                            break
+                        if response.status not in RETRY_STATUSES:
+                            response.raise_for_status()
+                            content = await response.read()
+                            self.stats['bytes_received'] += len(content)
+                            if self.cache is not None and response.status == 200:
+                                self.cache.record_miss(content)
+                                self.cache.store(url, response.headers, content)
+                            self._record(url, content)
+                            return content
+                        retry_after = response.headers.get('Retry-After')
+                        reason = f"HTTP {response.status}"
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if isinstance(e, aiohttp.ClientResponseError) and e.status not in RETRY_STATUSES:
+                        self.stats['failures'] += 1
+                        raise
+                    reason = str(e) or type(e).__name__
+
+                if attempt == self.max_retries:
+                    break
+                self.stats['retries'] += 1
+                delay = self._retry_delay(attempt, retry_after)
+                print(f"    ↻ {url}: {reason}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+        self.stats['failures'] += 1
+        raise aiohttp.ClientError(f"Giving up on {url} after {self.max_retries + 1} attempts")
+
+    async def fetch_many(self, urls: Sequence[str]) -> List[Optional[bytes]]:
+        """Fetch pages concurrently; results (or exceptions) come back in input order"""
+        return await asyncio.gather(*(self.fetch(url) for url in urls), return_exceptions=True)
+
+    async def crawl_pages(self, page_url: Callable[[int], str],
+                          parse_page: Callable[[bytes, int], List[Dict]],
+                          max_pages: int = 500) -> List[Dict]:
+        """Crawl numbered listing pages a window at a time until a page has no items.
+
+        Pages are parsed in page order, so results match a serial crawl.
+        """
+        items = []
+        page = 1
+        while page <= max_pages:
+            window = list(range(page, min(page + self.per_host, max_pages + 1)))
+            results = await self.fetch_many([page_url(n) for n in window])
+            for n, content in zip(window, results):
+                if isinstance(content, Exception):
+                    print(f"  ❌ Error processing page {n}: {content}")
+                    return items
+                page_items = parse_page(content, n) if content else []
+                if not page_items:
+                    print(f"  ✅ No more objects found, stopping at page {n}")
+                    return items
+                print(f"  📦 Found {len(page_items)} objects on page {n}")
+                items.extend(page_items)
+            page = window[-1] + 1
+        return items
+
+    def _record(self, url: str, content: bytes):
+        """Save a fetched page in the layout obex_standin_server.py serves"""
+        if not self.record_dir:
+            return
+        path = urlparse(url).path.strip('/')
+        target = self.record_dir / path / "index.html" if path else self.record_dir / "index.html"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+
+    def report(self) -> str:
+        return (f"🌐 Async crawl: {self.stats['requests']} requests, {self.stats['retries']} retries, "
+                f"{self.stats['failures']} failures, {self.stats['bytes_received'] // 1024} KB received")
@@ -4,41 +4,18 @@ OBEX P2 Object Discovery Tool - Fixed Version
 Primary focus: https://obex.parallax.com/microcontroller/propeller-2/
 """
 
-import requests
 import re
-import time
-import yaml
-from urllib.parse import urljoin
 from bs4 import BeautifulSoup
 from typing import Dict, List, Optional
 from datetime import datetime
-from pathlib import Path
 import sys
 
-class OBEXDiscovery:
-    def __init__(self, base_dir: str = None):
-        self.base_url = "https://obex.parallax.com"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'P2-Knowledge-Base/1.0 (Educational/Research Purpose)'
-        })
-        
-        # Setup paths
-        if base_dir:
-            self.base_dir = Path(base_dir)
-        else:
-            self.base_dir = Path(__file__).parent.parent.parent / "knowledge-base" / "external-resources" / "obex"
-        
-        self.objects_dir = self.base_dir / "objects"
+from obex_engine import OBEXCrawlerEngine
+
+class OBEXDiscovery(OBEXCrawlerEngine):
+    def __init__(self, base_dir: str = None, **engine_options):
+        super().__init__(base_dir, **engine_options)
         self.request_delay = 1.5
-        
-        # Statistics
-        self.stats = {
-            'pages_processed': 0,
-            'objects_discovered': 0,
-            'objects_validated': 0,
-            'errors': []
-        }
 
     def discover_p2_objects(self) -> List[Dict]:
         """
@@ -46,69 +23,20 @@ class OBEXDiscovery:
         """
         print("🔍 Discovering P2 objects from microcontroller pages...")
         
-        objects = []
-        page = 1
-        
-        while True:
-            url = f"{self.base_url}/microcontroller/propeller-2/page/{page}/"
-            print(f"  📄 Processing page {page}: {url}")
-            
-            try:
-                response = self.session.get(url)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                page_objects = self._extract_p2_objects_from_page(soup)
-                
-                if not page_objects:
-                    print(f"  ✅ No more objects found, stopping at page {page}")
-                    break
-                    
-                objects.extend(page_objects)
-                self.stats['pages_processed'] += 1
-                
-                print(f"  📦 Found {len(page_objects)} objects on page {page}")
-                
-                # Rate limiting
-                time.sleep(self.request_delay)
-                page += 1
-                
-                # Safety limit
-                if page > 50:  # Reasonable safety limit
-                    print("  ⚠️  Reached page limit of 50, stopping")
-                    break
-                
-            except requests.RequestException as e:
-                error = f"Error processing page {page}: {e}"
-                print(f"  ❌ {error}")
-                self.stats['errors'].append(error)
-                break
+        # Safety limit: 50 pages is far more than OBEX has
+        pages = ((page, f"{self.base_url}/microcontroller/propeller-2/page/{page}/") for page in range(1, 51))
+        objects = self.crawl_listing(pages)
                 
         print(f"🎯 P2 discovery complete: {len(objects)} objects discovered")
         return objects
 
-    def _extract_p2_objects_from_page(self, soup: BeautifulSoup) -> List[Dict]:
+    def parse_listing_page(self, soup: BeautifulSoup, page: int, context=None) -> List[Dict]:
         """Extract P2 object metadata from microcontroller page"""
         objects = []
         
         # Look for object title links that go to /obex/object-name/
-        object_links = soup.find_all('a', href=re.compile(r'/obex/[^/]+/$'))
-        
-        for link in object_links:
+        for link, title, slug, url in self.iter_object_links(soup):
             try:
-                title = link.get_text().strip()
-                url = urljoin(self.base_url, link['href'])
-                
-                if not title or '/page/' in url:
-                    continue
-                    
-                # Extract object slug
-                slug_match = re.search(r'/obex/([^/]+)/$', url)
-                if not slug_match:
-                    continue
-                    
-                slug = slug_match.group(1)
-                
                 # Find parent container for author and description
                 container = link.find_parent(['div', 'article', 'section'])
                 author = ""
@@ -149,50 +77,27 @@ class OBEXDiscovery:
                 
         return objects
 
-    def extract_detailed_metadata(self, object_data: Dict) -> Dict:
-        """Extract detailed metadata from individual object page"""
-        print(f"  🔍 Extracting details: {object_data['title']}")
+    def parse_detail_page(self, object_data: Dict, soup: BeautifulSoup) -> Dict:
+        """Merge an object page's details into object_data"""
+        # Extract Object ID
+        object_id = self._extract_object_id(soup)
+        if object_id:
+            object_data['object_id'] = object_id
+            object_data['download_url'] = self.download_url(object_id)
         
-        try:
-            response = self.session.get(object_data['url'])
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract Object ID
-            object_id = self._extract_object_id(soup)
-            if object_id:
-                object_data['object_id'] = object_id
-                object_data['download_url'] = f"{self.base_url}/wp-admin/admin-ajax.php?action=download_obex_zip&popcorn=salty&obuid=OB{object_id}"
-            
-            # Extract enhanced description if not found
-            if not object_data.get('description'):
-                description = self._extract_description(soup)
-                if description:
-                    object_data['description'] = description
-            
-            # Extract technical details
-            technical_details = self._extract_technical_details(soup)
-            object_data.update(technical_details)
-                
-            self.stats['objects_validated'] += 1
-            time.sleep(self.request_delay)
-            
-        except Exception as e:
-            error = f"Error processing {object_data['title']}: {e}"
-            print(f"    ❌ {error}")
-            self.stats['errors'].append(error)
+        # Extract enhanced description if not found
+        if not object_data.get('description'):
+            description = self._extract_description(soup)
+            if description:
+                object_data['description'] = description
+        
+        # Extract technical details
+        technical_details = self._extract_technical_details(soup)
+        object_data.update(technical_details)
             
+        self.stats['objects_validated'] += 1
         return object_data
 
-    def _extract_object_id(self, soup: BeautifulSoup) -> Optional[str]:
-        """Extract Object ID from page"""
-        text = soup.get_text()
-        id_match = re.search(r'Object\s+ID\s*:?\s*(\d+)', text, re.IGNORECASE)
-        if id_match:
-            return id_match.group(1)
-        return None
-
     def _extract_description(self, soup: BeautifulSoup) -> Optional[str]:
         """Extract object description from page"""
         for selector in ['.entry-content p', '.description p', 'p']:
@@ -225,17 +130,10 @@ class OBEXDiscovery:
         
         return details
 
-    def save_object_metadata(self, object_data: Dict):
-        """Save object metadata to YAML file"""
-        if 'object_id' not in object_data:
-            print(f"  ⚠️  No object ID for {object_data['title']}, skipping save")
-            return
-            
+    def _convert_to_detailed_format(self, object_data: Dict) -> Dict:
+        """Convert discovered data to the object YAML format"""
         object_id = object_data['object_id']
-        file_path = self.objects_dir / f"{object_id}.yaml"
-        
-        # Convert to detailed format
-        yaml_data = {
+        return {
             'object_metadata': {
                 'object_id': object_id,
                 'title': object_data.get('title', ''),
@@ -284,15 +182,6 @@ class OBEXDiscovery:
                 }
             }
         }
-        
-        try:
-            with open(file_path, 'w') as f:
-                yaml.dump(yaml_data, f, default_flow_style=False, indent=2)
-            print(f"  💾 Saved: {file_path}")
-        except Exception as e:
-            error = f"Error saving {file_path}: {e}"
-            print(f"  ❌ {error}")
-            self.stats['errors'].append(error)
 
     def _categorize_object(self, object_data: Dict) -> str:
         """Categorize object based on title and description"""
@@ -339,15 +228,8 @@ class OBEXDiscovery:
         # Discover all P2 objects
         all_objects = self.discover_p2_objects()
         
-        # Extract detailed metadata for each
-        detailed_objects = []
-        for i, obj in enumerate(all_objects, 1):
-            print(f"📋 Processing {i}/{len(all_objects)}: {obj['title']}")
-            detailed_obj = self.extract_detailed_metadata(obj)
-            detailed_objects.append(detailed_obj)
-            
-            # Save individual file
-            self.save_object_metadata(detailed_obj)
+        # Fetch, parse and save each object once
+        detailed_objects = self.process_objects(all_objects)
         
         # Final stats
         print(f"\\n{'='*60}")
@@ -357,6 +239,8 @@ class OBEXDiscovery:
         print(f"📦 Objects discovered: {self.stats['objects_discovered']}")
         print(f"✅ Objects validated: {self.stats['objects_validated']}")
         print(f"❌ Errors: {len(self.stats['errors'])}")
+        if self.http_cache:
+            print(self.http_cache.report())
         
         return {
             'success': True,
@@ -369,11 +253,17 @@ if __name__ == '__main__':
     
     parser = argparse.ArgumentParser(description='Discover P2 objects from OBEX')
     parser.add_argument('--delay', type=float, default=1.5, help='Request delay')
+    parser.add_argument('--base-url', help='Fetch pages from this server instead (e.g. obex_standin_server.py)')
+    parser.add_argument('--output-dir', help='Output directory for results')
+    parser.add_argument('--offline', action='store_true', help='Serve every page from the HTTP cache (no network)')
+    parser.add_argument('--no-cache', action='store_true', help='Bypass the HTTP cache and download every page')
+    parser.add_argument('--cache-dir', help='HTTP cache directory (default: $P2KB_CACHE_DIR/obex-http)')
     args = parser.parse_args()
     
     try:
-        discovery = OBEXDiscovery()
-        discovery.request_delay = args.delay
+        discovery = OBEXDiscovery(args.output_dir, fetch_base_url=args.base_url, use_cache=not args.no_cache,
+                                  offline=args.offline, cache_dir=args.cache_dir)
+        discovery.request_delay = 0 if args.offline else args.delay
         
         result = discovery.run_discovery()
         
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+OBEX Crawler Engine
+Shared fetch/parse/save pipeline for the OBEX discovery tools.
+
+obex_discovery.py, obex_discovery_fixed.py and comprehensive_p2_discovery.py
+subclass OBEXCrawlerEngine and only plug in what differs between them:
+
+    parse_listing_page(soup, page, context)  -> List[Dict]      objects on a listing page
+    parse_detail_page(object_data, soup)     -> Optional[Dict]  enrich (or filter out) one object
+                                                                (or parse_detail_content for raw bytes)
+    _convert_to_detailed_format(object_data) -> Dict            YAML written for one object
+
+The engine owns the HTTP session (with the conditional-request cache),
+rate limiting, error accounting and saving. Every page is parsed into a
+BeautifulSoup tree once, and every object URL is fetched and saved once
+per run, even when it is linked several times on a listing page or listed
+under several categories.
+"""
+
+import re
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import requests
+import yaml
+from bs4 import BeautifulSoup
+
+from obex_http_cache import CachingSession
+
+OBEX_URL = "https://obex.parallax.com"
+USER_AGENT = 'P2-Knowledge-Base/1.0 (Educational/Research Purpose)'
+OBJECT_LINK_PATTERN = re.compile(r'/obex/([^/]+)/$')
+OBJECT_ID_PATTERN = re.compile(r'Object\s+ID\s*:?\s*(\d+)', re.IGNORECASE)
+
+
+class OBEXCrawlerEngine(ABC):
+    """Base crawler: subclasses provide the page parsers and YAML layout"""
+
+    # Keep objects whose detail page could not be fetched or parsed (saved only if they have an ID)
+    keep_failed_objects = True
+
+    def __init__(self, base_dir: str = None, fetch_base_url: str = None,
+                 use_cache: bool = True, offline: bool = False, cache_dir: str = None):
+        self.base_url = OBEX_URL
+        # Where pages are actually fetched from (e.g. obex_standin_server.py);
+        # saved URLs always use the canonical base_url
+        self.fetch_base_url = (fetch_base_url or self.base_url).rstrip('/')
+        # Conditional-request HTTP cache: unchanged pages come back as 304s
+        self.session = CachingSession(cache_dir, offline=offline) if use_cache or offline else requests.Session()
+        self.http_cache = getattr(self.session, 'cache', None)
+        self.session.headers.update({'User-Agent': USER_AGENT})
+
+        # Setup paths
+        if base_dir:
+            self.base_dir = Path(base_dir)
+        else:
+            self.base_dir = Path(__file__).parent.parent.parent / "knowledge-base" / "external-resources" / "obex"
+        self.objects_dir = self.base_dir / "objects"
+
+        self.request_delay = 1.0
+
+        # Statistics (subclasses add their own counters)
+        self.stats = {
+            'pages_processed': 0,
+            'objects_discovered': 0,
+            'objects_validated': 0,
+            'errors': []
+        }
+        self._seen_urls = set()
+
+    # ------------------------------------------------------------------
+    # Parser hooks
+    # ------------------------------------------------------------------
+
+    @abstractmethod
+    def parse_listing_page(self, soup: BeautifulSoup, page: int, context=None) -> List[Dict]:
+        """Objects listed on a category page; context is whatever the caller passed to crawl_listing"""
+
+    @abstractmethod
+    def parse_detail_page(self, object_data: Dict, soup: BeautifulSoup) -> Optional[Dict]:
+        """Merge an object page into object_data; return None to drop the object"""
+
+    @abstractmethod
+    def _convert_to_detailed_format(self, object_data: Dict) -> Dict:
+        """YAML document saved to objects/<id>.yaml"""
+
+    # ------------------------------------------------------------------
+    # Fetching
+    # ------------------------------------------------------------------
+
+    def _fetch_url(self, url: str) -> str:
+        """Map a canonical OBEX URL onto the host pages are fetched from"""
+        if url.startswith(self.base_url):
+            return self.fetch_base_url + url[len(self.base_url):]
+        return url
+
+    def fetch_content(self, url: str) -> bytes:
+        """Fetch one page's raw bytes (raises requests.RequestException)"""
+        response = self.session.get(self._fetch_url(url))
+        response.raise_for_status()
+        return response.content
+
+    def get_page(self, url: str) -> BeautifulSoup:
+        """Fetch and parse one page (raises requests.RequestException)"""
+        return BeautifulSoup(self.fetch_content(url), 'html.parser')
+
+    def parse_detail_content(self, object_data: Dict, content: bytes) -> Optional[Dict]:
+        """Run the detail parser over raw page bytes; override to skip building a soup"""
+        return self.parse_detail_page(object_data, BeautifulSoup(content, 'html.parser'))
+
+    def _record_error(self, error: str, indent: str = "  "):
+        print(f"{indent}❌ {error}")
+        self.stats['errors'].append(error)
+
+    # ------------------------------------------------------------------
+    # Shared parsing helpers
+    # ------------------------------------------------------------------
+
+    def iter_object_links(self, soup: BeautifulSoup) -> Iterator[Tuple[object, str, str, str]]:
+        """(link, title, slug, url) for each distinct object linked from a listing page"""
+        seen = set()
+        for link in soup.find_all('a', href=OBJECT_LINK_PATTERN):
+            title = link.get_text().strip()
+            url = urljoin(self.base_url, link['href'])
+
+            # Skip image/"read more" links without text and pagination links
+            if not title or '/page/' in url or url in seen:
+                continue
+            slug_match = OBJECT_LINK_PATTERN.search(url)
+            if not slug_match:
+                continue
+
+            seen.add(url)
+            yield link, title, slug_match.group(1), url
+
+    def _extract_object_id(self, soup: BeautifulSoup) -> Optional[str]:
+        """Extract Object ID from page"""
+        # Look for "Object ID : XXXX" pattern
+        id_match = OBJECT_ID_PATTERN.search(soup.get_text())
+        if id_match:
+            return id_match.group(1)
+        return None
+
+    def download_url(self, object_id: str) -> str:
+        return f"{self.base_url}/wp-admin/admin-ajax.php?action=download_obex_zip&popcorn=salty&obuid=OB{object_id}"
+
+    # ------------------------------------------------------------------
+    # Pipeline
+    # ------------------------------------------------------------------
+
+    def crawl_listing(self, pages: Iterable[Tuple[int, str]], context=None,
+                      stop_when_empty: bool = True, stop_on_error: bool = True) -> List[Dict]:
+        """Fetch and parse listing pages in order.
+
+        Open-ended crawls stop at the first empty (or failing) page; crawls of
+        a fixed page list can carry on past both.
+        """
+        objects = []
+        for page, url in pages:
+            print(f"  📄 Processing page {page}: {url}")
+            try:
+                soup = self.get_page(url)
+            except requests.RequestException as e:
+                self._record_error(f"Error processing page {page}: {e}")
+                self.stats['pages_failed'] = self.stats.get('pages_failed', 0) + 1
+                if stop_on_error:
+                    break
+                continue
+
+            page_objects = self.parse_listing_page(soup, page, context)
+            if not page_objects:
+                if stop_when_empty:
+                    print(f"  ✅ No more objects found, stopping at page {page}")
+                    break
+                print(f"  ⚠️  No objects found on page {page}")
+            else:
+                objects.extend(page_objects)
+                self.stats['pages_processed'] += 1
+                print(f"  📦 Found {len(page_objects)} objects on page {page}")
+
+            # Rate limiting
+            time.sleep(self.request_delay)
+        return objects
+
+    def new_objects(self, objects: List[Dict]) -> List[Dict]:
+        """Drop objects already handled this run (e.g. listed under two categories)"""
+        fresh = []
+        for obj in objects:
+            if obj['url'] in self._seen_urls:
+                continue
+            self._seen_urls.add(obj['url'])
+            fresh.append(obj)
+        if len(fresh) < len(objects):
+            print(f"  ♻️  {len(objects) - len(fresh)} objects already processed this run, skipping")
+        return fresh
+
+    def extract_detailed_metadata(self, object_data: Dict) -> Optional[Dict]:
+        """Fetch one object page and run the detail parser over it"""
+        print(f"  🔍 Extracting details: {object_data['title']}")
+        try:
+            content = self.fetch_content(object_data['url'])
+            time.sleep(self.request_delay)  # Rate limiting
+        except requests.RequestException as e:
+            self._record_error(f"Error fetching details for {object_data['url']}: {e}", "    ")
+            return object_data if self.keep_failed_objects else None
+
+        try:
+            return self.parse_detail_content(object_data, content)
+        except Exception as e:
+            self._record_error(f"Error processing details for {object_data['title']}: {e}", "    ")
+            return object_data if self.keep_failed_objects else None
+
+    def process_objects(self, objects: List[Dict], label=None) -> List[Dict]:
+        """Fetch, parse and save each object once; returns the objects kept"""
+        objects = self.new_objects(objects)
+        kept = []
+        for i, obj in enumerate(objects, 1):
+            suffix = f" ({label(obj)})" if label else ""
+            print(f"📋 Processing {i}/{len(objects)}: {obj['title']}{suffix}")
+            detailed_obj = self.extract_detailed_metadata(obj)
+            if detailed_obj is None:
+                continue
+            kept.append(detailed_obj)
+
+            # Save individual object file
+            self.save_object_metadata(detailed_obj)
+        return kept
+
+    def save_object_metadata(self, object_data: Dict):
+        """Save object metadata to individual YAML file"""
+        if 'object_id' not in object_data:
+            print(f"  ⚠️  No object ID for {object_data['title']}, skipping save")
+            return
+
+        file_path = self.objects_dir / f"{object_data['object_id']}.yaml"
+        try:
+            with open(file_path, 'w') as f:
+                yaml.dump(self._convert_to_detailed_format(object_data), f, default_flow_style=False, indent=2)
+            print(f"  💾 Saved: {file_path}")
+        except Exception as e:
+            self._record_error(f"Error saving {file_path}: {e}")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+OBEX Fast Page Parser
+Single-pass lxml extraction of the object-page fields used by obex_discovery.py.
+
+The BeautifulSoup path builds a pure-Python tree with html.parser and then
+walks it once per field: get_text() three times, four CSS selects for the
+description and a find_all over every link. Here the page is parsed once
+by libxml2, the document text is computed once and every field is pulled
+with a compiled XPath expression. Results match the BeautifulSoup helpers
+field for field; benchmark_obex_parsing.py checks that on recorded pages.
+
+Requires: pip3 install lxml (callers fall back to BeautifulSoup without it)
+"""
+
+import re
+from typing import Dict, List, Optional
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:  # Optional: obex_discovery.py falls back to BeautifulSoup
+    etree = lxml_html = None
+
+from obex_engine import OBJECT_ID_PATTERN
+
+AVAILABLE = etree is not None
+
+# BeautifulSoup's get_text() skips the contents of these elements
+NON_TEXT_ELEMENTS = ('script', 'style', 'template')
+
+AUTHOR_PATTERNS = [
+    re.compile(r'Author\s*:\s*([^\n]+)', re.IGNORECASE),
+    re.compile(r'By\s+([^\n,]+)', re.IGNORECASE),
+    re.compile(r'Created by\s+([^\n,]+)', re.IGNORECASE)
+]
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+if AVAILABLE:
+    # Same priority order as OBEXDiscovery._extract_description's CSS selectors
+    DESCRIPTION_XPATHS = [
+        etree.XPath(f"//*[{_has_class('entry-content')}]//p"),
+        etree.XPath(f"//*[{_has_class('object-description')}]"),
+        etree.XPath(f"//*[{_has_class('description')}]"),
+        etree.XPath("//p")
+    ]
+    LINKS_XPATH = etree.XPath("//a[@href]")
+
+
+def _element_text(element) -> str:
+    # text_content() of a parsed element can be a lxml "smart string"; keep plain str
+    return str(element.text_content())
+
+
+def _description(doc) -> Optional[str]:
+    for xpath in DESCRIPTION_XPATHS:
+        for element in xpath(doc):
+            text = _element_text(element).strip()
+            if len(text) > 50:  # Reasonable description length
+                return text
+    return None
+
+
+def _author(text: str) -> Optional[str]:
+    for pattern in AUTHOR_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return match.group(1).strip()
+    return None
+
+
+def _languages(text: str) -> List[str]:
+    upper = text.upper()
+    languages = []
+    if 'SPIN2' in upper or 'SPIN 2' in upper:
+        languages.append('SPIN2')
+    if 'PASM2' in upper or 'PASM 2' in upper:
+        languages.append('PASM2')
+    if 'PASM' in upper and 'PASM2' not in upper:
+        languages.append('PASM')
+    return languages
+
+
+def _related_links(doc) -> Dict[str, str]:
+    links = {}
+    for link in LINKS_XPATH(doc):
+        href = link.get('href')
+        text = _element_text(link).lower()
+
+        if 'github.com' in href:
+            links['github'] = href
+        elif 'forums.parallax.com' in href:
+            links['forum'] = href
+        elif 'documentation' in text or 'docs' in text:
+            links['documentation'] = href
+    return links
+
+
+def parse_object_page(content: bytes) -> Dict:
+    """Every detail field OBEXDiscovery reads from an object page, in one parse.
+
+    Keys are only present when the field was found: object_id, description,
+    author_detailed, languages, microcontroller, related_links.
+    """
+    if not AVAILABLE:
+        raise RuntimeError("Fast OBEX parsing requires lxml (pip3 install lxml)")
+
+    if not content.strip():
+        return {}  # lxml refuses empty documents; BeautifulSoup finds nothing in them
+    doc = lxml_html.document_fromstring(content)
+    etree.strip_elements(doc, *NON_TEXT_ELEMENTS, with_tail=False)
+    text = _element_text(doc)
+
+    fields = {}
+    object_id = OBJECT_ID_PATTERN.search(text)
+    if object_id:
+        fields['object_id'] = object_id.group(1)
+
+    description = _description(doc)
+    if description:
+        fields['description'] = description
+
+    author = _author(text)
+    if author:
+        fields['author_detailed'] = author
+
+    languages = _languages(text)
+    if languages:
+        fields['languages'] = languages
+    if 'P2' in text or 'Propeller 2' in text:
+        fields['microcontroller'] = ['P2']
+
+    links = _related_links(doc)
+    if links:
+        fields['related_links'] = links
+    return fields
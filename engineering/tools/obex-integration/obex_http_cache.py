@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+OBEX HTTP Cache
+Persistent conditional-request cache for the OBEX discovery tools.
+
+Every successful GET is stored on disk with its ETag / Last-Modified headers.
+The next request for the same URL sends If-None-Match / If-Modified-Since,
+and a 304 answer is served from disk - only pages that changed are
+transferred again. Offline mode answers purely from the cache (no network),
+which makes re-running a parser over a previous crawl free.
+
+Cache location: $P2KB_CACHE_DIR/obex-http (default ~/.cache/p2-knowledge-base/obex-http)
+    <sha1(url)>.json   - url, status, headers, stored_at
+    <sha1(url)>.body   - response body
+
+Usage:
+    from obex_http_cache import CachingSession
+
+    session = CachingSession(offline=False)
+    response = session.get(url)      # behaves like requests.Session.get
+    print(session.cache.report())
+
+    python3 obex_http_cache.py            # show cache size
+    python3 obex_http_cache.py --clear    # drop the cache
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+DEFAULT_CACHE_DIR = Path(os.environ.get("P2KB_CACHE_DIR", Path.home() / ".cache" / "p2-knowledge-base")) / "obex-http"
+
+# Headers worth keeping; hop-by-hop and length headers describe the old transfer
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Date')
+
+
+class HTTPCache:
+    """On-disk store of GET responses plus their validators"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, offline: bool = False):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.offline = offline
+
+        self.stats = {
+            'requests': 0,
+            'revalidated': 0,     # 304 Not Modified, body served from disk
+            'offline_hits': 0,
+            'misses': 0,          # full 200 downloads
+            'bytes_received': 0,
+            'bytes_saved': 0
+        }
+
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{key}.json", self.cache_dir / f"{key}.body"
+
+    def lookup(self, url: str) -> Optional[Tuple[Dict[str, str], bytes]]:
+        """Return (headers, body) for a cached URL, or None"""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            return meta['headers'], body_path.read_bytes()
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since for a cached URL"""
+        cached = self.lookup(url)
+        if not cached:
+            return {}
+        headers = CaseInsensitiveDict(cached[0])
+        conditional = {}
+        if headers.get('ETag'):
+            conditional['If-None-Match'] = headers['ETag']
+        if headers.get('Last-Modified'):
+            conditional['If-Modified-Since'] = headers['Last-Modified']
+        return conditional
+
+    def store(self, url: str, headers, body: bytes):
+        """Save a 200 response (written body-first, so a crash never leaves metadata without a body)"""
+        meta_path, body_path = self._paths(url)
+        kept = {name: headers[name] for name in STORED_HEADERS if name in headers}
+        tmp_body = body_path.with_suffix('.body.tmp')
+        tmp_body.write_bytes(body)
+        os.replace(tmp_body, body_path)
+        tmp_meta = meta_path.with_suffix('.json.tmp')
+        with open(tmp_meta, 'w') as f:
+            json.dump({'url': url, 'status': 200, 'headers': kept, 'stored_at': time.time()}, f, indent=2)
+        os.replace(tmp_meta, meta_path)
+
+    def record_miss(self, body: bytes):
+        self.stats['misses'] += 1
+        self.stats['bytes_received'] += len(body)
+
+    def record_hit(self, body: bytes, offline: bool = False):
+        self.stats['offline_hits' if offline else 'revalidated'] += 1
+        self.stats['bytes_saved'] += len(body)
+
+    def clear(self) -> int:
+        """Delete every cached response; returns the number removed"""
+        removed = 0
+        for path in self.cache_dir.glob('*.json'):
+            path.unlink()
+            path.with_suffix('.body').unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def report(self) -> str:
+        s = self.stats
+        hits = s['revalidated'] + s['offline_hits']
+        hit_rate = 100.0 * hits / s['requests'] if s['requests'] else 0.0
+        total = s['bytes_received'] + s['bytes_saved']
+        saved_pct = 100.0 * s['bytes_saved'] / total if total else 0.0
+        mode = "offline" if self.offline else "conditional"
+        return (f"🗄️  HTTP cache ({mode}): {s['requests']} requests, {hits} hits "
+                f"({s['revalidated']} not modified, {s['offline_hits']} offline), {s['misses']} downloads, "
+                f"{hit_rate:.0f}% hit rate; {s['bytes_received'] // 1024} KB received, "
+                f"{s['bytes_saved'] // 1024} KB saved ({saved_pct:.0f}%)")
+
+
+class CachingSession(requests.Session):
+    """requests.Session whose GETs go through an HTTPCache.
+
+    Cached pages come back as ordinary 200 responses with `from_cache = True`.
+    In offline mode an uncached URL raises requests.ConnectionError, which the
+    discovery tools already handle like any other fetch failure.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, offline: bool = False):
+        super().__init__()
+        self.cache = HTTPCache(cache_dir, offline=offline)
+
+    def _from_cache(self, url: str, headers: Dict[str, str], body: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = url
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = body
+        response.from_cache = True
+        return response
+
+    def request(self, method, url, *args, **kwargs):
+        if method.upper() != 'GET':
+            return super().request(method, url, *args, **kwargs)
+
+        self.cache.stats['requests'] += 1
+        if self.cache.offline:
+            cached = self.cache.lookup(url)
+            if cached is None:
+                raise requests.ConnectionError(f"Offline mode: {url} is not in the HTTP cache")
+            self.cache.record_hit(cached[1], offline=True)
+            return self._from_cache(url, *cached)
+
+        request_headers = dict(kwargs.pop('headers', None) or {})
+        headers = dict(request_headers, **self.cache.conditional_headers(url))
+        response = super().request(method, url, *args, headers=headers, **kwargs)
+
+        if response.status_code == 304:
+            cached = self.cache.lookup(url)
+            if cached is not None:
+                self.cache.record_hit(cached[1])
+                return self._from_cache(url, *cached)
+            # The cached body vanished after the validators were read: a 304 has no body to return
+            response = super().request(method, url, *args, headers=request_headers, **kwargs)
+        if response.status_code == 200:
+            self.cache.record_miss(response.content)
+            self.cache.store(url, response.headers, response.content)
+        response.from_cache = False
+        return response
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Inspect or clear the OBEX HTTP cache')
+    parser.add_argument('--cache-dir', help=f'Cache directory (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--clear', action='store_true', help='Delete all cached responses')
+    args = parser.parse_args()
+
+    cache = HTTPCache(args.cache_dir)
+    if args.clear:
+        print(f"🗑️  Removed {cache.clear()} cached responses from {cache.cache_dir}")
+        return
+    entries = list(cache.cache_dir.glob('*.json'))
+    size = sum(p.with_suffix('.body').stat().st_size for p in entries if p.with_suffix('.body').exists())
+    print(f"🗄️  {cache.cache_dir}: {len(entries)} cached responses, {size // 1024} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+OBEX Stand-in Server
+Serves recorded OBEX pages locally so the discovery tools can be exercised
+without touching obex.parallax.com.
+
+Recordings use the layout written by `obex_discovery.py --record-dir DIR`:
+    DIR/code-language/spin2/page/1/index.html
+    DIR/obex/some-object/index.html
+Unrecorded paths return 404 (which ends a listing crawl, like the real site).
+Pages carry an ETag and Last-Modified and answer conditional requests with
+304, so the HTTP cache (obex_http_cache.py) can be exercised too.
+
+Usage:
+    python3 obex_standin_server.py recordings/ --port 8765
+    python3 obex_discovery.py --async --base-url http://127.0.0.1:8765 --delay 0 --output-dir /tmp/obex
+"""
+
+import argparse
+import hashlib
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Serve DIR/<path>/index.html; optionally fail every Nth request with 503"""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real server
+    recordings: Path = Path(".")
+    fail_every = 0
+    _counter = 0
+    _lock = threading.Lock()
+
+    def do_GET(self):
+        with StandinHandler._lock:
+            StandinHandler._counter += 1
+            count = StandinHandler._counter
+
+        if self.fail_every and count % self.fail_every == 0:
+            self._send(503, b"Service Unavailable (simulated)", {"Retry-After": "0"})
+            return
+
+        rel_path = self.path.split('?', 1)[0].strip('/')
+        page = (self.recordings / rel_path / "index.html").resolve()
+        if self.recordings not in page.parents or not page.is_file():
+            self._send(404, b"Not Found")
+            return
+        body = page.read_bytes()
+        validators = {
+            "ETag": '"%s"' % hashlib.sha1(body).hexdigest(),
+            "Last-Modified": formatdate(page.stat().st_mtime, usegmt=True)
+        }
+        if self.headers.get("If-None-Match") == validators["ETag"]:
+            self._send(304, b"", validators)
+            return
+        self._send(200, body, dict(validators, **{"Content-Type": "text/html; charset=UTF-8"}))
+
+    def _send(self, status: int, body: bytes, headers: dict = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve recorded OBEX pages for offline crawler testing')
+    parser.add_argument('recordings', help='Directory of recorded pages')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fail-every', type=int, default=0,
+                        help='Answer every Nth request with 503 to exercise retries')
+    parser.add_argument('--quiet', action='store_true', help='Suppress request logging')
+    args = parser.parse_args()
+
+    StandinHandler.recordings = Path(args.recordings).resolve()
+    StandinHandler.fail_every = args.fail_every
+
+    server = ThreadingHTTPServer((args.host, args.port), StandinHandler)
+    server.quiet = args.quiet
+    print(f"🧪 Serving {StandinHandler.recordings} at http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stand-in server stopped")
+
+
+if __name__ == '__main__':
+    main()
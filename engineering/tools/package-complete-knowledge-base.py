@@ -3,28 +3,69 @@
 Package the COMPLETE P2 Knowledge Base into release artifacts:
 1. P2 Reference JSON Package - Single JSON with schemas
 2. P2 Complete Knowledge Base - ALL YAMLs with full manifest hierarchy
+
+Knowledge-base files are streamed straight from the repository into the
+archives (see kb_archive.py); only generated manifests and docs are written
+under releases/vX. --compression selects gzip, pgzip (parallel, pigz-style)
+or zstd, and archive checksums are computed during the write.
+
+With --incremental, per-category and per-archive input digests from the
+previous build (releases/vX/.build-state.json) are reused: unchanged
+categories are not rescanned and tarballs whose inputs are unchanged are
+kept as-is. Archives are written deterministically (sorted members,
+normalized owners and mtimes), so set SOURCE_DATE_EPOCH to make
+incremental and clean builds byte-identical.
 """
 
+import hashlib
 import json
-import yaml
 import os
 import shutil
-import tarfile
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any
 
+from kb_archive import ARCHIVE_SUFFIXES, COMPRESSIONS, ArchiveWriter
+from kb_corpus import get_corpus
+
+# Bump when manifest entry extraction changes so stale build state is ignored
+BUILD_STATE_FORMAT = 1
+
 class CompleteKnowledgeBasePackager:
-    def __init__(self, version: str = "1.1.0"):
+    def __init__(self, version: str = "1.1.0", jobs: int = 1, incremental: bool = False,
+                 compression: str = "gzip"):
         self.version = version
-        self.timestamp = datetime.now().isoformat()
+        self.jobs = jobs
+        self.incremental = incremental
+        self.compression = compression
+        self.archive_suffix = ARCHIVE_SUFFIXES[compression]
+        
+        # Honour SOURCE_DATE_EPOCH so repeated builds can be reproducible
+        if os.environ.get("SOURCE_DATE_EPOCH"):
+            self.build_time = datetime.fromtimestamp(int(os.environ["SOURCE_DATE_EPOCH"]))
+        else:
+            self.build_time = datetime.now().replace(microsecond=0)
+        self.build_epoch = int(self.build_time.timestamp())
+        self.timestamp = self.build_time.isoformat()
         self.base_path = Path.cwd()
         self.kb_path = self.base_path / "engineering/knowledge-base/P2"
         self.release_path = self.base_path / "releases" / f"v{version}"
+        self.corpus = get_corpus()
         
         # Create release directory
         self.release_path.mkdir(parents=True, exist_ok=True)
         
+        # Digests of this build's inputs, and the previous build's for --incremental
+        self.state_file = self.release_path / ".build-state.json"
+        self.previous_state = self.load_build_state() if incremental else {}
+        self.build_state = {
+            "format": BUILD_STATE_FORMAT,
+            "version": version,
+            "categories": {},
+            "archives": {}
+        }
+        self.archive_checksums = {}
+        
         self.stats = {
             "pasm2_instructions": 0,
             "pasm2_idioms": 0,
@@ -47,8 +88,7 @@ class CompleteKnowledgeBasePackager:
     def load_yaml(self, file_path: Path) -> Dict:
         """Load and parse a YAML file."""
         try:
-            with open(file_path, 'r') as f:
-                return yaml.safe_load(f)
+            return self.corpus.load(file_path)
         except Exception as e:
             print(f"Warning: Could not load {file_path}: {e}")
             return None
@@ -58,11 +98,15 @@ class CompleteKnowledgeBasePackager:
         entries = []
         if not directory.exists():
             return entries
+        
+        yaml_files = [f for f in sorted(directory.rglob("*.yaml"))
+                      if f.name not in ["manifest.yaml", "unknown.yaml", ".DS_Store"]]
+        
+        # Parse across worker processes; entries are still built below in sorted order
+        if self.jobs > 1:
+            self.corpus.prefetch(yaml_files, self.jobs)
             
-        for yaml_file in sorted(directory.rglob("*.yaml")):
-            if yaml_file.name in ["manifest.yaml", "unknown.yaml", ".DS_Store"]:
-                continue
-                
+        for yaml_file in yaml_files:
             data = self.load_yaml(yaml_file)
             if data:
                 # Calculate relative path
@@ -103,9 +147,52 @@ class CompleteKnowledgeBasePackager:
         # Fallback to filename without extension
         return file_path.stem
     
+    def load_build_state(self) -> Dict:
+        """Load the previous build's input digests, ignoring unusable state."""
+        if not self.state_file.exists():
+            return {}
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring build state {self.state_file.name}: {e}")
+            return {}
+        if state.get("format") != BUILD_STATE_FORMAT or state.get("version") != self.version:
+            return {}
+        return state
+    
+    def save_build_state(self):
+        """Record this build's input digests for the next --incremental run."""
+        with open(self.state_file, 'w') as f:
+            json.dump(self.build_state, f, indent=2)
+    
+    def digest_files(self, directory: Path, pattern: str = "**/*") -> str:
+        """Digest the relative paths and contents of every file under a directory."""
+        digest = hashlib.sha256()
+        for file_path in sorted(directory.glob(pattern)):
+            if file_path.is_file() and file_path.name != ".DS_Store":
+                digest.update(str(file_path.relative_to(directory)).encode("utf-8") + b"\0")
+                with open(file_path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(chunk)
+                digest.update(b"\0")
+        return digest.hexdigest()
+    
     def create_category_manifest(self, category_path: Path, category_name: str) -> Dict:
         """Create a manifest for any category directory."""
-        entries = self.scan_directory_for_yamls(category_path, self.kb_path)
+        digest = self.digest_files(category_path, "**/*.yaml")
+        previous = self.previous_state.get("categories", {}).get(category_name, {})
+        
+        if previous.get("digest") == digest:
+            entries = previous["entries"]
+            print(f"   ↺ {category_name} unchanged, reusing {len(entries)} entries")
+        else:
+            entries = self.scan_directory_for_yamls(category_path, self.kb_path)
+        
+        self.build_state["categories"][category_name] = {
+            "digest": digest,
+            "entries": entries
+        }
         
         # Update stats
         self.stats[category_name] = len(entries)
@@ -382,6 +469,57 @@ class CompleteKnowledgeBasePackager:
         
         print(f"   ✓ Created 3 validation schemas")
     
+    def create_tarball(self, tarball: Path, arcname: str, generated_dir: Path,
+                       sources: Dict[str, Path]) -> Path:
+        """Stream a reproducible tarball, skipping it if its inputs are unchanged.
+        
+        generated_dir holds the small files this packager writes (manifests,
+        README, ...) and becomes the archive root; sources maps archive-relative
+        paths to files or trees that are streamed straight from the repository.
+        """
+        digest = hashlib.sha256(
+            f"{arcname}\0{self.build_epoch}\0{self.compression}\0".encode("utf-8"))
+        digest.update(self.digest_files(generated_dir).encode("utf-8"))
+        for member, source in sorted(sources.items()):
+            digest.update(f"{member}\0".encode("utf-8"))
+            if source.is_dir():
+                digest.update(self.digest_files(source).encode("utf-8"))
+            else:
+                digest.update(self.file_sha256(source).encode("utf-8"))
+        digest = digest.hexdigest()
+        
+        previous = self.previous_state.get("archives", {}).get(tarball.name, {})
+        # The size check catches an archive that was replaced or damaged since the last build
+        if (previous.get("digest") == digest and tarball.exists()
+                and tarball.stat().st_size == previous.get("size")):
+            print(f"   ↺ {tarball.name} unchanged, keeping existing archive")
+            sha256 = previous["sha256"]
+            size = previous["size"]
+        else:
+            with ArchiveWriter(tarball, compression=self.compression, jobs=self.jobs,
+                               mtime=self.build_epoch) as archive:
+                # Leftover copies from older builds must not shadow the streamed sources
+                archive.add_tree(generated_dir, arcname, exclude=sources.keys())
+                for member, source in sorted(sources.items()):
+                    if source.is_dir():
+                        archive.add_tree(source, f"{arcname}/{member}")
+                    else:
+                        archive.add_file(source, f"{arcname}/{member}")
+            sha256 = archive.sha256
+            size = archive.size
+        
+        self.archive_checksums[tarball.name] = sha256
+        self.build_state["archives"][tarball.name] = {"digest": digest, "sha256": sha256, "size": size}
+        return tarball
+    
+    def file_sha256(self, file_path: Path) -> str:
+        """SHA-256 of a file, read in chunks."""
+        sha256 = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                sha256.update(chunk)
+        return sha256.hexdigest()
+    
     def package_json_artifact(self):
         """Package the JSON reference artifact."""
         print("📦 Packaging JSON Reference artifact...")
@@ -389,11 +527,12 @@ class CompleteKnowledgeBasePackager:
         json_dir = self.release_path / f"p2-reference-v{self.version}"
         json_dir.mkdir(parents=True, exist_ok=True)
         
-        # Copy main JSON
+        # Main JSON is streamed into the tarball from its source location
+        sources = {}
         source_json = self.base_path / f"deliverables/ai-reference/versions/v{self.version}/p2-reference-v{self.version}.json"
         if source_json.exists():
-            shutil.copy2(source_json, json_dir / f"p2-reference-v{self.version}.json")
-            print(f"   ✓ Copied main JSON ({source_json.stat().st_size // 1024}KB)")
+            sources[source_json.name] = source_json
+            print(f"   ✓ Found main JSON ({source_json.stat().st_size // 1024}KB)")
         
         # Create schemas directory and schemas
         schemas_dir = json_dir / "schemas"
@@ -414,9 +553,8 @@ class CompleteKnowledgeBasePackager:
         print(f"   ✓ Created README, CHANGELOG, and RELEASE-NOTES")
         
         # Create tarball
-        tarball = self.release_path / f"p2-reference-v{self.version}.tar.gz"
-        with tarfile.open(tarball, "w:gz") as tar:
-            tar.add(json_dir, arcname=f"p2-reference-v{self.version}")
+        tarball = self.release_path / f"p2-reference-v{self.version}{self.archive_suffix}"
+        self.create_tarball(tarball, f"p2-reference-v{self.version}", json_dir, sources)
         
         print(f"   ✓ Created: {tarball.name}")
         return tarball
@@ -425,7 +563,7 @@ class CompleteKnowledgeBasePackager:
         """Create CHANGELOG.md for a package."""
         changelog = f"""# Changelog - {package_type} v{self.version}
 
-## [{self.version}] - {datetime.now().strftime('%Y-%m-%d')}
+## [{self.version}] - {self.build_time.strftime('%Y-%m-%d')}
 
 ### Added
 - Complete SPIN2 language specification (268 elements)
@@ -476,7 +614,7 @@ class CompleteKnowledgeBasePackager:
 ## 🎉 Version {self.version} - Major Content Update
 
 ### Package: {package_type}
-**Release Date**: {datetime.now().strftime('%Y-%m-%d')}
+**Release Date**: {self.build_time.strftime('%Y-%m-%d')}
 
 ### What's New
 This release represents a **114% increase** in documented P2 elements, bringing comprehensive coverage of both PASM2 assembly language and SPIN2 high-level language.
@@ -522,22 +660,11 @@ This release represents a **114% increase** in documented P2 elements, bringing
         manifests_dir = kb_dir / "manifests"
         manifests_dir.mkdir(exist_ok=True)
         
-        # Copy entire knowledge base structure
-        print("   Copying complete knowledge base...")
-        target_kb = kb_dir / "P2"
-        
-        # Use shutil.copytree to copy everything
-        shutil.copytree(
-            self.kb_path,
-            target_kb,
-            ignore=shutil.ignore_patterns('.DS_Store', '*.pyc', '__pycache__', '.git*')
-        )
-        
-        # Count what we copied
-        total_yamls = len(list(target_kb.rglob("*.yaml")))
-        total_mds = len(list(target_kb.rglob("*.md")))
-        print(f"   ✓ Copied {total_yamls} YAML files")
-        print(f"   ✓ Copied {total_mds} Markdown files")
+        # The knowledge base itself is streamed into the tarball as P2/
+        total_yamls = len(list(self.kb_path.rglob("*.yaml")))
+        total_mds = len(list(self.kb_path.rglob("*.md")))
+        print(f"   ✓ Including {total_yamls} YAML files")
+        print(f"   ✓ Including {total_mds} Markdown files")
         
         # Generate manifests for each category
         print("   Generating category manifests...")
@@ -573,9 +700,8 @@ This release represents a **114% increase** in documented P2 elements, bringing
         print(f"   ✓ Created README, CHANGELOG, and RELEASE-NOTES")
         
         # Create tarball
-        tarball = self.release_path / f"p2-complete-kb-v{self.version}.tar.gz"
-        with tarfile.open(tarball, "w:gz") as tar:
-            tar.add(kb_dir, arcname=f"p2-complete-kb-v{self.version}")
+        tarball = self.release_path / f"p2-complete-kb-v{self.version}{self.archive_suffix}"
+        self.create_tarball(tarball, f"p2-complete-kb-v{self.version}", kb_dir, {"P2": self.kb_path})
         
         print(f"   ✓ Created: {tarball.name}")
         return tarball
@@ -680,18 +806,14 @@ https://github.com/ironsheep/P2-Knowledge-Base
     
     def create_checksums(self, packages: List[Path]):
         """Create checksums file for packages."""
-        import hashlib
-        
         checksums_file = self.release_path / f"checksums-v{self.version}.txt"
         
         with open(checksums_file, 'w') as f:
             for package in packages:
                 if package.exists():
-                    sha256 = hashlib.sha256()
-                    with open(package, 'rb') as pf:
-                        sha256.update(pf.read())
-                    
-                    f.write(f"SHA256 ({package.name}) = {sha256.hexdigest()}\n")
+                    # Digest computed while the archive was written (or recorded when kept)
+                    sha256 = self.archive_checksums.get(package.name) or self.file_sha256(package)
+                    f.write(f"SHA256 ({package.name}) = {sha256}\n")
         
         print(f"\n✓ Created checksums file")
     
@@ -714,22 +836,35 @@ https://github.com/ironsheep/P2-Knowledge-Base
         # Save statistics to JSON file for GitHub Actions
         stats_summary = self.save_statistics()
         
+        # Remember input digests for the next incremental run
+        self.save_build_state()
+        
         print("\n✅ Packaging complete!")
         print(f"📁 Release directory: {self.release_path}")
         print("\n📦 Release Artifacts:")
         print(f"   1. {json_package.name} - Single JSON reference")
         print(f"   2. {kb_package.name} - Complete knowledge base")
         print(f"   3. statistics.json - Element counts for release notes")
+        print(f"\n{self.corpus.report()}")
         
         return self.stats
 
 
 if __name__ == "__main__":
-    import sys
+    import argparse
     
-    version = sys.argv[1] if len(sys.argv) > 1 else "1.1.0"
+    parser = argparse.ArgumentParser(description="Package the complete P2 Knowledge Base release artifacts")
+    parser.add_argument("version", nargs="?", default="1.1.0", help="Release version (default: 1.1.0)")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Worker processes for YAML parsing and pgzip/zstd compression threads (default: 1)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse unchanged categories and archives from the previous build")
+    parser.add_argument("--compression", choices=COMPRESSIONS, default="gzip",
+                        help="Archive compression: gzip, pgzip (parallel, uses --jobs threads) or zstd")
+    args = parser.parse_args()
     
-    packager = CompleteKnowledgeBasePackager(version)
+    packager = CompleteKnowledgeBasePackager(args.version, jobs=args.jobs, incremental=args.incremental,
+                                             compression=args.compression)
     stats = packager.package()
     
     print("\n📊 Knowledge Base Statistics:")
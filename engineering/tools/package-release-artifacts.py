@@ -6,7 +6,6 @@ Package P2 Knowledge Base into two release artifacts:
 """
 
 import json
-import yaml
 import os
 import shutil
 import tarfile
@@ -14,6 +13,8 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any
 
+from kb_corpus import safe_load
+
 class P2ReleasePackager:
     def __init__(self, version: str = "1.3.0"):
         self.version = version
@@ -41,7 +42,7 @@ class P2ReleasePackager:
         """Load and parse a YAML file."""
         try:
             with open(file_path, 'r') as f:
-                return yaml.safe_load(f)
+                return safe_load(f)
         except Exception as e:
             print(f"Warning: Could not load {file_path}: {e}")
             return None
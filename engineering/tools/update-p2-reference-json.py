@@ -5,12 +5,13 @@ This maintains the existing JSON structure while adding our new content.
 """
 
 import json
-import yaml
 import os
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any
 
+from kb_corpus import safe_load
+
 class P2ReferenceUpdater:
     def __init__(self, version: str = "2.0.0"):
         self.version = version
@@ -38,7 +39,7 @@ class P2ReferenceUpdater:
         """Load and parse a YAML file."""
         try:
             with open(file_path, 'r') as f:
-                return yaml.safe_load(f)
+                return safe_load(f)
         except Exception as e:
             print(f"Error loading {file_path}: {e}")
             return None